@@ -1,23 +1,22 @@
 import requests
 import streamlit as st
 import streamlit.components.v1 as components
-from streamlit_autorefresh import st_autorefresh
-import re
 
-from core.constants import CACHE_TTL_SECONDS, REFRESH_MS, INDICATORS
-from core.data import fetch_payload, payload_to_df, latest_values, get_val
-from core.metrics import total_for_indicator, people_values, to_percent_value
-from core.formatters import fmt_int, fmt_money, pct_to_float_percent, fmt_money_no_cents
+from core.constants import CACHE_TTL_SECONDS, COLD_START_RETRY_SECONDS, SNAPSHOT_CHECK_SECONDS
+from core.data import fetch_payload_guarded, last_fetch_result, refresh_payload
+from core.instrumentation import TIMINGS, timings_json
+from core.memprofile import MEMORY
+from core.periods import parse_period
+from core.profiling import discard_profile, finish_profile, start_profile
+from core.scheduler import SCHEDULER
+from core.settings import load_webhook_token
+from core.snapshot import SNAPSHOTS
+from core.telemetry import start_metrics_server
+from core.webhook import start_webhook_server
 
-from ui.cards import kpi_card_html
-from ui.leads_conversion import leads_conversion_card_html
-from ui.ranklist import ranking_sdr_card_html
-from ui.contracts_podium import podium_contracts_card_html
-from ui.funil_vendas import funil_vendas_card_html
-from ui.render import inject_kiosk_css, render_dashboard
-
-# Quantidade máxima de pessoas exibidas nos rankings (conteúdo rola dentro do card)
-RANKING_MAX_ROWS = 10
+from ui.dashboard import current_snapshot, period_view
+from ui.debug_overlay import debug_overlay_html, memory_report_html, profile_overlay_html
+from ui.render import inject_kiosk_css, render_slot_patch, render_status_patch, with_fetch_status
 
 
 # =========================
@@ -51,6 +50,25 @@ def hide_streamlit_chrome():
     )
 
 
+# =========================
+# Erro sem dados (TV não pode ficar presa)
+# =========================
+@st.fragment(run_every=COLD_START_RETRY_SECONDS)
+def _retry_later():
+    # 1ª execução acontece junto do run que mostrou o erro
+    if st.session_state.pop("retry_fresh", False):
+        return
+    st.rerun(scope="app")
+
+
+def stop_with_retry(message: str):
+    """Mostra o erro e encerra o run, mas agenda um run completo novo (a TV se recupera sozinha)."""
+    st.error(message)
+    st.session_state["retry_fresh"] = True
+    _retry_later()
+    st.stop()
+
+
 # =========================
 # Config
 # =========================
@@ -62,394 +80,186 @@ hide_streamlit_chrome()
 # ✅ Kiosk mode: sem scroll + centralizado
 inject_kiosk_css()
 
-# Auto refresh (TV)
-st_autorefresh(interval=REFRESH_MS, key="auto_refresh_main")
+# Profiling de memória (tracemalloc é do processo inteiro: ?memprofile=1 liga,
+# ?memprofile=0 desliga). Cada rerun desta sessão gera um relatório de alocações.
+# MEMORY.active só decide a coleta; o overlay aparece só na sessão que pediu.
+_memprofile = st.query_params.get("memprofile")
+if _memprofile in ("1", "true", "on"):
+    MEMORY.start()
+    st.session_state["memprofile"] = True
+elif _memprofile in ("0", "false", "off"):
+    if MEMORY.active:
+        MEMORY.stop()
+    st.session_state["memprofile"] = False
+SHOW_MEMORY = bool(st.session_state.get("memprofile")) and MEMORY.active
+MEMORY.begin_rerun()
+
+# cProfile: ?profile=1 captura ESTE rerun da sessão. No Python 3.12+ o
+# cProfile pega o processo inteiro (reruns de outras TVs entram no relatório
+# e ficam mais lentos enquanto dura), então é uma captura por vez no processo.
+# O parâmetro sai da URL para não perfilar todo rerun; ?profile=0 fecha o overlay.
+_stale_profiler = st.session_state.pop("_profiler", None)
+if _stale_profiler is not None:
+    discard_profile(_stale_profiler)  # rerun anterior terminou em st.stop/st.rerun
+_profile = st.query_params.get("profile")
+if _profile in ("1", "true", "on"):
+    del st.query_params["profile"]
+    st.session_state["_profiler"] = start_profile()
+elif _profile in ("0", "false", "off"):
+    del st.query_params["profile"]
+    st.session_state.pop("profile_summary", None)
+
+# ✅ Métricas Prometheus em http://127.0.0.1:METRICS_PORT/metrics (uma vez por processo)
+start_metrics_server()
 
 # Secrets
-URL = st.secrets.get("SHEETS_WEBAPP_URL", "")
-TOKEN = st.secrets.get("SHEETS_WEBAPP_TOKEN", "")
+def _secret(key: str) -> str:
+    # sem secrets.toml o st.secrets levanta exceção: trata como chave ausente (stop_with_retry abaixo)
+    try:
+        return st.secrets.get(key, "")
+    except Exception:
+        return ""
+
+
+URL = _secret("SHEETS_WEBAPP_URL")
+TOKEN = _secret("SHEETS_WEBAPP_TOKEN")
 
 if not (URL and TOKEN):
-    st.error("Defina SHEETS_WEBAPP_URL e SHEETS_WEBAPP_TOKEN em .streamlit/secrets.toml")
-    st.stop()
+    stop_with_retry("Defina SHEETS_WEBAPP_URL e SHEETS_WEBAPP_TOKEN em .streamlit/secrets.toml")
+
+
+def _refresh_from_webhook():
+    # roda na thread do webhook: um fetch novo + snapshot do processo; os
+    # watchers das sessões percebem o fingerprint novo no próximo check
+    fetched = refresh_payload(URL, TOKEN, ttl_seconds=CACHE_TTL_SECONDS)
+    snap = current_snapshot(fetched.payload)
+    if not fetched.stale:
+        SCHEDULER.observe(snap.fingerprint, fetched.payload.get("updatedAt"))
+
+
+# ✅ Webhook do Apps Script (onEdit): só sobe com SHEETS_WEBHOOK_TOKEN definido
+start_webhook_server(_refresh_from_webhook, load_webhook_token() or _secret("SHEETS_WEBHOOK_TOKEN"))
 
 
 # =========================
 # Data
 # =========================
+# ✅ Circuit breaker: falha/timeout do endpoint não apaga a TV — seguimos com o
+# último payload bom e o selo "dados desatualizados". Só a 1ª carga do processo
+# (sem nenhum dado ainda) mostra o erro — e tenta de novo sozinha (stop_with_retry).
 try:
-    payload = fetch_payload(URL, TOKEN, ttl_seconds=CACHE_TTL_SECONDS)
+    fetched = fetch_payload_guarded(URL, TOKEN, ttl_seconds=CACHE_TTL_SECONDS)
 except requests.HTTPError as e:
-    st.error(f"Erro HTTP ao buscar dados: {e}")
-    st.stop()
+    stop_with_retry(f"Erro HTTP ao buscar dados: {e}")
 except Exception as e:
-    st.error(f"Erro ao buscar dados: {e}")
-    st.stop()
+    stop_with_retry(f"Erro ao buscar dados: {e}")
 
-if "error" in payload and "rows" not in payload:
-    st.error(f"Endpoint retornou erro: {payload}")
-    st.stop()
+payload = fetched.payload
 
-df, updated_at, sheet = payload_to_df(payload)
-df_last = latest_values(df)
+# Visão por período: ?period=day|week|month|quarter (realizados do cubo,
+# core/cube.py); sem o parâmetro, os valores do Sheets.
+PERIOD = parse_period(st.query_params.get("period"))
 
+# ✅ Snapshot compartilhado pelo processo: o pipeline (DataFrame, rankings, HTML)
+# roda uma vez por payload novo, não uma vez por sessão/TV (nem por período).
+snapshot = period_view(current_snapshot(payload), PERIOD)
 
-# =========================
-# 1) KPI: Reuniões (SDR) / Faturamento (CLOSER)
-# =========================
-reun_real = get_val(df_last, INDICATORS.REUNIOES_REAL, "SDR")
-reun_meta = get_val(df_last, INDICATORS.REUNIOES_META, "SDR")
-reun_perc = get_val(df_last, INDICATORS.REUNIOES_PERC, "SDR")
-reun_crescimento = get_val(df_last, INDICATORS.REUNIOES_CRESC, "SDR")
-reun_dif = (reun_real - reun_meta) if (reun_real is not None and reun_meta is not None) else None
-
-# ✅ No seu payload existem "FATURAMENTO ASSINADO" e "FATURAMENTO PAGO".
-fat_assinado = total_for_indicator(df_last, INDICATORS.FATURAMENTO_ASSINADO, prefer_responsavel="CLOSER")
-if fat_assinado is None:
-    fat_assinado = total_for_indicator(df_last, INDICATORS.FATURAMENTO_ASSINADO, exclude_responsaveis=["CLOSER"])
-
-fat_pago = total_for_indicator(df_last, INDICATORS.FATURAMENTO_PAGO, prefer_responsavel="CLOSER")
-if fat_pago is None:
-    fat_pago = total_for_indicator(df_last, INDICATORS.FATURAMENTO_PAGO, exclude_responsaveis=["CLOSER"])
-
-fat_meta = get_val(df_last, INDICATORS.FAT_META, "CLOSER")
-fat_perc = get_val(df_last, INDICATORS.FAT_PERC, "CLOSER")
-fat_cresc = get_val(df_last, INDICATORS.FAT_CRESC, "CLOSER")
-fat_dif = (fat_assinado - fat_meta) if (fat_assinado is not None and fat_meta is not None) else None
-
-card_reunioes = kpi_card_html(
-    title="Reuniões Ocorridas",
-    percent_float=pct_to_float_percent(reun_perc),
-    subtitle="Progresso",
-    left_label="Número de Reuniões",
-    left_value=fmt_int(reun_real),
-    left_badge=pct_to_float_percent(reun_crescimento),
-    mid_label="Meta de Reuniões",
-    mid_value=fmt_int(reun_meta),
-    right_pill=fmt_int(reun_dif) if reun_dif is not None else "0",
-)
-
-card_faturamento = kpi_card_html(
-    title="Faturamento",
-    percent_float=pct_to_float_percent(fat_perc),
-    subtitle="Progresso",
-    left_label="Faturamento Assinado",
-    left_value=fmt_money_no_cents(fat_assinado),
-    left_badge=pct_to_float_percent(fat_cresc),
-    mid_label="Meta de Faturamento",
-    mid_value=fmt_money_no_cents(fat_meta),
-    right_pill=fmt_int(fat_dif),
-)
+# ✅ Guarda o hash de cada slot enviado nesta sessão: o watcher abaixo só
+# manda ao browser os cards cujo hash mudou (o iframe não é recriado).
+st.session_state["dash_fingerprint"] = snapshot.fingerprint
+st.session_state["dash_nonce"] = snapshot.nonce  # patches abaixo só valem com o nonce deste HTML
+st.session_state["dash_slot_hashes"] = dict(snapshot.slot_hashes)
+st.session_state["dash_html_fresh"] = True
+st.session_state["dash_stale"] = fetched.stale
+
+components.html(with_fetch_status(snapshot.html, fetched.status()), height=1, scrolling=False)
 
 
 # =========================
-# 2) Leads + Taxa de Conversão (Geral)
+# Overlay de diagnóstico (oculto): ?timings=1 / ?memprofile=1
 # =========================
-leads_total = total_for_indicator(df_last, INDICATORS.LEADS_CRIADOS, prefer_responsavel="SDR")
-taxa_geral_raw = get_val(df_last, INDICATORS.TAXA_CONVERSAO, "SDR")
+SHOW_TIMINGS = st.query_params.get("timings") in ("1", "true", "on") or SHOW_MEMORY
 
-card_leads_taxa = leads_conversion_card_html(
-    leads_total=leads_total,
-    taxa_conversao=taxa_geral_raw,
-    title="Leads | Taxa de Conversão (Geral)",
-)
 
-
-# =========================
-# 3) Ranking SDR (por Reuniões)
-# =========================
-def _is_team_label(name: str) -> bool:
-    n = (name or "").replace("\u00A0", " ")
-    n = " ".join(n.split()).strip().upper()
-
-    if not n:
-        return True
-
-    team_labels = {
-        "SDR",
-        "EQUIPE",
-        "TIME",
-        "EQUIPE SDR",
-        "TIME SDR",
-        "SDR (EQUIPE)",
-    }
-
-    if n in team_labels:
-        return True
-    if n.startswith("SDR ") or n.startswith("SDR-"):
-        return True
-    if n.endswith(" SDR") or n.endswith("-SDR"):
-        return True
-    return False
-
-
-def _norm_name(name: str) -> str:
-    """Normaliza pra casar nomes entre indicadores (evita diferença de espaços/caixa)."""
-    n = (name or "").replace("\u00A0", " ")
-    n = " ".join(n.split()).strip().upper()
-    return n
-
-
-def _to_float_safe(v) -> float:
-    """Converte valor com segurança (aceita float, '0,123', '0.123', etc.)."""
-    if v is None:
-        return 0.0
-    try:
-        if isinstance(v, (int, float)):
-            return float(v)
-        s = str(v).strip().replace("\u00A0", " ").replace("%", "")
-        # se vier no padrão pt-BR com vírgula decimal
-        if "," in s and "." in s:
-            # heurística: se a última vírgula está depois do último ponto, vírgula é decimal
-            if s.rfind(",") > s.rfind("."):
-                s = s.replace(".", "").replace(",", ".")
-            else:
-                s = s.replace(",", "")
-        else:
-            s = s.replace(",", ".")
-        return float(s)
-    except Exception:
-        return 0.0
-
-
-# 1) Reuniões por pessoa
-#    - pegamos apenas pessoas (não "SDR"/"EQUIPE")
-reun_people_vals = people_values(
-    df_last,
-    INDICATORS.REUNIOES_REAL,
-    exclude_responsaveis=["SDR", "CLOSER"],
-)
-reun_people_vals = [x for x in reun_people_vals if not _is_team_label(x.get("name", ""))]
-
-# 2) Taxa de conversão por pessoa (indicador "TAXA DE CONVERSÃO")
-conv_people_vals = people_values(
-    df_last,
-    INDICATORS.TAXA_CONVERSAO,
-    exclude_responsaveis=["SDR", "CLOSER"],
-)
-conv_people_vals = [x for x in conv_people_vals if not _is_team_label(x.get("name", ""))]
-
-# 3) ✅ Dinâmico: só entra no ranking quem tiver OS DOIS indicadores
-#    (Reuniões + Taxa de Conversão). Se você adicionar uma nova pessoa no Sheets com ambos,
-#    ela aparece automaticamente (sem precisar mexer no código).
-reun_by_name = {
-    _norm_name(x.get("name", "")): x
-    for x in reun_people_vals
-    if _norm_name(x.get("name", ""))
-}
-conv_by_name = {
-    _norm_name(x.get("name", "")): _to_float_safe(x.get("value"))
-    for x in conv_people_vals
-    if _norm_name(x.get("name", ""))
-}
-
-eligible_keys = [k for k in reun_by_name.keys() if k in conv_by_name]
-
-rank_sdr_items: list[dict] = []
-for k in eligible_keys:
-    it = reun_by_name[k]
-    name = it.get("name")
-    display_name = it.get("display_name")
-    reun = _to_float_safe(it.get("value"))
-
-    conv_raw = conv_by_name.get(k, 0.0)          # ratio (0..1) ou já % (0..100)
-    conv_pct = pct_to_float_percent(conv_raw)     # normaliza para % (0..100)
-
-    rank_sdr_items.append(
-        {
-            "name": name,
-            "display_name": display_name,
-            "reunioes": reun,
-            "conversao": conv_pct,
-        }
+def _render_debug_overlay():
+    extra = memory_report_html(st.session_state.get("memory_report")) if SHOW_MEMORY else ""
+    components.html(
+        debug_overlay_html(TIMINGS.summary(), raw_json=timings_json(), extra_html=extra),
+        height=0,
+        scrolling=False,
     )
 
-# Ordenação do ranking SDR: Reuniões (desc) e, em empate, Conversão (desc)
-rank_sdr_items.sort(
-    key=lambda r: (_to_float_safe(r.get("reunioes")), _to_float_safe(r.get("conversao"))),
-    reverse=True,
-)
-
-# Mantém um teto de itens (o conteúdo rola dentro do card)
-rank_sdr_items = rank_sdr_items[:RANKING_MAX_ROWS]
-card_ranking_sdr = ranking_sdr_card_html(
-    title="Ranking SDR",
-    items=[
-        {
-            "name": r["name"],
-            "display_name": r.get("display_name"),
-            "reunioes": r["reunioes"],
-            "conversao": r["conversao"],
-        }
-        for r in rank_sdr_items
-    ],
-    limit=RANKING_MAX_ROWS,
-    avatar_size_px=56,
-)
-
 
 # =========================
-# 4) Ranking Closer (por Faturamento Pago)
+# Auto refresh (TV)
 # =========================
-def _to_float_moneyish(v) -> float:
-    """Converte números/strings (incluindo '98.874,00', 'R$ 98.874,00', etc.) para float."""
-    if v is None:
-        return 0.0
-    if isinstance(v, (int, float)):
+# Em vez de rerodar o app inteiro a cada busca (o que recria o iframe,
+# reexecuta o Tailwind e "pisca" a TV), só este fragment roda no intervalo.
+# Ele envia apenas os slots alterados (render_slot_patch); o JS do template
+# troca só esses nós. Sem mudanças, nada é enviado ao browser.
+#
+# O fragment roda a cada SNAPSHOT_CHECK_SECONDS, mas só busca o endpoint
+# quando o agendador adaptativo (core/scheduler.py) libera — uma sessão por
+# intervalo; nos demais ticks apenas compara o snapshot do processo
+# (atualizado pela busca agendada ou pelo webhook) com o desta sessão — sem rede.
+@st.fragment(run_every=SNAPSHOT_CHECK_SECONDS)
+def _watch_dashboard_changes():
+    if SHOW_TIMINGS:
+        _render_debug_overlay()
+
+    # 1ª execução acontece junto do run completo (HTML acabou de ser enviado)
+    if st.session_state.pop("dash_html_fresh", False):
+        return
+
+    if SCHEDULER.claim():
         try:
-            return float(v)
+            new_fetch = fetch_payload_guarded(URL, TOKEN, ttl_seconds=CACHE_TTL_SECONDS)
+            new_snapshot = current_snapshot(new_fetch.payload)
         except Exception:
-            return 0.0
-
-    s = str(v).strip()
-    if not s or s == "-":
-        return 0.0
-
-    m = re.search(r"-?[\d\.,]+", s.replace("R$", "").strip())
-    if not m:
-        return 0.0
-
-    num = m.group(0)
-
-    if "." in num and "," in num:
-        num = num.replace(".", "").replace(",", ".")
-    elif "," in num and "." not in num:
-        num = num.replace(",", ".")
+            # mantém o dashboard atual na tela; tenta de novo no próximo intervalo
+            return
+        if not new_fetch.stale:
+            SCHEDULER.observe(new_snapshot.fingerprint, new_fetch.payload.get("updatedAt"))
     else:
-        if num.count(".") > 1:
-            num = num.replace(".", "")
-
-    try:
-        return float(num)
-    except Exception:
-        return 0.0
-
-
-contratos_vals = people_values(df_last, INDICATORS.CONTRATOS_ASSINADOS, exclude_responsaveis=["CLOSER"])
-fat_ass_vals = people_values(df_last, INDICATORS.FATURAMENTO_ASSINADO, exclude_responsaveis=["CLOSER"])
-fat_pago_vals = people_values(df_last, INDICATORS.FATURAMENTO_PAGO, exclude_responsaveis=["CLOSER"])
-
-# ✅ % vem do indicador PERC FATURAMENTO PAGO (sem cálculo no app.py)
-perc_fat_pago_vals = people_values(df_last, INDICATORS.PERC_FATURAMENTO_PAGO, exclude_responsaveis=["CLOSER"])
-
-def _map_norm(vals: list[dict]) -> dict[str, dict]:
-    """Mapeia: NOME_NORMALIZADO -> {name, value}."""
-    out: dict[str, dict] = {}
-    for x in vals or []:
-        nm = str(x.get("name") or "").strip()
-        if not nm:
-            continue
-        if nm.upper() in {"CLOSER", "SDR"}:
-            continue
-        k = _norm_name(nm)
-        if not k:
-            continue
-        out[k] = {
-            "name": nm,
-            "display_name": x.get("display_name"),
-            "original_name": x.get("original_name"),
-            "value": x.get("value"),
-        }
-    return out
-
-m_contr = _map_norm(contratos_vals)
-m_fa = _map_norm(fat_ass_vals)
-m_fp = _map_norm(fat_pago_vals)
-m_perc_fat_pago = _map_norm(perc_fat_pago_vals)
-
-# ✅ Dinâmico: só entra no Ranking Closer quem tiver TODOS os 4 indicadores:
-#    CONTRATOS ASSINADOS, FATURAMENTO ASSINADO, FATURAMENTO PAGO e PERC FATURAMENTO PAGO
-#
-# ⚠️ Importante: NÃO use set() puro aqui para não introduzir ordem não-determinística
-# (o que bagunça a colocação quando há empates). Mantemos uma ordem estável.
-eligible_keys = sorted(set(m_contr) & set(m_fa) & set(m_fp) & set(m_perc_fat_pago))
-
-rows_closer: list[dict] = []
-for k in eligible_keys:
-    src_row = (m_fp.get(k) or m_fa.get(k) or m_contr.get(k) or m_perc_fat_pago.get(k) or {})
-    name = (
-        src_row.get("name")
-        or (m_fp.get(k) or {}).get("name")
-        or (m_fa.get(k) or {}).get("name")
-        or (m_contr.get(k) or {}).get("name")
-        or (m_perc_fat_pago.get(k) or {}).get("name")
-        or k
-    )
-    display_name = src_row.get("display_name")
-
-    perc_raw = (m_perc_fat_pago.get(k) or {}).get("value")  # pode vir 0.15, "15%", "0,15", etc.
-    perc_float = pct_to_float_percent(perc_raw)               # normaliza para 0..100 (float)
-
-    rows_closer.append(
-        {
-            "name": name,
-            "display_name": display_name,
-            "contratos": (m_contr.get(k) or {}).get("value"),
-            "fat_assinado": (m_fa.get(k) or {}).get("value"),
-            "fat_pago": (m_fp.get(k) or {}).get("value"),
-
-            # ✅ chave "oficial" que o ranklist procura por padrão (pct_field)
-            "PERC FATURAMENTO PAGO": perc_float,
-
-            # ✅ opcional: mantém fallback compatível (ranklist também busca "pct")
-            "pct": perc_float,
-        }
-    )
+        new_fetch = last_fetch_result()
+        new_snapshot = SNAPSHOTS.current
+        if new_fetch is None or new_snapshot is None:
+            return
+    new_snapshot = period_view(new_snapshot, PERIOD)
 
-# Ordenação do Ranking Closer:
-#  1) Faturamento ASSINADO (desc)
-#  2) Em empate, Faturamento PAGO (desc)
-#  3) Em novo empate, Contratos (desc)
-#  4) Por fim, Nome (asc) para estabilidade total
-rows_closer.sort(
-    key=lambda r: (
-        -float(_to_float_moneyish(r.get("fat_assinado")) or 0.0),
-        -float(_to_float_moneyish(r.get("fat_pago")) or 0.0),
-        -float(r.get("contratos") or 0.0),
-        str(r.get("name") or "").strip().upper(),
-    )
-)
-rows_closer = rows_closer[:RANKING_MAX_ROWS]
+    # selo "dados desatualizados": só avisa o browser quando o estado muda
+    if new_fetch.stale != st.session_state.get("dash_stale"):
+        st.session_state["dash_stale"] = new_fetch.stale
+        components.html(render_status_patch(new_fetch.status(), st.session_state["dash_nonce"]), height=0, scrolling=False)
 
+    if new_snapshot.fingerprint == st.session_state.get("dash_fingerprint"):
+        return
 
-card_ranking_closer = podium_contracts_card_html(rows_closer, title="Ranking Closer", limit=RANKING_MAX_ROWS)
+    old_hashes = st.session_state.get("dash_slot_hashes") or {}
+    new_hashes = new_snapshot.slot_hashes
 
+    if set(new_hashes) != set(old_hashes):
+        # mudou a estrutura (slots novos/removidos): render completo
+        st.rerun()
 
-# =========================
-# 5) Funil de vendas (NOVO)
-# =========================
-contratos_total = get_val(df_last, INDICATORS.CONTRATOS_ASSINADOS, "CLOSER")
-if contratos_total is None:
-    contratos_total = sum(float(x.get("value") or 0.0) for x in contratos_vals) or 0.0
+    st.session_state["dash_fingerprint"] = new_snapshot.fingerprint
+    changed = {k: v for k, v in new_snapshot.slots.items() if new_hashes[k] != old_hashes.get(k)}
+    if not changed:
+        return
 
-tax_funil_1_raw = get_val(df_last, INDICATORS.TAX_CONV_FUNIL_1, "SDR")
-tax_funil_2_raw = get_val(df_last, INDICATORS.TAX_CONV_FUNIL_2, "CLOSER")
+    st.session_state["dash_slot_hashes"] = dict(new_hashes)
+    components.html(render_slot_patch(changed, st.session_state["dash_nonce"]), height=0, scrolling=False)
 
-tax_funil_1 = pct_to_float_percent(tax_funil_1_raw)
-tax_funil_2 = pct_to_float_percent(tax_funil_2_raw)
 
-card_funil_vendas = funil_vendas_card_html(
-    title="Funil de Vendas",
-    leads=leads_total,
-    reunioes=reun_real,
-    contratos=contratos_total,
-    pct_leads_para_reunioes=tax_funil_1,
-    pct_reunioes_para_contratos=tax_funil_2,
-)
+_watch_dashboard_changes()
 
+# relatório de alocações deste rerun (aparece no overlay do próximo rerun DESTA sessão)
+_memory_report = MEMORY.end_rerun()
+if _memory_report is not None and SHOW_MEMORY:
+    st.session_state["memory_report"] = _memory_report
 
-# =========================
-# Render (layout conforme estrutura.png)
-# =========================
-slots = {
-    "CARD_REUNIOES": card_reunioes,
-    "CARD_RANKING_SDR": card_ranking_sdr,
-    "CARD_FATURAMENTO": card_faturamento,
-    "CARD_LEADS_TAXA": card_leads_taxa,
-    "CARD_RANKING_CLOSER": card_ranking_closer,
-    "CARD_FUNIL_VENDAS": card_funil_vendas,
-}
-
-html = render_dashboard(slots=slots)
-
-components.html(html, height=1, scrolling=False)
\ No newline at end of file
+_profiler = st.session_state.pop("_profiler", None)
+if _profiler is not None:
+    st.session_state["profile_summary"] = finish_profile(_profiler)
+if st.session_state.get("profile_summary"):
+    components.html(profile_overlay_html(st.session_state["profile_summary"]), height=0, scrolling=False)
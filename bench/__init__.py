@@ -0,0 +1,5 @@
+"""Benchmarks do pipeline do dashboard (python -m bench)."""
+from streamlit import logger as _st_logger
+
+# st.cache_* fora do app avisa "No runtime found" a cada função decorada
+_st_logger.set_log_level("error")
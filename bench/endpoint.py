@@ -0,0 +1,195 @@
+"""
+Endpoint local que imita o Apps Script WebApp (modos completo e delta).
+
+Serve um payload sintético (bench/synthetic.py) que muda com o tempo, para
+exercitar o protocolo delta (core/delta.py) sem tocar na planilha real:
+  GET  /?token=T                -> resposta completa (mode=full, version)
+  GET  /?token=T&since=V        -> só os pares alterados desde V (mode=delta);
+                                   versão desconhecida/antiga -> resposta completa
+  GET  /?token=T&format=columnar -> resposta completa no formato colunar (core/columnar.py)
+  POST /bump?n=5                -> aplica n alterações agora (também GET)
+  POST /remove?n=1              -> remove n pares (linhas somem da planilha)
+
+Rodar:
+  python -m bench.endpoint --rows 5000 --people 50 --port 9911 --token t
+  python -m bench.endpoint --change-every 30 --changes 5      # muda sozinho
+  python -m bench.endpoint --legacy                           # sem version (formato antigo)
+  python -m bench.endpoint --legacy --columnar                # formato colunar em toda resposta completa
+
+Depois aponte SHEETS_WEBAPP_URL=http://127.0.0.1:9911/ e SHEETS_WEBAPP_TOKEN=t.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Set
+from urllib.parse import parse_qs, urlsplit
+
+from core.columnar import to_columnar
+from core.delta import latest_rows, pair_key
+
+from bench.synthetic import _ptbr_value, synthetic_payload
+
+log = logging.getLogger("bench.endpoint")
+
+# Quantas versões o endpoint lembra para responder delta (além disso: completo)
+_RETAINED_VERSIONS = 200
+
+
+def _iso(ts: datetime) -> str:
+    return ts.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+class StandInEndpoint:
+    """Planilha sintética versionada: cada alteração incrementa a versão."""
+
+    def __init__(self, rows: int, people: int, seed: int = 0, legacy: bool = False, columnar: bool = False):
+        now = datetime.now(timezone.utc)
+        base = synthetic_payload(rows, people, seed=seed, now=now)
+        self.rng = random.Random(seed + 1)
+        self.legacy = legacy
+        self.columnar = columnar
+        self.sheet = base["sheet"]
+        self.updated_at = base["updatedAt"]
+        self.rows: List[Dict[str, Any]] = base["rows"]
+        self.latest = latest_rows(self.rows)
+        self.version = 1
+        self.changes: Dict[int, Set[tuple]] = {}  # versão -> pares alterados nela
+        self._lock = threading.Lock()
+
+    # -------------------------
+    # Alterações
+    # -------------------------
+    def _commit(self, keys: Set[tuple]) -> None:
+        self.version += 1
+        self.updated_at = _iso(datetime.now(timezone.utc))
+        self.changes[self.version] = keys
+        self.changes.pop(self.version - _RETAINED_VERSIONS, None)
+
+    def bump(self, n: int = 1) -> int:
+        """Acrescenta uma linha nova (valor + data atual) para n pares sorteados."""
+        with self._lock:
+            if not self.latest:
+                return self.version
+            keys = self.rng.sample(list(self.latest), min(n, len(self.latest)))
+            ts = _iso(datetime.now(timezone.utc))
+            for key in keys:
+                row = dict(self.latest[key], VALOR=_ptbr_value(self.rng), **{"DATA_ATUALIZAÇÃO": ts})
+                self.rows.append(row)
+                self.latest[key] = row
+            self._commit(set(keys))
+            return self.version
+
+    def remove(self, n: int = 1) -> int:
+        """Remove todas as linhas de n pares sorteados."""
+        with self._lock:
+            keys = set(self.rng.sample(list(self.latest), min(n, len(self.latest))))
+            for key in keys:
+                self.latest.pop(key)
+            self.rows = [r for r in self.rows if pair_key(r) not in keys]
+            self._commit(keys)
+            return self.version
+
+    # -------------------------
+    # Respostas
+    # -------------------------
+    def respond(self, since: Optional[str], columnar: bool = False) -> Dict[str, Any]:
+        payload = self._respond(since)
+        if (columnar or self.columnar) and payload.get("mode") != "delta":
+            return to_columnar(payload)
+        return payload
+
+    def _respond(self, since: Optional[str]) -> Dict[str, Any]:
+        with self._lock:
+            head = {"sheet": self.sheet, "updatedAt": self.updated_at}
+            if self.legacy:
+                return {**head, "rows": list(self.rows)}
+
+            version = str(self.version)
+            base = int(since) if since and since.isdigit() else None
+            known = base is not None and (base == self.version or (base + 1) in self.changes)
+            if not known:
+                return {"mode": "full", "version": version, **head, "rows": list(self.rows)}
+
+            keys: Set[tuple] = set()
+            for v in range(base + 1, self.version + 1):
+                keys |= self.changes[v]
+            rows = [self.latest[k] for k in keys if k in self.latest]
+            removed = [{"INDICADORES": k[0], "RESPONSÁVEL": k[1]} for k in keys if k not in self.latest]
+            return {"mode": "delta", "version": version, "baseVersion": since, **head, "rows": rows, "removed": removed}
+
+
+def _make_handler(endpoint: StandInEndpoint, token: str):
+    class _Handler(BaseHTTPRequestHandler):
+        def _reply(self, body: Dict[str, Any]) -> None:
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(200)  # o Apps Script responde 200 até para erro
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _handle(self) -> None:
+            parts = urlsplit(self.path)
+            q = parse_qs(parts.query)
+            n = int((q.get("n") or ["1"])[0])
+            if parts.path == "/bump":
+                self._reply({"ok": True, "version": endpoint.bump(n)})
+            elif parts.path == "/remove":
+                self._reply({"ok": True, "version": endpoint.remove(n)})
+            elif (q.get("token") or [""])[0] != token:
+                self._reply({"error": "unauthorized"})
+            else:
+                columnar = (q.get("format") or [""])[0] == "columnar"
+                self._reply(endpoint.respond((q.get("since") or [None])[0], columnar=columnar))
+
+        do_GET = _handle
+        do_POST = _handle
+
+        def log_message(self, *args) -> None:
+            pass
+
+    return _Handler
+
+
+def _auto_change(endpoint: StandInEndpoint, every: float, n: int) -> None:
+    while True:
+        time.sleep(every)
+        log.info("versão %s", endpoint.bump(n))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Endpoint local no formato do Apps Script (completo + delta).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9911)
+    parser.add_argument("--token", default="t")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--people", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--change-every", type=float, default=0, help="segundos entre alterações automáticas (0 desliga)")
+    parser.add_argument("--changes", type=int, default=3, help="pares alterados por rodada automática")
+    parser.add_argument("--legacy", action="store_true", help="responde no formato antigo (sem version/delta)")
+    parser.add_argument("--columnar", action="store_true", help="respostas completas no formato colunar")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    endpoint = StandInEndpoint(args.rows, args.people, seed=args.seed, legacy=args.legacy, columnar=args.columnar)
+    if args.change_every > 0:
+        threading.Thread(target=_auto_change, args=(endpoint, args.change_every, args.changes), daemon=True).start()
+
+    server = ThreadingHTTPServer((args.host, args.port), _make_handler(endpoint, args.token))
+    log.info("endpoint em http://%s:%s/ (token=%s, %s linhas)", args.host, args.port, args.token, len(endpoint.rows))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
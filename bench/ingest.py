@@ -0,0 +1,123 @@
+"""
+Pico de memória (RSS) da ingestão do payload: resp.json() x streaming.
+
+Serve um payload sintético por HTTP local e, para cada caminho, roda um
+processo filho limpo que busca (fetch_payload_uncached) e monta o DataFrame
+(payload_to_df); o filho reporta o pico de RSS (VmHWM) acima do que já
+tinha depois dos imports.
+
+Rodar:
+  python -m bench.ingest                          # 500k linhas x 1000 pessoas
+  python -m bench.ingest --rows 100000 --people 100 --out /tmp/ingest.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+
+from bench.synthetic import synthetic_payload
+
+MODES = ("json", "stream")
+
+
+def _rss_mb() -> float:
+    """Pico de RSS do processo em MB (VmHWM; ru_maxrss herda o pico do pai no exec)."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0  # KB no Linux
+
+
+def _child(mode: str, url: str) -> Dict[str, Any]:
+    from core.data import fetch_payload_uncached, payload_to_df
+
+    baseline = _rss_mb()
+    t0 = time.perf_counter()
+    payload = fetch_payload_uncached(url, "t", timeout=600, stream=(mode == "stream"))
+    df, _, _ = payload_to_df(payload)
+    seconds = time.perf_counter() - t0
+    peak = _rss_mb()
+    return {
+        "mode": mode,
+        "rows": int(len(df)),
+        "seconds": round(seconds, 3),
+        "baseline_mb": round(baseline, 1),
+        "peak_mb": round(peak, 1),
+        "peak_delta_mb": round(peak - baseline, 1),
+        "frame_mb": round(df.memory_usage(deep=True).sum() / 2**20, 1),
+    }
+
+
+def _serve(body: bytes) -> ThreadingHTTPServer:
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            view = memoryview(body)
+            for i in range(0, len(body), 1 << 20):
+                self.wfile.write(view[i : i + (1 << 20)])
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Pico de RSS da ingestão: resp.json() x streaming.")
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--people", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="grava o resultado em JSON")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(_child(args.child, args.url)))
+        return 0
+
+    body = json.dumps(synthetic_payload(args.rows, args.people, seed=args.seed), ensure_ascii=False).encode("utf-8")
+    server = _serve(body)
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    print(f"payload: {args.rows} linhas, {len(body) / 2**20:.1f} MB")
+
+    results = []
+    for mode in MODES:
+        out = subprocess.run(
+            [sys.executable, "-m", "bench.ingest", "--child", mode, "--url", url],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        res = json.loads(out.stdout.strip().splitlines()[-1])
+        results.append(res)
+        print(
+            f"  {mode:>6}: pico +{res['peak_delta_mb']:.1f} MB  (DataFrame {res['frame_mb']:.1f} MB)  "
+            f"{res['seconds']:.2f}s"
+        )
+    server.shutdown()
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"rows": args.rows, "people": args.people, "body_mb": round(len(body) / 2**20, 1), "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,235 @@
+"""
+Benchmark do pipeline (payload -> DataFrame -> rankings -> HTML).
+
+Mede, para cada combinação (linhas x pessoas) de payload sintético:
+  payload_to_df (formato rows e colunar), latest_values, people_values, ranking (SDR + Closer),
+  build_slots e render_dashboard.
+
+Rodar:
+  python -m bench                                  # matriz completa (100 .. 1M linhas, 10 .. 1000 pessoas)
+  python -m bench --rows 100,10000 --people 10     # recorte rápido
+  python -m bench --baseline bench/results/abc123.json --threshold 0.25
+  python -m bench --rows 100000 --people 100 --memory-budget-mb 300   # orçamento de memória
+  python -m pytest tests/test_memory_budget.py     # orçamento versionado (MEMORY_BUDGET_MB)
+
+O resultado vai para bench/results/<commit>.json (ou --out). Com --baseline,
+compara etapa a etapa e sai com código 1 se alguma ficar mais lenta que o limite.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from core.columnar import to_columnar
+from core.constants import INDICATORS, MEMPROFILE_FRAMES
+from core.data import latest_values, payload_to_df
+from core.instrumentation import TIMINGS
+from core.metrics import people_values
+from ui.dashboard import build_closer_ranking, build_sdr_ranking, build_slots
+from ui.render import render_dashboard
+
+from bench.synthetic import synthetic_payload
+
+_BASE_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = _BASE_DIR / "bench" / "results"
+
+DEFAULT_ROWS = (100, 10_000, 100_000, 1_000_000)
+DEFAULT_PEOPLE = (10, 100, 1000)
+
+# Etapas abaixo deste tempo (ms) não contam como regressão (ruído de medição)
+REGRESSION_NOISE_FLOOR_MS = 1.0
+
+# Orçamento de memória versionado: pico (maior etapa, tracemalloc) do caso
+# (linhas, pessoas) abaixo. Conferido por tests/test_memory_budget.py; medido
+# em ~16 MB (render_dashboard) — mexeu no pipeline e passou, revise aqui.
+MEMORY_BUDGET_CASE = (20_000, 100)
+MEMORY_BUDGET_MB = 32.0
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=_BASE_DIR, capture_output=True, text=True, timeout=10
+        )
+        return out.stdout.strip() or "unknown"
+    except Exception:
+        return "unknown"
+
+
+def _measure(fn: Callable[[], Any], repeat: int) -> tuple[Dict[str, float], Any]:
+    """
+    Roda fn `repeat` vezes; devolve (estatísticas em ms, último resultado).
+    Com tracemalloc ligado (--memory), inclui o pico alocado pela etapa (peak_kb).
+    """
+    samples: list[float] = []
+    peak_kb: Optional[float] = None
+    result = None
+    for _ in range(max(1, repeat)):
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            result = None  # não conta a saída da repetição anterior no pico
+            tracemalloc.reset_peak()
+            start = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+        if tracing:
+            kb = (tracemalloc.get_traced_memory()[1] - start) / 1024.0
+            peak_kb = kb if peak_kb is None else max(peak_kb, kb)
+    stats = {
+        "min_ms": round(min(samples), 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "max_ms": round(max(samples), 3),
+    }
+    if peak_kb is not None:
+        stats["peak_kb"] = round(peak_kb, 1)
+    return stats, result
+
+
+def run_case(rows: int, people: int, repeat: int, seed: int = 0) -> Dict[str, Any]:
+    """Mede todas as etapas para um payload sintético (rows x people)."""
+    payload = synthetic_payload(rows, people, seed=seed)
+    stages: Dict[str, Dict[str, float]] = {}
+
+    stages["payload_to_df"], (df, _, _) = _measure(lambda: payload_to_df(payload), repeat)
+    columnar = to_columnar(payload)
+    stages["payload_to_df_columnar"], _ = _measure(lambda: payload_to_df(columnar), repeat)
+    del columnar
+    stages["latest_values"], df_last = _measure(lambda: latest_values(df), repeat)
+    stages["people_values"], _ = _measure(
+        lambda: people_values(df_last, INDICATORS.REUNIOES_REAL, exclude_responsaveis=["SDR", "CLOSER"]), repeat
+    )
+    stages["ranking"], _ = _measure(lambda: (build_sdr_ranking(df_last), build_closer_ranking(df_last)), repeat)
+    stages["build_slots"], slots = _measure(lambda: build_slots(df_last), repeat)
+    stages["render_dashboard"], html = _measure(lambda: render_dashboard(slots), repeat)
+
+    case: Dict[str, Any] = {
+        "rows": rows,
+        "people": people,
+        "latest_rows": int(len(df_last)),
+        "html_bytes": len(html.encode("utf-8")),
+        "stages": stages,
+    }
+    if tracemalloc.is_tracing():
+        case["peak_kb"] = max(st.get("peak_kb", 0.0) for st in stages.values())
+    return case
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Lista de regressões (mediana > baseline * (1 + threshold)) por caso/etapa."""
+    base_cases = {(c["rows"], c["people"]): c for c in baseline.get("cases", [])}
+    problems: List[str] = []
+    for case in current.get("cases", []):
+        base = base_cases.get((case["rows"], case["people"]))
+        if not base:
+            continue
+        for stage, stats in case["stages"].items():
+            old = (base["stages"].get(stage) or {}).get("median_ms")
+            new = stats["median_ms"]
+            if old is None or new < REGRESSION_NOISE_FLOOR_MS:
+                continue
+            if new > old * (1.0 + threshold):
+                problems.append(
+                    f"{case['rows']} linhas x {case['people']} pessoas / {stage}: "
+                    f"{old:.2f} -> {new:.2f} ms (+{(new / old - 1) * 100:.0f}%)"
+                )
+    return problems
+
+
+def check_memory_budget(result: Dict[str, Any], budget_mb: float) -> List[str]:
+    """Casos cujo pico de memória (maior etapa) passou do orçamento."""
+    problems: List[str] = []
+    for case in result.get("cases", []):
+        peak_mb = case.get("peak_kb", 0.0) / 1024.0
+        if peak_mb > budget_mb:
+            worst = max(case["stages"].items(), key=lambda kv: kv[1].get("peak_kb", 0.0))[0]
+            problems.append(
+                f"{case['rows']} linhas x {case['people']} pessoas: pico {peak_mb:.1f} MB > {budget_mb:.1f} MB ({worst})"
+            )
+    return problems
+
+
+def _int_list(s: str) -> List[int]:
+    return [int(x.replace("_", "")) for x in s.split(",") if x.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline do dashboard com payloads sintéticos.")
+    parser.add_argument("--rows", type=_int_list, default=list(DEFAULT_ROWS), help="ex.: 100,10000,1000000")
+    parser.add_argument("--people", type=_int_list, default=list(DEFAULT_PEOPLE), help="ex.: 10,100,1000")
+    parser.add_argument("--repeat", type=int, default=3, help="repetições por etapa (usa a mediana)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, default=None, help="arquivo JSON (padrão: bench/results/<commit>.json)")
+    parser.add_argument("--baseline", type=Path, default=None, help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--threshold", type=float, default=0.25, help="regressão tolerada (0.25 = 25%% mais lento)")
+    parser.add_argument("--memory", action="store_true", help="mede o pico de memória por etapa (tracemalloc; deixa tudo mais lento)")
+    parser.add_argument("--memory-budget-mb", type=float, default=None, help="falha (código 1) se algum caso passar deste pico")
+    args = parser.parse_args(argv)
+    if args.memory_budget_mb is not None:
+        args.memory = True
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    TIMINGS.enabled = False  # mede o pipeline, não a instrumentação
+    if args.memory:
+        tracemalloc.start(MEMPROFILE_FRAMES)
+
+    commit = _git_commit()
+    result: Dict[str, Any] = {
+        "meta": {
+            "commit": commit,
+            "created_at": time.time(),
+            "python": sys.version.split()[0],
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "memory": bool(args.memory),  # com tracemalloc os tempos não são comparáveis
+        },
+        "cases": [],
+    }
+
+    for rows in args.rows:
+        for people in args.people:
+            case = run_case(rows, people, args.repeat, seed=args.seed)
+            result["cases"].append(case)
+            summary = "  ".join(f"{k}={v['median_ms']:.1f}ms" for k, v in case["stages"].items())
+            if "peak_kb" in case:
+                summary += f"  pico={case['peak_kb'] / 1024.0:.1f}MB"
+            logging.info("%8d linhas x %4d pessoas: %s", rows, people, summary)
+
+    out = args.out or RESULTS_DIR / f"{commit}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=2, ensure_ascii=False), encoding="utf-8")
+    logging.info("resultado: %s", out)
+
+    status = 0
+    if args.memory_budget_mb is not None:
+        over = check_memory_budget(result, args.memory_budget_mb)
+        if over:
+            logging.error("ACIMA DO ORÇAMENTO DE MEMÓRIA:\n  %s", "\n  ".join(over))
+            status = 1
+        else:
+            logging.info("pico de memória dentro do orçamento (%.1f MB)", args.memory_budget_mb)
+
+    if args.baseline:
+        problems = compare(result, json.loads(args.baseline.read_text(encoding="utf-8")), args.threshold)
+        if problems:
+            logging.error("REGRESSÕES (limite +%.0f%%):\n  %s", args.threshold * 100, "\n  ".join(problems))
+            return 1
+        logging.info("sem regressões em relação a %s (limite +%.0f%%)", args.baseline, args.threshold * 100)
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
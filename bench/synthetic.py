@@ -0,0 +1,90 @@
+"""
+Gerador de payloads sintéticos no mesmo formato do Apps Script WebApp.
+
+Reproduz a "sujeira" real do Sheets: números em pt-BR ("98.874,00", "0,1746",
+"500.000", "R$ 1.234,56", "15%"), NBSP / zero-width nos nomes, caixa variada,
+aliases ("MARIA EDUARDA" -> "MARIA", "JOAO"/"JOÃO") e várias linhas por
+(indicador, responsável) com DATA_ATUALIZAÇÃO diferentes (latest_values escolhe a última).
+"""
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from core.constants import INDICATORS
+
+# Indicadores que o dashboard lê (ordem estável)
+SYNTHETIC_INDICATORS: tuple[str, ...] = tuple(dict.fromkeys(vars(INDICATORS).values()))
+
+# Nomes reais/aliases primeiro (exercitam os caminhos de normalização)
+_BASE_NAMES = ("SDR", "CLOSER", "MARIA EDUARDA", "JOÃO", "JOAO", "NURY", "VICTOR", "LAURA", "CODRI", "MATHEUS")
+
+_NOISE = ("", " ", "\u00A0", "\u200B", "\uFEFF", "  ")
+
+
+def synthetic_people(n: int) -> List[str]:
+    """n responsáveis: os nomes conhecidos + 'PESSOA 0001'... até completar."""
+    names = list(_BASE_NAMES[:n])
+    names += [f"PESSOA {i:04d}" for i in range(1, n - len(names) + 1)]
+    return names
+
+
+def _noisy(name: str, rng: random.Random) -> str:
+    s = name if rng.random() < 0.7 else name.title()
+    return f"{rng.choice(_NOISE)}{s}{rng.choice(_NOISE)}"
+
+
+def _ptbr_value(rng: random.Random) -> Any:
+    kind = rng.randrange(7)
+    if kind == 0:
+        return f"{rng.randint(1, 999)}.{rng.randint(0, 999):03d},{rng.randint(0, 99):02d}"   # 98.874,00
+    if kind == 1:
+        return f"0,{rng.randint(0, 9999):04d}"                                               # 0,1746
+    if kind == 2:
+        return f"{rng.randint(1, 999)}.{rng.randint(0, 999):03d}"                            # 500.000
+    if kind == 3:
+        return f"R$ {rng.randint(1, 99)}.{rng.randint(0, 999):03d},{rng.randint(0, 99):02d}"
+    if kind == 4:
+        return f"{rng.randint(0, 100)}%"
+    if kind == 5:
+        return rng.randint(0, 500)
+    return round(rng.random(), 4)
+
+
+def synthetic_payload(
+    rows: int,
+    people: int,
+    seed: int = 0,
+    now: datetime | None = None,
+) -> Dict[str, Any]:
+    """
+    Payload com `rows` linhas distribuídas entre `people` responsáveis.
+
+    Linhas além de (people x indicadores) viram histórico do mesmo par com
+    DATA_ATUALIZAÇÃO mais antiga, como acontece quando a aba acumula registros.
+    """
+    rng = random.Random(seed)
+    now = now or datetime(2026, 10, 19, 13, 0, tzinfo=timezone.utc)
+    names = synthetic_people(people)
+    pairs = [(ind, name) for name in names for ind in SYNTHETIC_INDICATORS]
+
+    out: list[dict] = []
+    for i in range(rows):
+        ind, name = pairs[i % len(pairs)]
+        age = (rows - 1 - i) // len(pairs)  # 0 == linha mais recente do par
+        ts = now - timedelta(minutes=5 * age, seconds=rng.randint(0, 59))
+        out.append(
+            {
+                "INDICADORES": _noisy(ind, rng),
+                "RESPONSÁVEL": _noisy(name, rng),
+                "VALOR": _ptbr_value(rng),
+                "DATA_ATUALIZAÇÃO": ts.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            }
+        )
+
+    return {
+        "updatedAt": now.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        "sheet": "INDICADORES_COMERCIAL",
+        "rows": out,
+    }
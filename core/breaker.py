@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from core.constants import BREAKER_BACKOFF_BASE_SECONDS, BREAKER_BACKOFF_MAX_SECONDS, BREAKER_FAILURE_THRESHOLD
+
+log = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker do fetch do Apps Script.
+
+    - CLOSED: chamadas normais; `failure_threshold` falhas seguidas (erro HTTP,
+      timeout, payload de erro, resposta lenta) abrem o circuito.
+    - OPEN: ninguém chama o endpoint em primeiro plano (as sessões servem o
+      último snapshot bom); uma thread de sondagem tenta de novo com backoff
+      exponencial (base, 2x, 4x... até o máximo).
+    - HALF_OPEN: sondagem em andamento; sucesso fecha, falha reabre.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        backoff_base: float = BREAKER_BACKOFF_BASE_SECONDS,
+        backoff_max: float = BREAKER_BACKOFF_MAX_SECONDS,
+        name: str = "fetch",
+    ):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.backoff_base = float(backoff_base)
+        self.backoff_max = float(backoff_max)
+        self.name = name
+
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.next_probe_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._backoff = self.backoff_base
+        self._prober: Optional[threading.Thread] = None
+
+    # -------------------------
+    # Estado
+    # -------------------------
+    def allow(self) -> bool:
+        """Pode chamar o endpoint agora? (só com o circuito fechado)"""
+        return self.state == CLOSED
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != CLOSED:
+                log.info("circuito %s fechado (endpoint respondeu)", self.name)
+            self.state = CLOSED
+            self.failures = 0
+            self.opened_at = None
+            self.next_probe_at = None
+            self.last_error = None
+            self._backoff = self.backoff_base
+
+    def record_failure(self, error: BaseException | str) -> bool:
+        """Conta uma falha. True se o circuito (re)abriu agora."""
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error)[:300]
+            if self.state == CLOSED and self.failures < self.failure_threshold:
+                return False
+            if self.state == OPEN:
+                return False
+            self.state = OPEN
+            self.opened_at = self.opened_at or time.time()
+            log.warning("circuito %s aberto após %s falha(s): %s", self.name, self.failures, self.last_error)
+            return True
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "opened_at": self.opened_at,
+            "next_probe_at": self.next_probe_at,
+            "last_error": self.last_error,
+        }
+
+    # -------------------------
+    # Sondagem em background
+    # -------------------------
+    def ensure_probing(self, probe: Callable[[], Any], on_success: Callable[[Any], None]) -> None:
+        """Garante UMA thread sondando o endpoint enquanto o circuito estiver aberto."""
+        with self._lock:
+            if self.state == CLOSED or (self._prober is not None and self._prober.is_alive()):
+                return
+            self._prober = threading.Thread(
+                target=self._probe_loop, args=(probe, on_success), name=f"breaker-{self.name}", daemon=True
+            )
+            self._prober.start()
+
+    def _probe_loop(self, probe: Callable[[], Any], on_success: Callable[[Any], None]) -> None:
+        while self.state != CLOSED:
+            with self._lock:
+                delay = self._backoff
+                self.next_probe_at = time.time() + delay
+            time.sleep(delay)
+
+            with self._lock:
+                self.state = HALF_OPEN
+            try:
+                result = probe()
+            except Exception as e:
+                with self._lock:
+                    self.state = OPEN
+                    self.failures += 1
+                    self.last_error = str(e)[:300]
+                    self._backoff = min(self._backoff * 2, self.backoff_max)
+                log.info("sondagem %s falhou (próxima em %ss): %s", self.name, int(self._backoff), e)
+                continue
+
+            self.record_success()
+            try:
+                on_success(result)
+            except Exception:
+                log.exception("callback de recuperação do circuito %s falhou", self.name)
@@ -0,0 +1,108 @@
+"""
+Formato colunar do payload (alternativa a "rows" como lista de dicts).
+
+  {"format": "columnar", "updatedAt": ..., "sheet": ...,
+   "columns": ["INDICADORES", "RESPONSÁVEL", "VALOR", "DATA_ATUALIZAÇÃO"],
+   "dictionaries": {"INDICADORES": ["LEADS CRIADOS", ...], "RESPONSÁVEL": ["NURY", ...]},
+   "data": [[0, 0, 1, ...], [3, 1, 3, ...], ["98.874,00", ...], ["2026-10-19T13:00:00.000Z", ...]]}
+
+Os nomes das colunas vão uma vez; "data" traz um array por coluna, na ordem
+de "columns". Colunas em "dictionaries" vêm como códigos inteiros para a
+lista de valores distintos — a normalização de nomes roda uma vez por valor
+distinto, não por linha. Resposta colunar é sempre completa (deltas vêm em
+"rows" e core/delta.py os mescla nas colunas).
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+COLUMNAR_FORMAT = "columnar"
+
+# Colunas codificadas por dicionário no encoder (nomes muito repetidos)
+DICTIONARY_COLUMNS = ("INDICADORES", "RESPONSÁVEL")
+
+
+def is_columnar(payload: Dict[str, Any]) -> bool:
+    """Payload no formato colunar (detecção pelo formato dos campos, "format" é opcional)."""
+    return (
+        isinstance(payload, dict)
+        and "rows" not in payload
+        and isinstance(payload.get("columns"), list)
+        and isinstance(payload.get("data"), list)
+    )
+
+
+class Column:
+    """Uma coluna do payload colunar: valores crus ou códigos + dicionário."""
+
+    __slots__ = ("values", "codes", "dictionary")
+
+    def __init__(self, values: List[Any], dictionary: Optional[List[Any]] = None):
+        self.dictionary = dictionary
+        if dictionary is None:
+            self.values = values
+            self.codes = None
+        else:
+            self.values = None
+            # códigos já tipados (streaming: int32) são usados sem cópia
+            is_int = isinstance(values, np.ndarray) and values.dtype.kind in "iu"
+            self.codes = values if is_int else np.asarray(values, dtype=np.intp)
+
+    @property
+    def is_float(self) -> bool:
+        """Valores já convertidos para float64 (streaming) — dispensa o parse."""
+        return self.codes is None and isinstance(self.values, np.ndarray) and self.values.dtype.kind == "f"
+
+    def __len__(self) -> int:
+        return len(self.values) if self.codes is None else len(self.codes)
+
+    def expand(self, fn: Optional[Callable[[Any], Any]] = None) -> np.ndarray | List[Any]:
+        """Valores por linha; com dicionário, `fn` roda uma vez por valor distinto."""
+        if self.codes is None:
+            return self.values if fn is None else [fn(v) for v in self.values]
+        uniq = self.dictionary if fn is None else [fn(v) for v in self.dictionary]
+        table = np.empty(len(uniq), dtype=object)
+        table[:] = uniq
+        return table[self.codes]
+
+
+def columnar_columns(payload: Dict[str, Any]) -> Dict[str, Column]:
+    """Colunas do payload colunar, na ordem de "columns"."""
+    names = payload.get("columns") or []
+    data = payload.get("data") or []
+    if len(names) != len(data):
+        raise ValueError(f"Payload colunar inválido: {len(names)} colunas e {len(data)} arrays.")
+    dictionaries = payload.get("dictionaries") or {}
+    cols = {name: Column(values, dictionaries.get(name)) for name, values in zip(names, data)}
+    lengths = {len(c) for c in cols.values()}
+    if len(lengths) > 1:
+        raise ValueError(f"Payload colunar inválido: arrays com tamanhos diferentes {sorted(lengths)}.")
+    return cols
+
+
+def columnar_length(payload: Dict[str, Any]) -> int:
+    data = payload.get("data") or []
+    return len(data[0]) if data else 0
+
+
+def to_columnar(payload: Dict[str, Any], dictionary_columns: tuple[str, ...] = DICTIONARY_COLUMNS) -> Dict[str, Any]:
+    """Converte um payload em "rows" para o formato colunar (endpoint local/benchmark)."""
+    rows = payload.get("rows") or []
+    names: List[str] = list(dict.fromkeys(k for row in rows for k in row))
+
+    data: List[List[Any]] = []
+    dictionaries: Dict[str, List[Any]] = {}
+    for name in names:
+        values = [row.get(name) for row in rows]
+        if name in dictionary_columns:
+            index: Dict[Any, int] = {}
+            data.append([index.setdefault(v, len(index)) for v in values])
+            dictionaries[name] = list(index)
+        else:
+            data.append(values)
+
+    out = {k: v for k, v in payload.items() if k != "rows"}
+    out.update({"format": COLUMNAR_FORMAT, "columns": names, "dictionaries": dictionaries, "data": data})
+    return out
@@ -3,8 +3,107 @@ from dataclasses import dataclass
 # =========================
 # Config central
 # =========================
-REFRESH_MS = 600_000         # 5 min em ms
-CACHE_TTL_SECONDS = 250     # 250s (4 min e 10s)
+REFRESH_MS = 300_000         # 5 min em ms (intervalo inicial do agendador de polling)
+CACHE_TTL_SECONDS = 25      # 25s: só agrupa chamadas simultâneas; < POLL_MIN_SECONDS
+
+# Agendador de polling adaptativo (core/scheduler.py): mede o intervalo entre
+# mudanças do payload e busca ~2x por mudança, dentro dos limites abaixo.
+# Horário comercial (seg-sex, BUSINESS_HOURS no fuso TIMEZONE) busca mais;
+# noite e fim de semana recuam até POLL_OFFHOURS_MAX_SECONDS.
+BUSINESS_HOURS = (8, 19)              # [início, fim) em horas locais
+POLL_MIN_SECONDS = 60
+POLL_MAX_SECONDS = 600                # teto no horário comercial
+POLL_OFFHOURS_MIN_SECONDS = 600
+POLL_OFFHOURS_MAX_SECONDS = 3600
+POLL_GAP_FRACTION = 0.5               # intervalo = fração do tempo típico entre mudanças
+POLL_BACKOFF_FACTOR = 1.5             # recuo por poll sem mudança além do esperado
+POLL_HISTORY = 50                     # polls na janela do hit rate
+
+# Circuit breaker do fetch (core/breaker.py): após N falhas seguidas a TV
+# segue com o último snapshot bom (selo "desatualizado") e o endpoint é
+# sondado em background com backoff exponencial (base, 2x, 4x... até o máximo).
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_BACKOFF_BASE_SECONDS = 30
+BREAKER_BACKOFF_MAX_SECONDS = 600
+
+# Prazo do fetch feito durante o render (sessões/TVs): headers + corpo inteiro.
+# Resposta que chega mas demora mais que FETCH_SLOW_SECONDS também conta como
+# falha do circuito — endpoint lento passa a ser buscado só em background.
+FETCH_TIMEOUT_SECONDS = 8
+FETCH_SLOW_SECONDS = 5
+# Sondagem do circuito aberto e loops de background (kiosk_server, export_static)
+FETCH_BACKGROUND_TIMEOUT_SECONDS = 60
+
+# Webhook do Apps Script (core/webhook.py): POST /webhook com o token
+# SHEETS_WEBHOOK_TOKEN (header X-Webhook-Token, ?token= ou {"token": ...})
+# invalida o cache do payload e dispara UMA atualização para todas as telas.
+WEBHOOK_HOST = "0.0.0.0"
+WEBHOOK_PORT = 8503
+WEBHOOK_DEBOUNCE_SECONDS = 3      # agrupa rajadas de onEdit numa só atualização
+
+# Protocolo delta (core/delta.py): endpoints que devolvem "version" recebem
+# ?since=<versão> e respondem só as linhas alteradas; False sempre busca tudo.
+DELTA_ENABLED = True
+
+# Respostas completas são lidas em streaming (core/streaming.py) direto para
+# colunas tipadas, em blocos deste tamanho; False volta para resp.json().
+STREAM_INGEST = True
+STREAM_CHUNK_BYTES = 256 * 1024
+
+# Validação feita durante a ingestão (core/validate.py): linhas ruins são
+# contadas por problema e até este número de exemplos vai para o log/relatório.
+VALIDATION_SAMPLE_SIZE = 5
+
+# O watcher de cada sessão confere o snapshot do processo neste intervalo
+# (sem rede): atualizações vindas do webhook chegam às TVs em segundos.
+SNAPSHOT_CHECK_SECONDS = 5
+
+# Sem dados ainda (endpoint fora na 1ª carga ou secrets ausentes): a página de
+# erro tenta um run completo de novo neste intervalo, sem depender de reload.
+COLD_START_RETRY_SECONDS = 30
+
+# Fuso usado para "hoje", "semana", "mês" etc. (e de DATA_ATUALIZAÇÃO sem fuso)
+TIMEZONE = "America/Sao_Paulo"
+
+# DATA_ATUALIZAÇÃO já convertidas ficam em cache entre payloads (core/timestamps.py)
+TIMESTAMP_CACHE_SIZE = 100_000
+
+# Histórico local (SQLite) de todos os payloads buscados
+HISTORY_ENABLED = True
+HISTORY_DB_PATH = "data/history.sqlite3"   # relativo à raiz do projeto
+HISTORY_RETENTION_DAYS = 730               # ~2 anos
+
+# Crescimento dos KPIs (badge "PERC CRESCIMENTO ..."):
+# - "local": calcula do histórico (core/metrics.py::growth_table); se ainda não houver
+#   histórico suficiente, cai no valor que vem do Sheets
+# - "sheet": usa sempre o valor pré-calculado do Sheets
+GROWTH_SOURCE = "local"
+GROWTH_PERIOD = "month"   # "day" | "week" | "month" | "quarter"
+
+# Sparklines dos KPIs: máximo de pontos desenhados (downsampling LTTB)
+SPARKLINE_POINTS = 48
+
+# Tempos por etapa (core/instrumentation.py): janela móvel por etapa.
+# Overlay na TV: abrir o app com ?timings=1
+TIMINGS_ENABLED = True
+TIMINGS_WINDOW = 500
+
+# Profiling de memória (core/memprofile.py, tracemalloc): desligado por padrão.
+# Liga com ?memprofile=1 (overlay) ou DASH_MEMPROFILE=1 no ambiente.
+MEMPROFILE_TOP_N = 15     # locais de alocação listados por rerun
+MEMPROFILE_FRAMES = 1     # profundidade do traceback guardado (1 = mais barato)
+
+# Métricas estilo Prometheus (core/telemetry.py): endpoint local /metrics.
+# METRICS_PORT = None desliga o endpoint no app Streamlit (o kiosk_server
+# expõe /metrics na própria porta; o export_static grava com --metrics-file).
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9108
+
+# cProfile de um rerun (?profile=1): .pstats em PROFILE_DIR + top-N no overlay
+PROFILE_DIR = "data/profiles"   # relativo à raiz do projeto
+PROFILE_TOP_N = 25
+# Uma captura por vez no processo; uma que passe disto foi abandonada (sessão fechada)
+PROFILE_MAX_SECONDS = 120
 
 @dataclass(frozen=True)
 class _Indicators:
@@ -35,3 +134,15 @@ class _Indicators:
     PERC_FATURAMENTO_PAGO: str = "PERC FATURAMENTO PAGO"
 
 INDICATORS = _Indicators()
+
+# Indicadores aditivos (contadores/valores acumulados no mês, zeram no dia 1).
+# No cubo por período (core/cube.py) eles somam os incrementos do período;
+# os demais (metas, percentuais, taxas) usam o último valor observado.
+ADDITIVE_INDICATORS = frozenset({
+    INDICATORS.REUNIOES_REAL,
+    INDICATORS.FAT_REAL,
+    INDICATORS.FAT_FALLBACK_REAL,
+    INDICATORS.LEADS_CRIADOS,
+    INDICATORS.CONTRATOS_ASSINADOS,
+    INDICATORS.FATURAMENTO_ASSINADO,
+})
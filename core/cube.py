@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import logging
+import math
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterable, Optional, Tuple
+
+import pandas as pd
+
+from core.constants import ADDITIVE_INDICATORS, HISTORY_ENABLED
+from core.history import get_history_store
+from core.periods import PERIODS, now_local, period_start, previous_period_start
+from core.snapshot import DashboardSnapshot
+
+log = logging.getLogger(__name__)
+
+_Key = Tuple[str, str]
+
+
+@dataclass
+class _Cell:
+    bucket: datetime         # início do bucket a que o valor pertence
+    value: Optional[float]   # aditivo: soma dos incrementos no bucket | demais: último valor
+
+
+def _as_float(v) -> Optional[float]:
+    try:
+        f = float(v)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(f) else f
+
+
+class IndicatorCube:
+    """
+    Agregados pré-calculados por (INDICADORES, RESPONSÁVEL, período).
+
+    Mantido incrementalmente a cada snapshot (ingest), então trocar de período
+    ("day", "week", "month", "quarter") é um lookup em dict, não uma varredura.
+
+    - Indicadores aditivos (contadores/valores do mês, ex.: REUNIÕES OCORRIDAS):
+      acumulamos os incrementos entre snapshots em cada bucket. Os contadores do
+      Sheets são "do mês" (zeram no dia 1), então na virada de mês o novo valor
+      inteiro conta como incremento.
+    - Demais (metas, percentuais, taxas): último valor observado no bucket.
+    """
+
+    def __init__(self, additive: Iterable[str] = ADDITIVE_INDICATORS, periods: Iterable[str] = PERIODS):
+        self.additive = frozenset(additive)
+        self.periods = tuple(periods)
+        self.version: Optional[str] = None
+
+        self._lock = threading.Lock()
+        self._last: dict[_Key, Tuple[float, Optional[datetime]]] = {}  # último valor + mês
+        self._cells: dict[Tuple[str, str, str], _Cell] = {}
+        self._people: dict[str, set[str]] = {}
+
+    # -------------------------
+    # Manutenção incremental
+    # -------------------------
+    def _buckets(self, at: datetime) -> dict[str, datetime]:
+        return {period: period_start(period, at) for period in self.periods}
+
+    def _observe(self, ind: str, resp: str, value: float, buckets: dict[str, datetime]) -> None:
+        key = (ind, resp)
+        month = buckets.get("month")
+        prev = self._last.get(key)
+        self._last[key] = (value, month)
+        self._people.setdefault(ind, set()).add(resp)
+
+        if ind not in self.additive:
+            for period, bucket in buckets.items():
+                self._cells[(ind, resp, period)] = _Cell(bucket, value)
+            return
+
+        seeded = prev is None
+        if seeded:
+            delta = value
+        else:
+            prev_value, prev_month = prev
+            # contador do mês reiniciou: o valor novo inteiro é incremento
+            delta = value if prev_month != month else value - prev_value
+
+        for period, bucket in buckets.items():
+            cell = self._cells.get((ind, resp, period))
+            if cell is None or cell.bucket != bucket:
+                cell = self._cells[(ind, resp, period)] = _Cell(bucket, 0.0)
+            # 1ª observação: não sabemos QUANDO no mês o valor acumulou,
+            # então ele só entra nos buckets que cobrem o mês inteiro
+            if seeded and period in ("day", "week"):
+                continue
+            cell.value = (cell.value or 0.0) + delta
+
+    def _buckets_at(self, cache: dict, ts) -> dict[str, datetime]:
+        buckets = cache.get(ts)
+        if buckets is None:
+            at = ts.to_pydatetime() if isinstance(ts, pd.Timestamp) else ts
+            buckets = cache[ts] = self._buckets(at)
+        return buckets
+
+    def ingest(self, df_latest: pd.DataFrame, at: Optional[datetime] = None, version: Optional[str] = None) -> None:
+        """
+        Aplica um snapshot (df de latest_values).
+
+        Mesma base de tempo do histórico (e do replay): cada linha cai no bucket
+        da sua DATA_ATUALIZAÇÃO; `at` (instante da busca) só vale para linhas
+        sem data. Valor igual ao último observado não é observação nova — o
+        histórico também só grava mudanças.
+        """
+        if df_latest is None or df_latest.empty:
+            return
+        fallback = at or now_local()
+        if "DATA_ATUALIZAÇÃO" in df_latest.columns:
+            stamps = df_latest["DATA_ATUALIZAÇÃO"].tolist()
+        else:
+            stamps = [None] * len(df_latest)
+        buckets_by_ts: dict = {}
+        with self._lock:
+            if version is not None and version == self.version:
+                return
+            for ind, resp, v, ts in zip(
+                df_latest["INDICADORES"].tolist(),
+                df_latest["RESPONSÁVEL"].tolist(),
+                df_latest["VALOR"].tolist(),
+                stamps,
+            ):
+                value = _as_float(v)
+                if value is None:
+                    continue
+                ind, resp = str(ind), str(resp)
+                last = self._last.get((ind, resp))
+                if last is not None and last[0] == value:
+                    continue
+                when = fallback if ts is None or pd.isna(ts) else ts
+                self._observe(ind, resp, value, self._buckets_at(buckets_by_ts, when))
+            if version is not None:
+                self.version = version
+
+    def replay(self, history: pd.DataFrame) -> None:
+        """Reconstrói a partir do histórico (HistoryStore.frame), em ordem de ts."""
+        if history is None or history.empty:
+            return
+        h = history.sort_values("ts", kind="stable")
+        buckets_by_ts: dict = {}
+        with self._lock:
+            for ts, ind, resp, v in zip(
+                h["ts"].tolist(), h["INDICADORES"].tolist(), h["RESPONSÁVEL"].tolist(), h["VALOR"].tolist()
+            ):
+                value = _as_float(v)
+                if value is None:
+                    continue
+                self._observe(str(ind), str(resp), value, self._buckets_at(buckets_by_ts, ts))
+
+    # -------------------------
+    # Consultas
+    # -------------------------
+    def value(self, indicador: str, responsavel: str, period: str, now: Optional[datetime] = None) -> Optional[float]:
+        """Valor do indicador/responsável no período corrente (lookup O(1))."""
+        key = (indicador, responsavel)
+        last = self._last.get(key)
+        if last is None:
+            return None
+
+        cell = self._cells.get((indicador, responsavel, period))
+        if cell is not None and cell.bucket == period_start(period, now):
+            return cell.value
+        # nenhum snapshot neste período ainda
+        return 0.0 if indicador in self.additive else last[0]
+
+    def total(
+        self,
+        indicador: str,
+        period: str,
+        prefer_responsavel: Optional[str] = None,
+        exclude_responsaveis: Optional[Iterable[str]] = None,
+        now: Optional[datetime] = None,
+    ) -> Optional[float]:
+        """Mesma regra de total_for_indicator, lendo do cubo."""
+        if prefer_responsavel and (indicador, prefer_responsavel) in self._last:
+            return self.value(indicador, prefer_responsavel, period, now)
+
+        excl = set(exclude_responsaveis or ())
+        vals = [
+            self.value(indicador, resp, period, now)
+            for resp in self._people.get(indicador, ())
+            if resp not in excl
+        ]
+        vals = [v for v in vals if v is not None]
+        return float(sum(vals)) if vals else None
+
+
+_CUBE: Optional[IndicatorCube] = None
+_CUBE_LOCK = threading.Lock()
+
+
+def get_cube() -> IndicatorCube:
+    """
+    Cubo único do processo. Na 1ª chamada é reconstruído do histórico local
+    (desde o início do trimestre anterior), depois só recebe snapshots novos.
+    """
+    global _CUBE
+    if _CUBE is None:
+        with _CUBE_LOCK:
+            if _CUBE is None:
+                cube = IndicatorCube()
+                if HISTORY_ENABLED:
+                    try:
+                        since = previous_period_start("quarter").timestamp()
+                        cube.replay(get_history_store().frame(since=since))
+                    except Exception:
+                        log.exception("falha ao reconstruir o cubo do histórico (começando vazio)")
+                _CUBE = cube
+    return _CUBE
+
+
+def ingest_snapshot(snapshot: DashboardSnapshot) -> None:
+    """Listener do SnapshotStore: aplica cada snapshot novo no cubo (built_at = fallback sem DATA_ATUALIZAÇÃO)."""
+    at = datetime.fromtimestamp(snapshot.built_at, tz=timezone.utc)
+    get_cube().ingest(snapshot.df_last, at=at, version=snapshot.fingerprint)
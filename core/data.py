@@ -1,141 +1,407 @@
 from __future__ import annotations
 
+import logging
+import threading
+import time
+from dataclasses import dataclass
 from typing import Any, Dict, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 import requests
 import streamlit as st
-import re
 
-from core.normalize import norm_text as _norm_text_no_alias
+from core.breaker import CircuitBreaker
+from core.columnar import Column, columnar_columns, columnar_length, is_columnar
+from core.constants import (
+    DELTA_ENABLED,
+    FETCH_BACKGROUND_TIMEOUT_SECONDS,
+    FETCH_SLOW_SECONDS,
+    FETCH_TIMEOUT_SECONDS,
+    STREAM_CHUNK_BYTES,
+    STREAM_INGEST,
+)
+from core.cube import get_cube
+from core.delta import DELTA
+from core.instrumentation import span, timed
+from core.names import RESPONSAVEL_ID, NameIndex, canonical_name, name_index, responsavel_ids
+from core.normalize import norm_text
+from core.normalize import parse_number as _parse_number
+from core.streaming import StreamError, stream_payload
+from core.telemetry import (
+    FETCH_LATENCY,
+    FETCH_STATUS,
+    PARSE_SECONDS,
+    PAYLOAD_BAD_ROWS,
+    PAYLOAD_ROWS,
+    record_cache_result,
+)
+from core.timestamps import parse_timestamps, parse_unique
+from core.validate import EXPECTED_ROW_KEYS, REQUIRED_ROW_KEYS, ValidationReport, ingest_rows
+
+log = logging.getLogger(__name__)
 
-_CLEAN_INVISIBLE_RE = re.compile(r"[\u200B-\u200F\uFEFF\u00AD]")
+def _safe_json(resp: requests.Response) -> Dict[str, Any]:
+    try:
+        return resp.json()
+    except Exception:
+        return {
+            "error": "Resposta não-JSON do endpoint",
+            "status_code": resp.status_code,
+            "text": resp.text[:400],
+        }
 
-# ✅ aliases globais de responsáveis (já em UPPER)
-_RESPONSAVEL_ALIASES = {
-    "MARIA EDUARDA": "MARIA",
-}
 
-def _norm_text(s: object) -> str:
-    """
-    Normaliza texto vindo do Sheets:
-    - remove invisíveis (zero-width, BOM, soft hyphen)
-    - troca NBSP por espaço
-    - colapsa espaços
-    - strip + UPPER
-    - aplica aliases (ex.: 'MARIA EDUARDA' -> 'MARIA')
-    """
-    s = "" if s is None else str(s)
-    s = _CLEAN_INVISIBLE_RE.sub("", s)
-    s = s.replace("\u00A0", " ")  # NBSP
-    s = " ".join(s.split())       # colapsa whitespace
-    s = s.strip().upper()
+def _until(chunks, deadline: float, timeout: float):
+    """Blocos do corpo até `deadline` (o timeout do requests vale por leitura, não para o total)."""
+    for chunk in chunks:
+        if time.perf_counter() > deadline:
+            raise requests.Timeout(f"corpo da resposta não chegou em {timeout:g}s")
+        yield chunk
+
 
-    # ✅ aplica alias depois de normalizar
-    return _RESPONSAVEL_ALIASES.get(s, s)
+def _stream_json(resp: requests.Response, deadline: float, timeout: float) -> Dict[str, Any]:
+    """Como _safe_json, mas lendo o corpo em blocos (core/streaming.py) dentro do prazo."""
+    try:
+        chunks = _until(resp.iter_content(chunk_size=STREAM_CHUNK_BYTES), deadline, timeout)
+        return stream_payload(chunks, _parse_number, ValidationReport)
+    except StreamError as e:
+        return {
+            "error": "Resposta não-JSON do endpoint",
+            "status_code": resp.status_code,
+            "text": e.head[:400],
+        }
+    finally:
+        resp.close()
 
-def _parse_number(v: object) -> float | None:
-    """Converte número vindo do Sheets/JSON para float.
 
-    Suporta strings em pt-BR (ex.: "98.874,00", "0,1746", "500.000") e também
-    valores já numéricos.
+def fetch_payload_uncached(
+    url: str,
+    token: str,
+    timeout: float = FETCH_BACKGROUND_TIMEOUT_SECONDS,
+    since: Optional[str] = None,
+    stream: bool = STREAM_INGEST,
+) -> Dict[str, Any]:
     """
-    if v is None:
-        return None
+    Busca o JSON do Apps Script WebApp sem cache (uso fora do Streamlit).
 
-    if isinstance(v, (int, float)):
+    stream=True lê respostas completas em blocos direto para colunas tipadas
+    (payload colunar); respostas delta (since) são pequenas e vêm inteiras.
+    `timeout` limita a resposta inteira no streaming (headers + corpo).
+    """
+    params = {"token": token} if since is None else {"token": token, "since": since}
+    stream = stream and since is None
+    t0 = time.perf_counter()
+    with span("fetch"):
         try:
-            return float(v)
-        except Exception:
-            return None
-
-    s = str(v).strip()
-    if not s or s == "-":
-        return None
-
-    s = s.replace("R$", "").replace("%", "").strip()
-    s = s.replace("\u00A0", " ")
-    s = s.replace(" ", "")
-
-    # mantém apenas dígitos, sinal e separadores
-    m = re.search(r"-?[\d\.,]+", s)
-    if not m:
-        return None
-    num = m.group(0)
+            r = requests.get(url, params=params, timeout=timeout, stream=stream)
+        except requests.RequestException:
+            FETCH_LATENCY.observe(time.perf_counter() - t0)
+            FETCH_STATUS.inc(code="error")
+            raise
+        # com stream=True o get volta assim que chegam os headers: a latência
+        # só é medida depois de ler o corpo inteiro (o download é o que pesa)
+        try:
+            FETCH_STATUS.inc(code=str(r.status_code))
+            if not r.ok:
+                r.close()
+            r.raise_for_status()
+            return _stream_json(r, t0 + timeout, timeout) if stream else _safe_json(r)
+        finally:
+            FETCH_LATENCY.observe(time.perf_counter() - t0)
 
-    if "." in num and "," in num:
-        # se a última vírgula vem depois do último ponto, vírgula é decimal
-        if num.rfind(",") > num.rfind("."):
-            num = num.replace(".", "").replace(",", ".")
-        else:
-            num = num.replace(",", "")
-    elif "," in num and "." not in num:
-        # vírgula como decimal
-        num = num.replace(".", "").replace(",", ".")
-    else:
-        # somente pontos: pode ser decimal OU milhar ("500.000")
-        parts = num.split(".")
-        if len(parts) > 1 and all(p.isdigit() for p in parts) and len(parts[-1]) == 3:
-            num = "".join(parts)
 
-    try:
-        return float(num)
-    except Exception:
-        return None
+def fetch_payload_incremental(url: str, token: str, timeout: float = FETCH_BACKGROUND_TIMEOUT_SECONDS) -> Dict[str, Any]:
+    """
+    fetch_payload_uncached com o protocolo delta (core/delta.py): endpoints
+    versionados mandam só as linhas alteradas desde a última busca, que são
+    mescladas no índice de últimos valores. Endpoints antigos seguem iguais.
+    """
+    if not DELTA_ENABLED:
+        return fetch_payload_uncached(url, token, timeout)
+    return DELTA.fetch(url, lambda since: fetch_payload_uncached(url, token, timeout, since=since))
 
 
-def _safe_json(resp: requests.Response) -> Dict[str, Any]:
-    try:
-        return resp.json()
-    except Exception:
-        return {
-            "error": "Resposta não-JSON do endpoint",
-            "status_code": resp.status_code,
-            "text": resp.text[:400],
-        }
+# marca (por thread) se a última chamada a fetch_payload executou o fetch de verdade
+_cache_probe = threading.local()
 
 
 def fetch_payload(url: str, token: str, ttl_seconds: int = 4) -> Dict[str, Any]:
     """
     Busca o JSON do Apps Script WebApp.
     Cache (TTL) é aplicado aqui pra reduzir a carga e evitar rate-limit.
+
+    cache_resource (e não cache_data): todas as sessões recebem o MESMO objeto,
+    sem pickle/unpickle a cada hit. O payload deve ser tratado como somente leitura.
     """
 
-    @st.cache_data(ttl=ttl_seconds, show_spinner=False)
+    @st.cache_resource(ttl=ttl_seconds, show_spinner=False)
     def _fetch(_url: str, _token: str) -> Dict[str, Any]:
-        r = requests.get(_url, params={"token": _token}, timeout=60)
-        r.raise_for_status()
-        return _safe_json(r)
+        _cache_probe.miss = True
+        # roda durante o render de alguma sessão: prazo curto
+        return fetch_payload_incremental(_url, _token, timeout=FETCH_TIMEOUT_SECONDS)
+
+    _cache_probe.miss = False
+    payload = _fetch(url, token)
+    record_cache_result(hit=not _cache_probe.miss)
+    return payload
+
+
+
+# =========================
+# Fetch protegido (circuit breaker + último payload bom)
+# =========================
+@dataclass(frozen=True)
+class FetchResult:
+    """Payload a exibir + se ele é o último bom (stale) por falha/circuito aberto."""
+    payload: Dict[str, Any]
+    stale: bool
+    fetched_at: Optional[float]   # epoch em que esse payload veio do endpoint
+    error: Optional[str] = None
+    breaker_state: str = "closed"
 
-    return _fetch(url, token)
+    def status(self) -> Dict[str, Any]:
+        """Estado para o selo de "dados desatualizados" do template."""
+        return {"stale": self.stale, "since": self.fetched_at, "error": self.error, "state": self.breaker_state}
 
 
+def _is_error_payload(payload: Dict[str, Any]) -> bool:
+    return "error" in payload and "rows" not in payload
+
+
+class _LastGood:
+    def __init__(self) -> None:
+        self.payload: Optional[Dict[str, Any]] = None
+        self.fetched_at: Optional[float] = None
+
+    def update(self, payload: Dict[str, Any], fetched_at: Optional[float] = None) -> None:
+        if self.payload is not payload:
+            self.payload = payload
+            self.fetched_at = fetched_at or time.time()
+
+
+_LAST_GOOD = _LastGood()
+FETCH_BREAKER = CircuitBreaker(name="apps-script")
+
+
+_LAST_RESULT: Optional[FetchResult] = None
+
+
+def _remember(result: FetchResult) -> FetchResult:
+    global _LAST_RESULT
+    _LAST_RESULT = result
+    return result
+
+
+def last_fetch_result() -> Optional[FetchResult]:
+    """Resultado da última busca do processo (para sessões que não buscaram neste tick)."""
+    return _LAST_RESULT
+
+
+def _slow_message(elapsed: float) -> str:
+    return f"resposta lenta ({elapsed:.1f}s > {FETCH_SLOW_SECONDS}s)"
+
+
+def fetch_payload_guarded(url: str, token: str, ttl_seconds: int = 4) -> FetchResult:
+    """
+    fetch_payload com circuit breaker.
+
+    Falhas (HTTP, timeout de FETCH_TIMEOUT_SECONDS, payload de erro) não
+    derrubam a TV: devolvemos o último payload bom com stale=True. Resposta
+    boa mas mais lenta que FETCH_SLOW_SECONDS é usada, porém conta como falha.
+    Após BREAKER_FAILURE_THRESHOLD falhas o circuito abre, as sessões param de
+    chamar o endpoint e uma thread sonda em background (prazo longo) com
+    backoff; sondagem lenta atualiza o último payload bom mas mantém o circuito
+    aberto. Só levanta exceção se ainda não houver nenhum payload bom no
+    processo (primeira carga).
+    """
+
+    def _stale(err: Optional[str]) -> FetchResult:
+        if _LAST_GOOD.payload is None:
+            raise RuntimeError(err or "endpoint indisponível")
+        return _remember(FetchResult(_LAST_GOOD.payload, True, _LAST_GOOD.fetched_at, err, FETCH_BREAKER.state))
+
+    def _probe() -> Dict[str, Any]:
+        t0 = time.perf_counter()
+        payload = fetch_payload_incremental(url, token, timeout=FETCH_BACKGROUND_TIMEOUT_SECONDS)
+        if _is_error_payload(payload):
+            raise RuntimeError(f"Endpoint retornou erro: {payload}")
+        elapsed = time.perf_counter() - t0
+        if elapsed > FETCH_SLOW_SECONDS:
+            # dado bom, mas lento demais para o render: atualiza e segue em background
+            _LAST_GOOD.update(payload)
+            raise RuntimeError(_slow_message(elapsed))
+        return payload
+
+    if not FETCH_BREAKER.allow():
+        FETCH_BREAKER.ensure_probing(_probe, _LAST_GOOD.update)
+        return _stale(FETCH_BREAKER.last_error)
+
+    t0 = time.perf_counter()
+    try:
+        payload = fetch_payload(url, token, ttl_seconds=ttl_seconds)
+        if _is_error_payload(payload):
+            # não deixa o erro ficar no cache até o TTL (fetch_payload é o único cache_resource)
+            st.cache_resource.clear()
+            raise RuntimeError(f"Endpoint retornou erro: {payload}")
+    except Exception as e:
+        if FETCH_BREAKER.record_failure(e):
+            FETCH_BREAKER.ensure_probing(_probe, _LAST_GOOD.update)
+        if _LAST_GOOD.payload is None:
+            raise
+        return _stale(str(e))
+
+    _LAST_GOOD.update(payload)
+    elapsed = time.perf_counter() - t0
+    if elapsed > FETCH_SLOW_SECONDS:
+        # chegou, mas segurou o render: conta como falha (a 3ª seguida abre o circuito)
+        if FETCH_BREAKER.record_failure(_slow_message(elapsed)):
+            FETCH_BREAKER.ensure_probing(_probe, _LAST_GOOD.update)
+    else:
+        FETCH_BREAKER.record_success()
+    return _remember(FetchResult(payload, False, _LAST_GOOD.fetched_at, None, FETCH_BREAKER.state))
+
+
+def refresh_payload(url: str, token: str, ttl_seconds: int = 4) -> FetchResult:
+    """
+    Força um fetch novo (webhook do Apps Script): descarta o payload em cache
+    e repopula com UMA chamada, que as sessões passam a reaproveitar.
+    """
+    st.cache_resource.clear()  # fetch_payload é o único cache_resource
+    return fetch_payload_guarded(url, token, ttl_seconds=ttl_seconds)
+
+
+@timed("payload_to_df")
 def payload_to_df(payload: Dict[str, Any]) -> Tuple[pd.DataFrame, Optional[str], Optional[str]]:
+    """
+    Payload -> DataFrame tipado. "rows" passa por ingest_rows (core/validate.py):
+    uma passada que valida e converte para colunas; o resto é o mesmo caminho
+    do payload colunar. O relatório de validação fica em df.attrs["validation"].
+    """
     updated_at = payload.get("updatedAt")
     sheet = payload.get("sheet")
 
-    rows = payload.get("rows", [])
-    df = pd.DataFrame(rows)
+    t0 = time.perf_counter()
+    if is_columnar(payload):
+        report = payload.get("validation")
+        # relatório do streaming é do payload em cache: copia antes de completar
+        report = report.copy() if isinstance(report, ValidationReport) else None
+        df = _columnar_to_df(payload, report)
+    else:
+        buffers, report = ingest_rows(payload.get("rows") or [])
+        df = _columnar_to_df(buffers.to_columnar({}), report)
+    PARSE_SECONDS.observe(time.perf_counter() - t0)
+    return df, updated_at, sheet
 
-    if df.empty:
-        return df, updated_at, sheet
 
-    if "RESPONSÁVEL" in df.columns:
-        df["RESPONSÁVEL_ORIGINAL"] = df["RESPONSÁVEL"].apply(_norm_text_no_alias)
-        df["RESPONSÁVEL"] = df["RESPONSÁVEL"].apply(_norm_text)
+def _columnar_row(cols: Dict[str, Column], i: int) -> Dict[str, Any]:
+    """Linha `i` de volta em dict (exemplo do relatório de validação)."""
+    out = {}
+    for name, col in cols.items():
+        v = col.values[i] if col.codes is None else col.dictionary[col.codes[i]]
+        out[name] = v.item() if isinstance(v, np.generic) else v
+    return out
 
-    if "INDICADORES" in df.columns:
-        df["INDICADORES"] = df["INDICADORES"].apply(_norm_text)
 
-    if "VALOR" in df.columns:
-        df["VALOR"] = df["VALOR"].apply(_parse_number)
+def _flag_values(report: ValidationReport, issue: str, cols: Dict[str, Column], name: str, bad) -> None:
+    """Marca as linhas cujo valor cru em `name` satisfaz `bad` (uma chamada por valor distinto)."""
+    col = cols[name]
+    if col.codes is not None:
+        hits = [i for i, v in enumerate(col.dictionary) if bad(v)]
+        if not hits:
+            return
+        mask = np.isin(col.codes, hits)
+    else:
+        mask = np.fromiter((bad(v) for v in col.values), dtype=bool, count=len(col))
+    report.flag(issue, mask, lambda i: _columnar_row(cols, i))
 
-    if "DATA_ATUALIZAÇÃO" in df.columns:
-        df["DATA_ATUALIZAÇÃO"] = pd.to_datetime(df["DATA_ATUALIZAÇÃO"], errors="coerce", utc=True)
 
-    return df, updated_at, sheet
+def _blank_name(v: Any) -> bool:
+    return isinstance(v, str) and not norm_text(v)
 
 
+def _columnar_to_df(payload: Dict[str, Any], report: Optional[ValidationReport] = None) -> pd.DataFrame:
+    """
+    Payload colunar (core/columnar.py) -> mesmo DataFrame do formato "rows",
+    montado direto das colunas (sem dicts por linha). Nomes com dicionário
+    são normalizados uma vez por valor distinto.
+
+    `report` traz as checagens por linha já feitas na ingestão; aqui entram as
+    checagens por coluna (nome vazio depois de normalizar, data inválida). Sem
+    `report` (colunar vindo do servidor), as checagens de linha que fazem
+    sentido por coluna (nome ausente, VALOR não numérico) também rodam aqui.
+    """
+    cols = columnar_columns(payload)
+    n = columnar_length(payload)
+    PAYLOAD_ROWS.set(n)
+    if report is None:
+        report = ValidationReport(total_rows=n)
+        for name in REQUIRED_ROW_KEYS:
+            if name in cols and name != "VALOR":
+                _flag_values(report, f"sem {name}", cols, name, lambda v: v is None)
+                _flag_values(report, f"{name} não é texto", cols, name, lambda v: v is not None and type(v) is not str)
+        if "VALOR" in cols and not cols["VALOR"].is_float:
+            _flag_values(
+                report, "VALOR não numérico", cols, "VALOR",
+                lambda v: v is not None and str(v).strip() not in ("", "-") and _parse_number(v) is None,
+            )
+    report.missing_columns = [k for k in EXPECTED_ROW_KEYS if k not in cols] if n else []
+    if n == 0:
+        _publish_validation(report)
+        return pd.DataFrame()
+
+    names = NameIndex()
+    resp_ids: Optional[np.ndarray] = None
+    data: Dict[str, Any] = {}
+    for name, col in cols.items():
+        if name == "RESPONSÁVEL":
+            # um ID por nome distinto; o texto sai do nome canônico do ID
+            if col.codes is not None:
+                resp_ids = names.encode(col.dictionary)[col.codes]
+            else:
+                resp_ids = names.encode(col.values)
+            data[name] = names.names_array()[resp_ids]
+            _flag_values(report, f"{name} vazio", cols, name, _blank_name)
+        elif name == "INDICADORES":
+            data[name] = col.expand(norm_text)
+            _flag_values(report, f"{name} vazio", cols, name, _blank_name)
+        elif name == "VALOR":
+            data[name] = pd.Series(col.values if col.is_float else col.expand(_parse_number), dtype="float64")
+        elif name == "DATA_ATUALIZAÇÃO" and col.codes is not None:
+            # converte cada data distinta uma vez e expande pelos códigos
+            uniq = parse_unique(col.dictionary)
+            data[name] = pd.Series(uniq.array.take(col.codes))
+            invalid = np.flatnonzero(uniq.isna().to_numpy() & pd.notna(pd.Series(col.dictionary, dtype=object)).to_numpy())
+            if len(invalid):
+                report.flag("DATA_ATUALIZAÇÃO inválida", np.isin(col.codes, invalid), lambda i: _columnar_row(cols, i))
+        elif name == "DATA_ATUALIZAÇÃO":
+            raw = pd.Series(col.expand(), dtype=object)
+            data[name] = parse_timestamps(raw)
+            report.flag(
+                "DATA_ATUALIZAÇÃO inválida",
+                (data[name].isna() & raw.notna()).to_numpy(),
+                lambda i: _columnar_row(cols, i),
+            )
+        else:
+            data[name] = col.expand()
+    if "RESPONSÁVEL" in cols:
+        data["RESPONSÁVEL_ORIGINAL"] = cols["RESPONSÁVEL"].expand(norm_text)
+        data[RESPONSAVEL_ID] = resp_ids
+    df = pd.DataFrame(data)
+    df.attrs["validation"] = _publish_validation(report)
+    df.attrs["names"] = names
+    return df
+
+
+def _publish_validation(report: ValidationReport) -> Dict[str, Any]:
+    """Relatório -> métrica + log (com exemplos) quando há linhas ruins."""
+    PAYLOAD_BAD_ROWS.set(report.bad_rows)
+    if not report.ok:
+        log.warning("payload: %s Exemplos: %s", report.message(), report.samples)
+    return report.as_dict()
+
+
+@timed("latest_values")
 def latest_values(df: pd.DataFrame) -> pd.DataFrame:
     """Mantém a última linha por (RESPONSÁVEL, INDICADORES), usando DATA_ATUALIZAÇÃO se existir."""
     if df.empty:
@@ -143,19 +409,42 @@ def latest_values(df: pd.DataFrame) -> pd.DataFrame:
     d = df.copy()
     if "DATA_ATUALIZAÇÃO" in d.columns and d["DATA_ATUALIZAÇÃO"].notna().any():
         d = d.sort_values("DATA_ATUALIZAÇÃO")
-    d = d.drop_duplicates(subset=["RESPONSÁVEL", "INDICADORES"], keep="last")
+    who = RESPONSAVEL_ID if RESPONSAVEL_ID in d.columns else "RESPONSÁVEL"
+    d = d.drop_duplicates(subset=[who, "INDICADORES"], keep="last")
     return d
 
 
-def get_val(df_latest: pd.DataFrame, indicador: str, responsavel: Optional[str] = None) -> Optional[float]:
-    """Pega VALOR do indicador para um responsável (se informado)."""
-    indicador = indicador.strip().upper()
+def get_val(
+    df_latest: pd.DataFrame,
+    indicador: str,
+    responsavel: Optional[str] = None,
+    period: Optional[str] = None,
+) -> Optional[float]:
+    """
+    Pega VALOR do indicador para um responsável (se informado).
+
+    period=None usa o valor do Sheets; "day" | "week" | "month" | "quarter"
+    lê o agregado do período no cubo (core/cube.py) — lookup, sem varrer o df.
+    """
+    indicador = norm_text(indicador)
+    rid: Optional[int] = None
+    if responsavel:
+        # ✅ ID canônico: alias ("MARIA EDUARDA") e acento ("JOAO") já resolvidos no índice
+        names = name_index(df_latest)
+        rid = names.lookup(responsavel)
+        responsavel = names.name(rid) if rid is not None else canonical_name(responsavel)
+
+    if period is not None:
+        cube = get_cube()
+        if responsavel:
+            return cube.value(indicador, responsavel, period)
+        return cube.total(indicador, period)
+
     d = df_latest[df_latest["INDICADORES"] == indicador]
     if responsavel:
-        responsavel = responsavel.strip().upper()
-        # ✅ aplica alias também aqui (caso você passe "MARIA EDUARDA" em algum lugar)
-        responsavel = _RESPONSAVEL_ALIASES.get(responsavel, responsavel)
-        d = d[d["RESPONSÁVEL"] == responsavel]
+        if rid is None:
+            return None
+        d = d[responsavel_ids(d, names) == rid]
     if d.empty:
         return None
     return d.iloc[-1]["VALOR"]
@@ -0,0 +1,302 @@
+"""
+Protocolo delta do Apps Script WebApp.
+
+Requisição:
+  GET <url>?token=...                 -> resposta completa
+  GET <url>?token=...&since=<versão>  -> só o que mudou desde <versão>
+
+Resposta completa (endpoints antigos não mandam "mode"/"version"):
+  {"mode": "full", "version": "43", "updatedAt": ..., "sheet": ..., "rows": [...]}
+
+Resposta delta:
+  {"mode": "delta", "version": "44", "baseVersion": "43", "updatedAt": ..., "sheet": ...,
+   "rows": [linha MAIS RECENTE de cada (INDICADORES, RESPONSÁVEL) alterado],
+   "removed": [{"INDICADORES": ..., "RESPONSÁVEL": ...}, ...]}
+
+O cliente guarda a última resposta completa já em colunas tipadas (a do
+streaming, core/streaming.py) e mescla cada delta nessas colunas (merge_delta),
+sem voltar para dicts por linha. O payload entregue ao pipeline tem o mesmo
+conjunto de linhas da resposta completa — histórico, cubo e crescimento veem a
+mesma entrada nos dois modos — com duas diferenças até a próxima resposta
+completa: se um par mudou mais de uma vez entre duas buscas, só a linha mais
+recente dele chega; e uma célula editada numa linha já existente vira uma linha
+a mais do par (a editada vence em latest_values, por vir depois). Se o
+"baseVersion" do delta não for a versão que temos, busca tudo de novo. A
+versão muda se e somente se o conteúdo muda (ver payload_fingerprint em
+core/snapshot.py).
+"""
+from __future__ import annotations
+
+import logging
+import math
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from core.columnar import COLUMNAR_FORMAT, Column, columnar_columns, columnar_length, is_columnar
+from core.normalize import norm_text, parse_number
+from core.streaming import ColumnBuffers
+from core.telemetry import DELTA_FETCHES, DELTA_ROWS
+from core.timestamps import parse_timestamps
+from core.validate import ValidationReport, ingest_rows
+
+log = logging.getLogger(__name__)
+
+_Key = Tuple[str, str]
+
+# fetch(since) -> payload; since=None pede a resposta completa
+Fetcher = Callable[[Optional[str]], Dict[str, Any]]
+
+# Chaves do payload colunar refeitas a cada mescla (o resto é metadado)
+_COLUMNAR_KEYS = ("format", "columns", "dictionaries", "data", "validation")
+
+
+def is_versioned(payload: Dict[str, Any]) -> bool:
+    """Resposta de um endpoint que fala o protocolo delta (tem "version" e linhas)."""
+    return (
+        isinstance(payload, dict)
+        and payload.get("version") is not None
+        and ("rows" in payload or is_columnar(payload))
+    )
+
+
+def _norm(v: Any, cache: Dict[object, str]) -> str:
+    k = cache.get(v)
+    if k is None:
+        k = cache[v] = norm_text(v)
+    return k
+
+
+def _row_key(row: Dict[str, Any], cache: Dict[object, str]) -> _Key:
+    return _norm(row.get("INDICADORES"), cache), _norm(row.get("RESPONSÁVEL"), cache)
+
+
+def pair_key(row: Dict[str, Any]) -> _Key:
+    """(INDICADORES, RESPONSÁVEL) normalizados de uma linha."""
+    return norm_text(row.get("INDICADORES")), norm_text(row.get("RESPONSÁVEL"))
+
+
+def latest_rows(rows: List[Dict[str, Any]]) -> Dict[_Key, Dict[str, Any]]:
+    """Última linha por (INDICADORES, RESPONSÁVEL), pelo mesmo critério de latest_values."""
+    if not rows:
+        return {}
+    times = parse_timestamps([r.get("DATA_ATUALIZAÇÃO") for r in rows])
+    order = times.sort_values(kind="stable").index if times.notna().any() else range(len(rows))
+
+    cache: Dict[object, str] = {}
+    index: Dict[_Key, Dict[str, Any]] = {}
+    for i in order:
+        row = rows[i]
+        index[_row_key(row, cache)] = row
+    return index
+
+
+# =========================
+# Mescla nas colunas tipadas
+# =========================
+def as_columnar(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Resposta completa em colunas tipadas ("rows" passa por ingest_rows, como em payload_to_df)."""
+    if is_columnar(payload):
+        return payload
+    buffers, _report = ingest_rows(payload.get("rows") or [])
+    return buffers.to_columnar({k: v for k, v in payload.items() if k != "rows"})
+
+
+def _cell(col: Optional[Column], i: int) -> Any:
+    if col is None:
+        return None
+    return col.values[i] if col.codes is None else col.dictionary[col.codes[i]]
+
+
+def _matches(col: Optional[Column], wanted: Set[str], n: int, cache: Dict[object, str]) -> np.ndarray:
+    """Linhas cujo valor normalizado está em `wanted` (uma normalização por valor distinto)."""
+    if col is None:
+        return np.full(n, _norm(None, cache) in wanted)
+    if col.codes is not None:
+        hits = [c for c, v in enumerate(col.dictionary) if _norm(v, cache) in wanted]
+        return np.isin(col.codes, hits)
+    return np.fromiter((_norm(v, cache) in wanted for v in col.values), dtype=bool, count=n)
+
+
+def _removed_rows(cols: Dict[str, Column], n: int, removed: Set[_Key], cache: Dict[object, str]) -> np.ndarray:
+    """Linhas da base cujo (INDICADORES, RESPONSÁVEL) foi removido da planilha."""
+    if not removed or not n:
+        return np.zeros(n, dtype=bool)
+    ind, resp = cols.get("INDICADORES"), cols.get("RESPONSÁVEL")
+    mask = _matches(ind, {k[0] for k in removed}, n, cache) & _matches(resp, {k[1] for k in removed}, n, cache)
+    # candidatas (poucas): confere o par exato
+    for i in np.flatnonzero(mask):
+        if (_norm(_cell(ind, i), cache), _norm(_cell(resp, i), cache)) not in removed:
+            mask[i] = False
+    return mask
+
+
+def _floats(col: Optional[Column], n: int) -> np.ndarray:
+    if col is None:
+        return np.full(n, np.nan)
+    if col.is_float:
+        return col.values
+    parsed = (parse_number(v) for v in col.expand())
+    return np.fromiter((math.nan if x is None else x for x in parsed), dtype=np.float64, count=n)
+
+
+def _merge_column(
+    name: str, base: Optional[Column], extra: Optional[Column], keep: np.ndarray, n_base: int, n_extra: int
+) -> Tuple[Any, Optional[List[Any]]]:
+    """Coluna da base (só `keep`) + coluna do delta -> (dados, dicionário ou None)."""
+    if name == "VALOR":
+        return np.concatenate([_floats(base, n_base)[keep], _floats(extra, n_extra)]), None
+
+    if (base is None or base.codes is not None) and (extra is None or extra.codes is not None):
+        # códigos + dicionário nos dois lados: junta os dicionários e recodifica só o delta
+        index: Dict[Any, int] = {}
+        if base is not None:
+            for v in base.dictionary:
+                index.setdefault(v, len(index))
+            base_codes = base.codes[keep]
+        else:
+            base_codes = np.full(int(keep.sum()), index.setdefault(None, len(index)))
+        if extra is not None:
+            remap = np.array([index.setdefault(v, len(index)) for v in extra.dictionary], dtype=np.int32)
+            extra_codes = remap[extra.codes] if len(remap) else np.empty(0, dtype=np.int32)
+        else:
+            extra_codes = np.full(n_extra, index.setdefault(None, len(index)))
+        return np.concatenate([base_codes, extra_codes]).astype(np.int32, copy=False), list(index)
+
+    base_values = [None] * int(keep.sum()) if base is None else [v for v, k in zip(base.expand(), keep) if k]
+    extra_values = [None] * n_extra if extra is None else list(extra.expand())
+    return base_values + extra_values, None
+
+
+def merge_delta(
+    base: Dict[str, Any],
+    rows: List[Any],
+    removed: List[Dict[str, Any]],
+    cache: Optional[Dict[object, str]] = None,
+) -> Dict[str, Any]:
+    """
+    Aplica um delta a um payload colunar, coluna a coluna: saem as linhas dos
+    pares em `removed` e as linhas do delta entram no fim (a planilha só
+    acrescenta linhas). Devolve um payload colunar novo (`base` não muda).
+    """
+    cache = {} if cache is None else cache
+    cols = columnar_columns(base)
+    n_base = columnar_length(base)
+
+    report = base.get("validation")
+    dropped = [row for row in rows if type(row) is not dict]
+    rows = [row for row in rows if type(row) is dict]
+    gone = {_row_key(key, cache) for key in removed if isinstance(key, dict)}
+    keep = ~_removed_rows(cols, n_base, gone, cache)
+
+    buffers = ColumnBuffers(parse_number)
+    for row in rows:
+        buffers.append(row)
+    extra = columnar_columns(buffers.to_columnar({})) if buffers.n else {}
+
+    names = list(dict.fromkeys([*cols, *extra]))
+    data, dictionaries = [], {}
+    for name in names:
+        values, dictionary = _merge_column(name, cols.get(name), extra.get(name), keep, n_base, buffers.n)
+        data.append(values)
+        if dictionary is not None:
+            dictionaries[name] = dictionary
+
+    out = {k: v for k, v in base.items() if k not in _COLUMNAR_KEYS}
+    out.update({"format": COLUMNAR_FORMAT, "columns": names, "dictionaries": dictionaries, "data": data})
+
+    if isinstance(report, ValidationReport) and keep.all():
+        # base intacta: o relatório dela vale e as linhas novas são checadas no fim
+        report = report.copy()
+        valores = _floats(extra.get("VALOR"), buffers.n)
+        for j, row in enumerate(rows):
+            v = valores[j]
+            report.check_row(n_base + j, row, None if v != v else float(v))
+        for row in dropped:
+            report.drop_row(n_base + buffers.n, row)
+        out["validation"] = report
+    # linhas da base saíram: os índices do relatório não valem mais e
+    # payload_to_df refaz as checagens por coluna
+    return out
+
+
+class DeltaClient:
+    """
+    Estado do protocolo delta para UM endpoint (um por processo).
+
+    fetch() devolve sempre um payload completo (colunar); quando nada mudou
+    (delta vazio) devolve o MESMO objeto da chamada anterior, o que deixa o
+    SnapshotStore responder sem hashear nada.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.source: Optional[str] = None
+        self.version: Optional[str] = None
+        self._base: Optional[Dict[str, Any]] = None
+        self._keys: Dict[object, str] = {}
+        self._payload: Optional[Dict[str, Any]] = None
+
+    def fetch(self, source: str, fetch: Fetcher) -> Dict[str, Any]:
+        with self._lock:
+            if source != self.source:
+                self.reset()
+                self.source = source
+
+            since = self.version
+            raw = fetch(since)
+            if not is_versioned(raw):
+                if "error" in raw and "rows" not in raw:
+                    return raw  # erro: mantém o estado para o próximo delta
+                DELTA_FETCHES.inc(mode="legacy")
+                self.version, self._base, self._payload = None, None, None
+                return raw
+
+            if raw.get("mode") != "delta":
+                return self._load_full(raw)
+
+            if since is None or self._base is None or str(raw.get("baseVersion")) != since:
+                DELTA_FETCHES.inc(mode="mismatch")
+                log.info("delta com base %s, esperado %s: buscando tudo", raw.get("baseVersion"), since)
+                raw = fetch(None)
+                if not is_versioned(raw):
+                    self.version, self._base, self._payload = None, None, None
+                    return raw
+                return self._load_full(raw)
+
+            return self._apply_delta(raw)
+
+    def _load_full(self, raw: Dict[str, Any]) -> Dict[str, Any]:
+        DELTA_FETCHES.inc(mode="full")
+        self._base = as_columnar(raw)
+        return self._publish(raw)
+
+    def _apply_delta(self, raw: Dict[str, Any]) -> Dict[str, Any]:
+        DELTA_FETCHES.inc(mode="delta")
+        rows = raw.get("rows") or []  # delta vem sempre em "rows" (é pequeno)
+        removed = raw.get("removed") or []
+        if not rows and not removed and str(raw["version"]) == self.version and self._payload is not None:
+            return self._payload
+
+        if rows or removed:
+            self._base = merge_delta(self._base, rows, removed, self._keys)
+        DELTA_ROWS.inc(len(rows))
+        return self._publish(raw)
+
+    def _publish(self, raw: Dict[str, Any]) -> Dict[str, Any]:
+        self.version = str(raw["version"])
+        # objeto novo a cada versão: quem recebeu o anterior (cache/sessões) nunca o vê mudar
+        self._payload = {
+            **{k: v for k, v in self._base.items() if k in _COLUMNAR_KEYS},
+            "version": self.version,
+            "updatedAt": raw.get("updatedAt"),
+            "sheet": raw.get("sheet"),
+        }
+        return self._payload
+
+
+DELTA = DeltaClient()
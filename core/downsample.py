@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from typing import Sequence, Tuple
+
+import numpy as np
+
+
+def lttb(x: Sequence[float], y: Sequence[float], threshold: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Largest-Triangle-Three-Buckets: reduz uma série a `threshold` pontos
+    preservando a forma visual (picos/vales). Mantém primeiro e último ponto.
+
+    `x` deve estar em ordem crescente.
+    """
+    xs = np.asarray(x, dtype=float)
+    ys = np.asarray(y, dtype=float)
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return xs, ys
+
+    out_idx = np.empty(threshold, dtype=np.int64)
+    out_idx[0] = 0
+    out_idx[-1] = n - 1
+
+    # limites dos buckets internos (pontos 1..n-2 divididos em threshold-2 grupos)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+
+        # média do próximo bucket (ou o último ponto)
+        if i + 2 < len(edges):
+            nxt_start, nxt_end = edges[i + 1], max(edges[i + 2], edges[i + 1] + 1)
+        else:
+            nxt_start, nxt_end = n - 1, n
+        avg_x = xs[nxt_start:nxt_end].mean()
+        avg_y = ys[nxt_start:nxt_end].mean()
+
+        # área do triângulo (a, candidato, média do próximo) — vetorizado no bucket
+        bx = xs[start:end]
+        by = ys[start:end]
+        area = np.abs((xs[a] - avg_x) * (by - ys[a]) - (xs[a] - bx) * (avg_y - ys[a]))
+        a = start + int(np.argmax(area))
+        out_idx[i + 1] = a
+
+    return xs[out_idx], ys[out_idx]
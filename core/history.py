@@ -0,0 +1,338 @@
+from __future__ import annotations
+
+import logging
+import math
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+import pandas as pd
+
+from core.constants import HISTORY_DB_PATH, HISTORY_RETENTION_DAYS
+from core.names import remember_spellings
+
+log = logging.getLogger(__name__)
+
+# Poda por retenção no máximo 1x por hora (não a cada append)
+_PRUNE_EVERY_SECONDS = 3600
+
+_BASE_DIR = Path(__file__).resolve().parent.parent
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id          INTEGER PRIMARY KEY,
+    fingerprint TEXT    NOT NULL UNIQUE,
+    fetched_at  REAL    NOT NULL,
+    updated_at  TEXT,
+    sheet       TEXT,
+    row_count   INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_snapshots_fetched_at ON snapshots (fetched_at);
+
+CREATE TABLE IF NOT EXISTS series (
+    id        INTEGER PRIMARY KEY,
+    indicator TEXT NOT NULL,
+    person    TEXT NOT NULL,
+    UNIQUE (indicator, person)
+);
+
+CREATE TABLE IF NOT EXISTS observations (
+    series_id   INTEGER NOT NULL REFERENCES series (id),
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (id) ON DELETE CASCADE,
+    ts          REAL    NOT NULL,
+    value       REAL
+);
+CREATE INDEX IF NOT EXISTS ix_observations_series_ts ON observations (series_id, ts);
+CREATE INDEX IF NOT EXISTS ix_observations_snapshot ON observations (snapshot_id);
+"""
+
+
+def _epoch_seconds(col: pd.Series, fallback: float) -> list[float]:
+    """DATA_ATUALIZAÇÃO (datetime UTC) -> epoch em segundos; NaT usa o fallback."""
+    ts = pd.to_datetime(col, errors="coerce", utc=True)
+    secs = (ts - pd.Timestamp(0, tz="UTC")) / pd.Timedelta(seconds=1)
+    return [fallback if math.isnan(x) else float(x) for x in secs.tolist()]
+
+
+class HistoryStore:
+    """
+    Histórico local (SQLite) de todos os payloads buscados.
+
+    - Snapshots deduplicados pelo fingerprint do payload.
+    - Cada (INDICADORES, RESPONSÁVEL) vira uma série; só gravamos observações
+      quando o valor muda (anos de snapshots de 5 min continuam pequenos).
+    - Índice (série, ts) == (indicador, pessoa, timestamp) para consultas rápidas.
+    """
+
+    def __init__(self, path: str | Path = HISTORY_DB_PATH, retention_days: Optional[int] = HISTORY_RETENTION_DAYS):
+        self.path = Path(path)
+        if not self.path.is_absolute():
+            self.path = _BASE_DIR / self.path
+        self.retention_days = retention_days
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(_SCHEMA)
+
+        self._series_ids: dict[Tuple[str, str], int] = {
+            (ind, person): sid for sid, ind, person in self._conn.execute("SELECT id, indicator, person FROM series")
+        }
+        self._last_values = self._load_last_values()
+        self._last_prune = 0.0
+
+    # -------------------------
+    # Escrita
+    # -------------------------
+    def _load_last_values(self) -> dict[int, Optional[float]]:
+        rows = self._conn.execute(
+            "SELECT series_id, value FROM observations "
+            "WHERE rowid IN (SELECT MAX(rowid) FROM observations GROUP BY series_id)"
+        )
+        return {sid: value for sid, value in rows}
+
+    def _series_id(self, indicator: str, person: str) -> int:
+        key = (indicator, person)
+        sid = self._series_ids.get(key)
+        if sid is None:
+            self._conn.execute("INSERT OR IGNORE INTO series (indicator, person) VALUES (?, ?)", key)
+            sid = self._conn.execute(
+                "SELECT id FROM series WHERE indicator = ? AND person = ?", key
+            ).fetchone()[0]
+            self._series_ids[key] = sid
+        return sid
+
+    def _insert_snapshot(
+        self,
+        fingerprint: str,
+        df: pd.DataFrame,
+        updated_at: Optional[str],
+        sheet: Optional[str],
+        fetched_at: float,
+    ) -> bool:
+        cur = self._conn.execute(
+            "INSERT OR IGNORE INTO snapshots (fingerprint, fetched_at, updated_at, sheet, row_count) VALUES (?, ?, ?, ?, ?)",
+            (fingerprint, fetched_at, updated_at, sheet, int(len(df))),
+        )
+        if cur.rowcount == 0:
+            return False  # payload já armazenado
+        snapshot_id = cur.lastrowid
+
+        if df.empty or "INDICADORES" not in df.columns or "RESPONSÁVEL" not in df.columns:
+            return True
+
+        if "DATA_ATUALIZAÇÃO" in df.columns:
+            ts_list = _epoch_seconds(df["DATA_ATUALIZAÇÃO"], fetched_at)
+        else:
+            ts_list = [fetched_at] * len(df)
+        values = pd.to_numeric(df["VALOR"], errors="coerce").tolist() if "VALOR" in df.columns else [None] * len(df)
+
+        rows = sorted(
+            zip(df["INDICADORES"].tolist(), df["RESPONSÁVEL"].tolist(), ts_list, values),
+            key=lambda r: r[2],
+        )
+        batch: list[tuple] = []
+        for ind, person, ts, value in rows:
+            value = None if value is None or (isinstance(value, float) and math.isnan(value)) else float(value)
+            sid = self._series_id(str(ind), str(person))
+            if sid in self._last_values and self._last_values[sid] == value:
+                continue  # sem mudança: não grava
+            self._last_values[sid] = value
+            batch.append((sid, snapshot_id, ts, value))
+
+        if batch:
+            self._conn.executemany(
+                "INSERT INTO observations (series_id, snapshot_id, ts, value) VALUES (?, ?, ?, ?)", batch
+            )
+        return True
+
+    def append_snapshot(
+        self,
+        fingerprint: str,
+        df: pd.DataFrame,
+        updated_at: Optional[str] = None,
+        sheet: Optional[str] = None,
+        fetched_at: Optional[float] = None,
+    ) -> bool:
+        """Grava um snapshot (df já normalizado por payload_to_df). False se já existia."""
+        return self.append_many([(fingerprint, df, updated_at, sheet, fetched_at)]) > 0
+
+    def append_many(
+        self,
+        snapshots: Iterable[Tuple[str, pd.DataFrame, Optional[str], Optional[str], Optional[float]]],
+    ) -> int:
+        """Insere vários snapshots numa única transação (backfill/importação). Retorna quantos eram novos."""
+        inserted = 0
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for fingerprint, df, updated_at, sheet, fetched_at in snapshots:
+                    ts = time.time() if fetched_at is None else float(fetched_at)
+                    if self._insert_snapshot(fingerprint, df, updated_at, sheet, ts):
+                        inserted += 1
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                # caches em memória podem ter divergido do banco
+                self._series_ids = {
+                    (ind, person): sid
+                    for sid, ind, person in self._conn.execute("SELECT id, indicator, person FROM series")
+                }
+                self._last_values = self._load_last_values()
+                raise
+
+        if self.retention_days and time.time() - self._last_prune > _PRUNE_EVERY_SECONDS:
+            self.prune()
+        return inserted
+
+    def prune(self, retention_days: Optional[int] = None) -> int:
+        """
+        Remove snapshots (e observações) mais antigos que a retenção. Retorna quantos saíram.
+
+        A última observação de cada série nunca sai: como só gravamos mudanças,
+        um valor estável há mais tempo que a retenção só existe nela (é o ponto
+        de partida da sparkline e a base do crescimento). O snapshot dela fica.
+        """
+        days = self.retention_days if retention_days is None else retention_days
+        self._last_prune = time.time()
+        if not days:
+            return 0
+
+        cutoff = time.time() - days * 86400
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "DELETE FROM observations "
+                    "WHERE snapshot_id IN (SELECT id FROM snapshots WHERE fetched_at < ?) "
+                    "AND rowid NOT IN (SELECT MAX(rowid) FROM observations GROUP BY series_id)",
+                    (cutoff,),
+                )
+                cur = self._conn.execute(
+                    "DELETE FROM snapshots WHERE fetched_at < ? "
+                    "AND id NOT IN (SELECT DISTINCT snapshot_id FROM observations)",
+                    (cutoff,),
+                )
+                removed = cur.rowcount
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        # _last_values continua válido: a última observação de cada série ficou
+        return removed
+
+    # -------------------------
+    # Leitura
+    # -------------------------
+    def persons(self) -> list[str]:
+        """Pessoas com série gravada, da série mais antiga para a mais nova."""
+        with self._lock:
+            rows = self._conn.execute("SELECT person FROM series GROUP BY person ORDER BY MIN(id)").fetchall()
+        return [person for (person,) in rows]
+
+    def series(
+        self,
+        indicator: str,
+        person: str,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> pd.DataFrame:
+        """Série (ts UTC, value) de um indicador/pessoa (nomes já normalizados, UPPER)."""
+        sid = self._series_ids.get((indicator, person))
+        if sid is None:
+            return pd.DataFrame({"ts": pd.Series(dtype="datetime64[ns, UTC]"), "value": pd.Series(dtype=float)})
+
+        sql = "SELECT ts, value FROM observations WHERE series_id = ?"
+        params: list = [sid]
+        if since is not None:
+            sql += " AND ts >= ?"
+            params.append(float(since))
+        if until is not None:
+            sql += " AND ts <= ?"
+            params.append(float(until))
+        sql += " ORDER BY ts, snapshot_id"
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        out = pd.DataFrame(rows, columns=["ts", "value"])
+        out["ts"] = pd.to_datetime(out["ts"], unit="s", utc=True)
+        return out
+
+    def indicator_history(
+        self,
+        indicator: str,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> pd.DataFrame:
+        """Todas as pessoas de um indicador: colunas (ts, person, value)."""
+        sql = (
+            "SELECT o.ts, s.person, o.value FROM observations o JOIN series s ON s.id = o.series_id "
+            "WHERE s.indicator = ?"
+        )
+        params: list = [indicator]
+        if since is not None:
+            sql += " AND o.ts >= ?"
+            params.append(float(since))
+        if until is not None:
+            sql += " AND o.ts <= ?"
+            params.append(float(until))
+        sql += " ORDER BY s.person, o.ts, o.snapshot_id"
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        out = pd.DataFrame(rows, columns=["ts", "person", "value"])
+        out["ts"] = pd.to_datetime(out["ts"], unit="s", utc=True)
+        return out
+
+    def frame(self, since: Optional[float] = None) -> pd.DataFrame:
+        """
+        Histórico de todas as séries: colunas (ts, INDICADORES, RESPONSÁVEL, VALOR).
+
+        Com `since`, inclui também a última observação de cada série ANTES de `since`
+        (como só gravamos mudanças, ela é o valor vigente no início da janela).
+        """
+        cols = "o.ts, s.indicator, s.person, o.value"
+        base = f"SELECT {cols} FROM observations o JOIN series s ON s.id = o.series_id"
+        if since is None:
+            sql, params = base, []
+        else:
+            sql = (
+                f"{base} WHERE o.ts >= ? UNION ALL {base} WHERE o.rowid IN "
+                "(SELECT MAX(rowid) FROM observations WHERE ts < ? GROUP BY series_id)"
+            )
+            params = [float(since), float(since)]
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        out = pd.DataFrame(rows, columns=["ts", "INDICADORES", "RESPONSÁVEL", "VALOR"])
+        out["ts"] = pd.to_datetime(out["ts"], unit="s", utc=True)
+        return out.sort_values(["INDICADORES", "RESPONSÁVEL", "ts"], kind="stable", ignore_index=True)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_STORE: Optional[HistoryStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_history_store() -> HistoryStore:
+    """
+    HistoryStore único do processo (HISTORY_DB_PATH). Ao abrir, as grafias das
+    pessoas já gravadas viram as canônicas (core/names.py): "JOAO" num payload
+    continua na série "JOÃO" criada antes.
+    """
+    global _STORE
+    if _STORE is None:
+        with _STORE_LOCK:
+            if _STORE is None:
+                store = HistoryStore()
+                remember_spellings(store.persons())
+                _STORE = store
+    return _STORE
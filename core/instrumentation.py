@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from core.constants import TIMINGS_ENABLED, TIMINGS_WINDOW
+from core.memprofile import MEMORY
+
+# Limites (ms) dos buckets do histograma; o último bucket é "> 5000"
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    i = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[i]
+
+
+class StageTimings:
+    """
+    Durações por etapa do pipeline (fetch, payload_to_df, cards, render...).
+
+    Cada etapa guarda só as últimas `window` medições (janela móvel), então o
+    histograma reflete o comportamento recente e a memória é constante.
+    """
+
+    def __init__(self, window: int = TIMINGS_WINDOW, enabled: bool = TIMINGS_ENABLED):
+        self.window = window
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._samples: dict[str, deque] = {}
+        self._totals: dict[str, int] = {}
+
+    def record(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            q = self._samples.get(stage)
+            if q is None:
+                q = self._samples[stage] = deque(maxlen=self.window)
+            q.append(seconds * 1000.0)
+            self._totals[stage] = self._totals.get(stage, 0) + 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._totals.clear()
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """{etapa: {count, window, last_ms, mean_ms, p50_ms, p90_ms, p99_ms, max_ms, histogram}}"""
+        with self._lock:
+            snapshot = {stage: list(q) for stage, q in self._samples.items()}
+            totals = dict(self._totals)
+
+        out: Dict[str, Dict[str, Any]] = {}
+        for stage, values in snapshot.items():
+            ordered = sorted(values)
+            counts = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+            for v in values:
+                counts[bisect_left(HISTOGRAM_BOUNDS_MS, v)] += 1
+            labels = [f"<={b}" for b in HISTOGRAM_BOUNDS_MS] + [f">{HISTOGRAM_BOUNDS_MS[-1]}"]
+            out[stage] = {
+                "count": totals.get(stage, len(values)),
+                "window": len(values),
+                "last_ms": round(values[-1], 3),
+                "mean_ms": round(sum(values) / len(values), 3),
+                "p50_ms": round(_percentile(ordered, 0.50), 3),
+                "p90_ms": round(_percentile(ordered, 0.90), 3),
+                "p99_ms": round(_percentile(ordered, 0.99), 3),
+                "max_ms": round(ordered[-1], 3),
+                "histogram": {label: n for label, n in zip(labels, counts) if n},
+            }
+        return out
+
+    def to_json(self) -> str:
+        return json.dumps({"generated_at": time.time(), "stages": self.summary()}, ensure_ascii=False)
+
+    # -------------------------
+    # Spans
+    # -------------------------
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        """Mede o bloco e registra em `stage`. Desligado: só um if."""
+        mem = MEMORY.active
+        if not (self.enabled or mem):
+            yield
+            return
+        if mem:
+            MEMORY.enter(stage)
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.enabled:
+                self.record(stage, time.perf_counter() - t0)
+            if mem:
+                MEMORY.exit(stage)
+
+    def timed(self, stage: str) -> Callable[[Callable], Callable]:
+        """Decorator: registra a duração de cada chamada da função em `stage`."""
+
+        def deco(fn: Callable) -> Callable:
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not (self.enabled or MEMORY.active):
+                    return fn(*args, **kwargs)
+                with self.span(stage):
+                    return fn(*args, **kwargs)
+
+            return wrapper
+
+        return deco
+
+
+# ✅ instância única do processo (todas as sessões/telas)
+TIMINGS = StageTimings()
+span = TIMINGS.span
+timed = TIMINGS.timed
+
+
+def timings_json() -> str:
+    """Resumo das etapas em JSON (overlay, /timings do kiosk_server)."""
+    return TIMINGS.to_json()
+
+
+def stage_summary(stage: str) -> Optional[Dict[str, Any]]:
+    return TIMINGS.summary().get(stage)
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from core.constants import MEMPROFILE_FRAMES, MEMPROFILE_TOP_N
+
+_BASE_DIR = Path(__file__).resolve().parent.parent.as_posix()
+
+# Categorias dos locais de alocação (o que costuma pesar num rerun)
+_CATEGORIES = (
+    ("ui/embed.py", "base64 data URI"),
+    ("base64", "base64 data URI"),
+    ("pandas", "DataFrame"),
+    ("numpy", "DataFrame"),
+    ("ui/", "HTML"),
+    ("templates", "HTML"),
+    ("json", "payload JSON"),
+    ("requests", "payload JSON"),
+)
+
+
+def _category(filename: str) -> str:
+    f = filename.replace("\\", "/")
+    for needle, label in _CATEGORIES:
+        if needle in f:
+            return label
+    return "outro"
+
+
+def _short_path(filename: str) -> str:
+    f = filename.replace("\\", "/")
+    if f.startswith(_BASE_DIR + "/"):
+        return f[len(_BASE_DIR) + 1:]  # arquivo do projeto: caminho relativo ao checkout
+    for marker in ("/site-packages/", "/lib/python"):
+        if marker in f:
+            return f.split(marker, 1)[1]
+    return f
+
+
+class MemoryProfile:
+    """
+    Modo de profiling de memória (tracemalloc), desligado por padrão.
+
+    - Pico por etapa: os spans de core/instrumentation.py chamam enter/exit;
+      spans aninhados propagam o pico para a etapa de fora.
+    - Por rerun: begin_rerun/end_rerun comparam snapshots do tracemalloc e
+      guardam os maiores locais de alocação (DataFrame, HTML, base64...).
+
+    O ponto de partida de cada rerun e a pilha de etapas são por thread (o
+    Streamlit roda o script de cada sessão na sua thread), então sessões
+    simultâneas não sobrescrevem a base umas das outras. Já os números do
+    tracemalloc são do PROCESSO: o diff do rerun e o pico de uma etapa incluem
+    o que outras sessões alocaram no mesmo intervalo, e reset_peak() numa
+    thread zera o pico visto pelas outras. Para números limpos, perfile com
+    uma TV só (ou use o bench: python -m bench --memory).
+    """
+
+    def __init__(self) -> None:
+        self.active = False
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._peaks: Dict[str, Dict[str, float]] = {}
+        self.last_report: Optional[Dict[str, Any]] = None
+
+    # -------------------------
+    # Liga/desliga
+    # -------------------------
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(MEMPROFILE_FRAMES)
+        self.active = True
+
+    def stop(self) -> None:
+        self.active = False
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    # -------------------------
+    # Pico por etapa
+    # -------------------------
+    def _stack(self) -> list:
+        st = getattr(self._local, "stack", None)
+        if st is None:
+            st = self._local.stack = []
+        return st
+
+    def enter(self, stage: str) -> None:
+        if not tracemalloc.is_tracing():
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        stack = self._stack()
+        if stack:
+            stack[-1][2] = max(stack[-1][2], peak)  # preserva o pico do pai antes do reset
+        tracemalloc.reset_peak()
+        stack.append([stage, current, current])
+
+    def exit(self, stage: str) -> None:
+        stack = self._stack()
+        if not stack or not tracemalloc.is_tracing():
+            return
+        _, start, seen_peak = stack.pop()
+        peak = max(seen_peak, tracemalloc.get_traced_memory()[1])
+        if stack:
+            stack[-1][2] = max(stack[-1][2], peak)
+
+        kb = (peak - start) / 1024.0
+        with self._lock:
+            s = self._peaks.setdefault(stage, {"count": 0, "last_kb": 0.0, "max_kb": 0.0})
+            s["count"] += 1
+            s["last_kb"] = round(kb, 1)
+            s["max_kb"] = round(max(s["max_kb"], kb), 1)
+
+    def stage_peaks(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {k: dict(v) for k, v in self._peaks.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._peaks.clear()
+        self.last_report = None
+
+    # -------------------------
+    # Por rerun
+    # -------------------------
+    def begin_rerun(self) -> None:
+        if not tracemalloc.is_tracing():
+            return
+        self._local.rerun_start = tracemalloc.take_snapshot()
+
+    def end_rerun(self, top_n: int = MEMPROFILE_TOP_N) -> Optional[Dict[str, Any]]:
+        """Maiores locais de alocação desde o begin_rerun desta thread (por arquivo:linha)."""
+        start = getattr(self._local, "rerun_start", None)
+        self._local.rerun_start = None
+        if start is None or not tracemalloc.is_tracing():
+            return None
+
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        end = tracemalloc.take_snapshot().filter_traces(filters)
+        diffs = end.compare_to(start.filter_traces(filters), "lineno")
+
+        top: List[Dict[str, Any]] = []
+        by_category: Dict[str, float] = {}
+        for d in diffs:
+            if d.size_diff <= 0:
+                continue
+            frame = d.traceback[0]
+            cat = _category(frame.filename)
+            by_category[cat] = by_category.get(cat, 0.0) + d.size_diff / 1024.0
+            if len(top) < top_n:
+                top.append(
+                    {
+                        "site": f"{_short_path(frame.filename)}:{frame.lineno}",
+                        "category": cat,
+                        "size_kb": round(d.size_diff / 1024.0, 1),
+                        "count": d.count_diff,
+                    }
+                )
+
+        current, peak = tracemalloc.get_traced_memory()
+        report = {
+            "at": time.time(),
+            "current_kb": round(current / 1024.0, 1),
+            "peak_kb": round(peak / 1024.0, 1),  # do processo (todas as sessões)
+            "by_category_kb": {k: round(v, 1) for k, v in sorted(by_category.items(), key=lambda t: -t[1])},
+            "top": top,
+            "stages": self.stage_peaks(),
+        }
+        self.last_report = report
+        return report
+
+
+# ✅ instância única do processo (tracemalloc é global)
+MEMORY = MemoryProfile()
+
+if os.environ.get("DASH_MEMPROFILE", "").strip() in ("1", "true", "on"):
+    MEMORY.start()
@@ -1,61 +1,61 @@
 from __future__ import annotations
 
+from datetime import datetime
+from functools import lru_cache
 from typing import Iterable, Optional
 import math
+import numpy as np
 import pandas as pd
-import re
 
+from core.cube import get_cube
+from core.history import get_history_store
+from core.names import canonical_name, name_index, responsavel_ids
+from core.normalize import norm_text
 from core.people import dashboard_display_name
+from core.periods import now_local, same_point_previous_period
 
 def _is_nan(x) -> bool:
     return x is None or (isinstance(x, float) and math.isnan(x))
 
 
-_CLEAN_INVISIBLE_RE = re.compile(r"[\u200B-\u200F\uFEFF\u00AD]")
-
-# ✅ aliases globais de responsáveis (já em UPPER)
-_RESPONSAVEL_ALIASES = {
-    "MARIA EDUARDA": "MARIA",
-}
-
-def _norm(s: str) -> str:
-    s = str(s or "")
-    s = _CLEAN_INVISIBLE_RE.sub("", s)
-    s = s.replace("\u00A0", " ")
-    s = " ".join(s.split())
-    s = s.strip().upper()
-
-    # ✅ aplica alias depois de normalizar
-    return _RESPONSAVEL_ALIASES.get(s, s)
-
-
-
 def total_for_indicator(
     df_latest: pd.DataFrame,
     indicador: str,
     prefer_responsavel: Optional[str] = None,
     exclude_responsaveis: Optional[Iterable[str]] = None,
+    period: Optional[str] = None,
 ) -> Optional[float]:
     """
     Total de um indicador.
     - Se existir linha do indicador com responsavel == prefer_responsavel, usa ela.
     - Senão soma todas as linhas do indicador (exceto exclude_responsaveis).
+    - period ("day" | "week" | "month" | "quarter"): mesma regra, lida do cubo
+      pré-agregado (core/cube.py) em vez do df.
     """
+    if period is not None:
+        # cubo é chaveado por texto (sobrevive entre snapshots)
+        return get_cube().total(
+            norm_text(indicador),
+            period,
+            prefer_responsavel=canonical_name(prefer_responsavel) if prefer_responsavel else None,
+            exclude_responsaveis={canonical_name(x) for x in exclude_responsaveis or ()},
+        )
+
     if df_latest is None or df_latest.empty:
         return None
 
-    indicador_u = _norm(indicador)
-    d = df_latest[df_latest["INDICADORES"] == indicador_u].copy()
+    indicador_u = norm_text(indicador)
+    d = df_latest[df_latest["INDICADORES"] == indicador_u]
     if d.empty:
         return None
 
+    names = name_index(df_latest)
     if exclude_responsaveis:
-        excl = {_norm(x) for x in exclude_responsaveis}
-        d = d[~d["RESPONSÁVEL"].isin(excl)]
+        d = d[~np.isin(responsavel_ids(d, names), list(names.ids(exclude_responsaveis)))]
 
     if prefer_responsavel:
-        pr = _norm(prefer_responsavel)
-        p = d[d["RESPONSÁVEL"] == pr]
+        pr = names.lookup(prefer_responsavel)
+        p = d[responsavel_ids(d, names) == pr] if pr is not None else d.iloc[0:0]
         if not p.empty:
             v = p.iloc[-1]["VALOR"]
             return None if _is_nan(v) else float(v)
@@ -70,33 +70,48 @@ def people_values(
     df_latest: pd.DataFrame,
     indicador: str,
     exclude_responsaveis: Optional[Iterable[str]] = None,
+    period: Optional[str] = None,
 ) -> list[dict]:
-    """Retorna lista [{name, value}] por responsável para um indicador."""
+    """
+    Retorna lista [{id, name, value, ...}] por responsável para um indicador.
+    `id` é o ID do responsável no índice do snapshot (core/names.py).
+    Com `period`, o value de cada pessoa vem do cubo (agregado do período).
+    """
     if df_latest is None or df_latest.empty:
         return []
 
-    indicador_u = _norm(indicador)
-    d = df_latest[df_latest["INDICADORES"] == indicador_u].copy()
+    indicador_u = norm_text(indicador)
+    d = df_latest[df_latest["INDICADORES"] == indicador_u]
     if d.empty:
         return []
 
+    names = name_index(df_latest)
     if exclude_responsaveis:
-        excl = {_norm(x) for x in exclude_responsaveis}
-        d = d[~d["RESPONSÁVEL"].isin(excl)]
+        d = d[~np.isin(responsavel_ids(d, names), list(names.ids(exclude_responsaveis)))]
 
-    d["VALOR"] = pd.to_numeric(d["VALOR"], errors="coerce")
-    d = d[d["VALOR"].notna()]
+    d = d[pd.to_numeric(d["VALOR"], errors="coerce").notna()]
+    ids = responsavel_ids(d, names).tolist()
+    originals = d["RESPONSÁVEL_ORIGINAL"] if "RESPONSÁVEL_ORIGINAL" in d.columns else d["RESPONSÁVEL"]
+    values = pd.to_numeric(d["VALOR"], errors="coerce")
+
+    cube = get_cube() if period is not None else None
 
     out: list[dict] = []
-    for _, r in d.iterrows():
-        name = str(r["RESPONSÁVEL"])
-        original_name = str(r.get("RESPONSÁVEL_ORIGINAL") or name)
+    for rid, name, original, value in zip(ids, d["RESPONSÁVEL"].tolist(), originals.tolist(), values.tolist()):
+        name = str(name)
+        if cube is not None:
+            # cubo é chaveado pelo nome canônico (texto)
+            value = cube.value(indicador_u, names.name(rid), period)
+            if value is None:
+                continue
+        original_name = str(original or name)
         out.append(
             {
+                "id": rid,
                 "name": name,
                 "original_name": original_name,
                 "display_name": dashboard_display_name(name, original_name),
-                "value": float(r["VALOR"]),
+                "value": float(value),
             }
         )
     return out
@@ -149,3 +164,56 @@ def to_percent_value(v: Optional[float]) -> float:
     if 0.0 <= v <= 1.5:
         return max(0.0, min(100.0, v * 100.0))
     return max(0.0, min(100.0, v))
+
+
+# =========================
+# Crescimento (período contra período) a partir do histórico
+# =========================
+def growth_table(history: pd.DataFrame, period: str = "month", now: Optional[datetime] = None) -> pd.DataFrame:
+    """
+    Crescimento de TODOS os (INDICADORES, RESPONSÁVEL) num único groupby.
+
+    `history`: colunas ts (UTC), INDICADORES, RESPONSÁVEL, VALOR (ex.: HistoryStore.frame()).
+    Compara o valor vigente agora com o vigente no mesmo ponto do período anterior
+    (ontem / semana passada / mês passado). Retorna colunas:
+      INDICADORES, RESPONSÁVEL, atual, anterior, crescimento (ratio; 0.15 = +15%)
+    """
+    cols = ["INDICADORES", "RESPONSÁVEL", "atual", "anterior", "crescimento"]
+    if history is None or history.empty:
+        return pd.DataFrame(columns=cols)
+
+    now = now or now_local()
+    ref = pd.Timestamp(same_point_previous_period(period, now))
+    now_ts = pd.Timestamp(now)
+
+    d = history[history["ts"] <= now_ts].sort_values("ts", kind="stable")
+    d = d.assign(
+        atual=pd.to_numeric(d["VALOR"], errors="coerce"),
+        anterior=pd.to_numeric(d["VALOR"], errors="coerce").where(d["ts"] <= ref),
+    )
+
+    # "last" ignora NaN: última observação até agora / até o ponto de referência
+    g = d.groupby(["INDICADORES", "RESPONSÁVEL"], sort=False)[["atual", "anterior"]].last().reset_index()
+
+    prev = g["anterior"]
+    g["crescimento"] = (g["atual"] / prev - 1.0).where(prev.notna() & (prev != 0))
+    return g[cols]
+
+
+@lru_cache(maxsize=16)
+def growth_for_snapshot(fingerprint: str, period: str = "month") -> pd.DataFrame:
+    """growth_table do histórico local, cacheada por snapshot (fingerprint) + período."""
+    ref = same_point_previous_period(period)
+    history = get_history_store().frame(since=ref.timestamp())
+    return growth_table(history, period=period)
+
+
+def get_growth(table: pd.DataFrame, indicador: str, responsavel: str) -> Optional[float]:
+    """Crescimento (ratio) de um indicador/responsável numa growth_table; None se indisponível."""
+    if table is None or table.empty:
+        return None
+    hit = table[(table["INDICADORES"] == norm_text(indicador)) & (table["RESPONSÁVEL"] == canonical_name(responsavel))]
+    if hit.empty:
+        return None
+    v = hit.iloc[-1]["crescimento"]
+    return None if _is_nan(v) else float(v)
@@ -0,0 +1,174 @@
+"""
+Índice canônico dos nomes de RESPONSÁVEL, montado uma vez por snapshot.
+
+Cada nome cru do payload passa UMA vez por limpeza (core/normalize.py),
+dobra de acentos ("JOÃO" == "JOAO"), alias (core/people.py) e classificação
+de rótulo de equipe ("SDR", "EQUIPE CLOSER"...), e vira um ID inteiro. O
+DataFrame ganha a coluna RESPONSÁVEL_ID; rankings, métricas e get_val
+cruzam/filtram por ID em vez de re-normalizar strings.
+
+Os IDs valem só dentro do snapshot: o que é persistido ou compartilhado entre
+snapshots (histórico, cubo, crescimento) continua pelo nome canônico (texto).
+Por isso a grafia canônica de cada chave é fixada no processo na 1ª vez que
+aparece — semeada com as pessoas já gravadas no histórico (remember_spellings)
+— e um snapshot só com "JOAO" não abre outra série ao lado de "JOÃO".
+"""
+from __future__ import annotations
+
+import threading
+import unicodedata
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from core.normalize import norm_text
+from core.people import RESPONSAVEL_ALIASES, TEAM_LABELS, TEAM_ROLES
+
+RESPONSAVEL_ID = "RESPONSÁVEL_ID"
+
+
+@lru_cache(maxsize=4096)
+def fold(text: object) -> str:
+    """norm_text + sem acentos: chave de comparação ("João " -> "JOAO")."""
+    s = unicodedata.normalize("NFKD", norm_text(text))
+    return "".join(ch for ch in s if not unicodedata.combining(ch))
+
+
+def name_key(text: object) -> str:
+    """Chave do responsável: sem acento e com alias aplicado."""
+    key = fold(text)
+    alias = RESPONSAVEL_ALIASES.get(key)
+    return fold(alias) if alias else key
+
+
+# name_key -> grafia canônica já usada no processo (a primeira vence)
+_SPELLINGS: Dict[str, str] = {}
+_SPELLINGS_LOCK = threading.Lock()
+
+
+def remember_spellings(names: Iterable[str]) -> None:
+    """Fixa a grafia de cada chave ainda sem grafia (histórico na abertura, depois cada snapshot)."""
+    with _SPELLINGS_LOCK:
+        for name in names:
+            key = name_key(name)
+            if key and key not in _SPELLINGS:
+                _SPELLINGS[key] = name
+
+
+def canonical_name(text: object) -> str:
+    """Nome canônico em texto (UPPER, acentos mantidos, alias aplicado, grafia já fixada)."""
+    key = fold(text)
+    alias = RESPONSAVEL_ALIASES.get(key)
+    if alias:
+        return alias
+    return _SPELLINGS.get(key) or norm_text(text)
+
+
+def is_role_label(text: object) -> bool:
+    """Só o papel ("SDR", "CLOSER"): total da equipe. Nome vazio também conta."""
+    key = name_key(text)
+    return not key or key in TEAM_ROLES
+
+
+def is_team_label(text: object) -> bool:
+    """Linha de equipe (agregado), não pessoa — regra do Ranking SDR. Nome vazio também conta."""
+    key = name_key(text)
+    if is_role_label(key) or key in TEAM_LABELS:
+        return True
+    return key.startswith(("SDR ", "SDR-")) or key.endswith((" SDR", "-SDR"))
+
+
+def _accents(text: str) -> int:
+    return sum(1 for ch in text if not ch.isascii())
+
+
+class NameIndex:
+    """
+    Nomes crus -> ID inteiro (0..n-1), com nome canônico e flags de equipe por ID.
+
+    Grafias que dobram para a mesma chave dividem o ID; o nome exibido é o
+    alias, se houver, senão a grafia já fixada no processo, senão a grafia com
+    acento ("JOÃO" vence "JOAO").
+    """
+
+    __slots__ = ("_by_key", "_by_raw", "names", "team", "role")
+
+    def __init__(self) -> None:
+        self._by_key: Dict[str, int] = {}
+        self._by_raw: Dict[Any, int] = {}
+        self.names: List[str] = []
+        self.team: List[bool] = []
+        self.role: List[bool] = []
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __deepcopy__(self, memo: dict) -> "NameIndex":
+        # vai em df.attrs, que o pandas copia a cada operação; depois de montado não muda
+        return self
+
+    def add(self, raw: Any) -> int:
+        """ID de um nome cru (memoizado pelo valor cru)."""
+        memo = raw if raw is None or isinstance(raw, str) else str(raw)
+        hit = self._by_raw.get(memo)
+        if hit is not None:
+            return hit
+        text = canonical_name(memo)
+        key = name_key(text)
+        i = self._by_key.get(key)
+        if i is None:
+            i = self._by_key[key] = len(self.names)
+            self.names.append(text)
+            self.team.append(is_team_label(key))
+            self.role.append(is_role_label(key))
+        elif text != self.names[i] and key not in _SPELLINGS and _accents(text) > _accents(self.names[i]):
+            self.names[i] = text
+        self._by_raw[memo] = i
+        return i
+
+    def encode(self, values: Sequence[Any]) -> np.ndarray:
+        """Um ID (int32) por valor; as grafias escolhidas ficam fixadas para os próximos snapshots."""
+        ids = np.fromiter((self.add(v) for v in values), dtype=np.int32, count=len(values))
+        remember_spellings(self.names)
+        return ids
+
+    def lookup(self, name: object) -> Optional[int]:
+        """ID de um nome qualquer (ex.: "Maria Eduarda", "JOAO"); None se não está no snapshot."""
+        return self._by_key.get(name_key(name))
+
+    def ids(self, names: Iterable[object]) -> set[int]:
+        return {i for i in (self.lookup(n) for n in names) if i is not None}
+
+    def name(self, i: int) -> str:
+        return self.names[i]
+
+    def is_team(self, i: int) -> bool:
+        return self.team[i]
+
+    def is_role(self, i: int) -> bool:
+        return self.role[i]
+
+    def names_array(self) -> np.ndarray:
+        out = np.empty(len(self.names), dtype=object)
+        out[:] = self.names
+        return out
+
+
+def name_index(df: pd.DataFrame) -> NameIndex:
+    """Índice do snapshot (df.attrs["names"]); para DataFrames de outra origem, monta na hora."""
+    names = df.attrs.get("names") if df is not None else None
+    if isinstance(names, NameIndex):
+        return names
+    names = NameIndex()
+    if df is not None and "RESPONSÁVEL" in df.columns:
+        names.encode(df["RESPONSÁVEL"].tolist())
+    return names
+
+
+def responsavel_ids(df: pd.DataFrame, names: NameIndex) -> np.ndarray:
+    """Coluna RESPONSÁVEL_ID (ou IDs calculados do texto, se o DataFrame não tiver)."""
+    if RESPONSAVEL_ID in df.columns:
+        return df[RESPONSAVEL_ID].to_numpy()
+    return names.encode(df["RESPONSÁVEL"].tolist())
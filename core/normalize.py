@@ -26,3 +26,52 @@ def norm_text(text: object) -> str:
     s = strip_invisible(text)
     s = " ".join(s.split())
     return s.strip().upper()
+
+def parse_number(v: object) -> float | None:
+    """Converte número vindo do Sheets/JSON para float.
+
+    Suporta strings em pt-BR (ex.: "98.874,00", "0,1746", "500.000") e também
+    valores já numéricos.
+    """
+    if v is None:
+        return None
+
+    if isinstance(v, (int, float)):
+        try:
+            return float(v)
+        except Exception:
+            return None
+
+    s = str(v).strip()
+    if not s or s == "-":
+        return None
+
+    s = s.replace("R$", "").replace("%", "").strip()
+    s = s.replace("\u00A0", " ")
+    s = s.replace(" ", "")
+
+    # mantém apenas dígitos, sinal e separadores
+    m = re.search(r"-?[\d\.,]+", s)
+    if not m:
+        return None
+    num = m.group(0)
+
+    if "." in num and "," in num:
+        # se a última vírgula vem depois do último ponto, vírgula é decimal
+        if num.rfind(",") > num.rfind("."):
+            num = num.replace(".", "").replace(",", ".")
+        else:
+            num = num.replace(",", "")
+    elif "," in num and "." not in num:
+        # vírgula como decimal
+        num = num.replace(".", "").replace(",", ".")
+    else:
+        # somente pontos: pode ser decimal OU milhar ("500.000")
+        parts = num.split(".")
+        if len(parts) > 1 and all(p.isdigit() for p in parts) and len(parts[-1]) == 3:
+            num = "".join(parts)
+
+    try:
+        return float(num)
+    except Exception:
+        return None
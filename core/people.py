@@ -1,5 +1,19 @@
 from __future__ import annotations
 
+# ✅ aliases globais de responsáveis (chave sem acento, em UPPER -> nome canônico)
+RESPONSAVEL_ALIASES: dict[str, str] = {
+    "MARIA EDUARDA": "MARIA",
+}
+
+# Linhas com o próprio papel como responsável ("SDR", "CLOSER") são o total da
+# equipe: ficam fora dos dois rankings.
+TEAM_ROLES = ("SDR", "CLOSER")
+
+# Rótulos de equipe que o Ranking SDR também ignora; além destes, nomes que
+# começam/terminam com SDR ("SDR JOAO", "TIME-SDR"). O Ranking Closer só
+# ignora os papéis exatos (TEAM_ROLES).
+TEAM_LABELS = frozenset({"EQUIPE", "TIME", "EQUIPE SDR", "TIME SDR", "SDR (EQUIPE)"})
+
 
 def pretty_name(name_upper: str) -> str:
     """Recebe nome em UPPER (como vem do DF) e devolve um formato agradável."""
@@ -26,18 +40,17 @@ def dashboard_display_name(name_upper: str, original_name_upper: str | None = No
     return pretty_name(base)
 
 
+# Chaves de foto: nome SEM acento em UPPER (core/names.py::name_key),
+# então "JOÃO" e "JOAO" caem na mesma entrada.
 PHOTO_FILES: dict[str, str] = {
     #"NURY": "assets/photos/nury.png",
     #"GUILHERME": "assets/photos/guilherme.png",
-    #"MARIA EDUARDA": "assets/photos/maria.png",
-    # Algumas fontes podem vir sem acento (JOAO) — deixamos os 2
-    #"JOÃO": "assets/photos/joao.png",
+    #"MARIA": "assets/photos/maria.png",
     #"JOAO": "assets/photos/joao.png",
 }
 PHOTO_URLS: dict[str, str] = {
     "NURY": "https://i.imgur.com/KPbuDpB.png",
     "MARIA": "https://i.imgur.com/mxT5m7g.png",
-    "JOÃO": "https://i.imgur.com/wl4sktg.png",
     "JOAO": "https://i.imgur.com/wl4sktg.png",
     "VICTOR": "https://i.imgur.com/oL93SKm.png",
     "LAURA": "https://i.imgur.com/oD23A9c.png",
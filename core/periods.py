@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from core.constants import TIMEZONE
+
+_TZ = ZoneInfo(TIMEZONE)
+
+# Períodos aceitos pelos cards/agrupamentos
+PERIODS = ("day", "week", "month", "quarter")
+
+# Rótulo exibido nos títulos dos cards na visão por período (?period=...)
+PERIOD_LABELS = {"day": "Hoje", "week": "Semana", "month": "Mês", "quarter": "Trimestre"}
+
+
+def parse_period(value: Optional[str]) -> Optional[str]:
+    """?period=... / --period -> um de PERIODS; vazio ou desconhecido = valores do Sheets (None)."""
+    period = (value or "").strip().lower()
+    return period if period in PERIODS else None
+
+
+def now_local() -> datetime:
+    return datetime.now(_TZ)
+
+
+def period_start(period: str, now: Optional[datetime] = None) -> datetime:
+    """Início do período corrente (fuso de São Paulo): dia, semana (segunda), mês ou trimestre."""
+    now = (now or now_local()).astimezone(_TZ)
+    day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    if period == "day":
+        return day
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    if period == "quarter":
+        return day.replace(month=3 * ((day.month - 1) // 3) + 1, day=1)
+    raise ValueError(f"Período inválido: {period!r} (use {', '.join(PERIODS)})")
+
+
+def previous_period_start(period: str, now: Optional[datetime] = None) -> datetime:
+    """Início do período imediatamente anterior ao corrente."""
+    start = period_start(period, now)
+    return period_start(period, start - timedelta(seconds=1))
+
+
+def same_point_previous_period(period: str, now: Optional[datetime] = None) -> datetime:
+    """Mesmo instante no período anterior (ontem / semana passada / mês passado / trimestre passado)."""
+    now = (now or now_local()).astimezone(_TZ)
+    offsets = {
+        "day": pd.DateOffset(days=1),
+        "week": pd.DateOffset(weeks=1),
+        "month": pd.DateOffset(months=1),
+        "quarter": pd.DateOffset(months=3),
+    }
+    if period not in offsets:
+        raise ValueError(f"Período inválido: {period!r} (use {', '.join(PERIODS)})")
+    return (pd.Timestamp(now) - offsets[period]).to_pydatetime()
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import cProfile
+import logging
+import pstats
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from core.constants import PROFILE_DIR, PROFILE_MAX_SECONDS, PROFILE_TOP_N
+
+log = logging.getLogger(__name__)
+
+_BASE_DIR = Path(__file__).resolve().parent.parent
+_BASE_PREFIX = _BASE_DIR.as_posix() + "/"
+
+# Captura em andamento no processo: (profiler, início)
+_ACTIVE: Optional[Tuple[cProfile.Profile, float]] = None
+_ACTIVE_LOCK = threading.Lock()
+
+
+def _profile_dir() -> Path:
+    p = Path(PROFILE_DIR)
+    return p if p.is_absolute() else _BASE_DIR / p
+
+
+def start_profile() -> Optional[cProfile.Profile]:
+    """
+    Liga o cProfile para capturar um rerun.
+
+    O alcance do cProfile depende da versão do Python: no 3.11 é a thread
+    atual; a partir do 3.12 (sys.monitoring) é o PROCESSO inteiro — o
+    relatório inclui reruns de outras sessões/TVs que rodarem no meio e todas
+    ficam mais lentas enquanto a captura dura. Tratamos como do processo em
+    qualquer versão: uma captura por vez (None se outra estiver em andamento).
+    """
+    global _ACTIVE
+    with _ACTIVE_LOCK:
+        if _ACTIVE is not None:
+            prof, started = _ACTIVE
+            if time.time() - started < PROFILE_MAX_SECONDS:
+                log.warning("outra captura de cProfile em andamento; esta foi ignorada")
+                return None
+            # a sessão que ligou fechou no meio do rerun: libera
+            _disable(prof)
+            _ACTIVE = None
+
+        prof = cProfile.Profile()
+        try:
+            prof.enable()
+        except ValueError:
+            log.warning("outro profiler já está ativo; captura ignorada")
+            return None
+        _ACTIVE = (prof, time.time())
+        return prof
+
+
+def _disable(prof: cProfile.Profile) -> None:
+    try:
+        prof.disable()
+    except Exception:
+        pass
+
+
+def discard_profile(prof: cProfile.Profile) -> None:
+    """Desliga sem relatório (rerun terminou em st.stop/st.rerun) e libera a vez."""
+    global _ACTIVE
+    _disable(prof)
+    with _ACTIVE_LOCK:
+        if _ACTIVE is not None and _ACTIVE[0] is prof:
+            _ACTIVE = None
+
+
+def _func_label(func: tuple) -> str:
+    filename, lineno, name = func
+    if filename == "~":
+        return name  # built-in
+    f = filename.replace("\\", "/")
+    if f.startswith(_BASE_PREFIX):
+        f = f[len(_BASE_PREFIX):]  # arquivo do projeto: caminho relativo ao checkout
+    else:
+        for marker in ("/site-packages/", "/lib/python"):
+            if marker in f:
+                f = f.split(marker, 1)[1]
+                break
+    return f"{f}:{lineno}({name})"
+
+
+def finish_profile(prof: cProfile.Profile, label: str = "rerun", top_n: int = PROFILE_TOP_N) -> Dict[str, Any]:
+    """Desliga o profiler, grava o .pstats e devolve o top-N por tempo cumulativo."""
+    discard_profile(prof)
+
+    out_dir = _profile_dir()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    path = out_dir / f"{time.strftime('%Y%m%d-%H%M%S')}-{label}.pstats"
+    prof.dump_stats(str(path))
+
+    stats = pstats.Stats(prof)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE)
+    top = []
+    for func in stats.fcn_list[:top_n]:
+        cc, nc, tt, ct, _callers = stats.stats[func]
+        top.append(
+            {
+                "function": _func_label(func),
+                "ncalls": nc if nc == cc else f"{nc}/{cc}",
+                "tottime_s": round(tt, 4),
+                "cumtime_s": round(ct, 4),
+            }
+        )
+    return {
+        "path": str(path),
+        "captured_at": time.time(),
+        "total_s": round(stats.total_tt, 4),
+        "calls": stats.total_calls,
+        "top": top,
+    }
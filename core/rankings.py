@@ -0,0 +1,37 @@
+"""
+Linhas dos rankings (SDR e Closer) como registros tipados.
+
+Os valores chegam já numéricos (VALOR é float desde payload_to_df) e ficam
+assim até o render: a formatação ("98.874", "15%", "3 contratos") acontece só
+no HTML (ui/ranklist.py). NamedTuple: imutável, sem dict por linha e com
+campos fixos — nada de procurar chave por aproximação.
+"""
+from __future__ import annotations
+
+from typing import NamedTuple, Tuple
+
+
+class SdrRow(NamedTuple):
+    id: int              # ID do responsável no snapshot (core/names.py)
+    name: str            # nome canônico (UPPER), usado para a foto
+    display_name: str
+    reunioes: float
+    conversao: float     # % (0..100)
+
+    def sort_key(self) -> Tuple[float, float]:
+        """Reuniões (desc) e, em empate, Conversão (desc) — usar com reverse=True."""
+        return (self.reunioes, self.conversao)
+
+
+class CloserRow(NamedTuple):
+    id: int
+    name: str
+    display_name: str
+    contratos: float
+    fat_assinado: float
+    fat_pago: float
+    perc_fat_pago: float  # % (0..100), indicador PERC FATURAMENTO PAGO
+
+    def sort_key(self) -> Tuple[float, float, float, str]:
+        """Fat. Assinado, Fat. Pago, Contratos (desc) e Nome (asc) para estabilidade total."""
+        return (-self.fat_assinado, -self.fat_pago, -self.contratos, self.name)
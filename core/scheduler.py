@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from zoneinfo import ZoneInfo
+
+from core.constants import (
+    BUSINESS_HOURS,
+    POLL_BACKOFF_FACTOR,
+    POLL_GAP_FRACTION,
+    POLL_HISTORY,
+    POLL_MAX_SECONDS,
+    POLL_MIN_SECONDS,
+    POLL_OFFHOURS_MAX_SECONDS,
+    POLL_OFFHOURS_MIN_SECONDS,
+    REFRESH_MS,
+    TIMEZONE,
+)
+from core.telemetry import POLL_HIT_RATIO, POLL_INTERVAL, POLLS
+
+_TZ = ZoneInfo(TIMEZONE)
+
+# Suavização do tempo entre mudanças (EWMA): peso da observação nova
+_GAP_ALPHA = 0.3
+
+# Polls sem mudança "esperados" antes de começar a recuar (busca ~2x por mudança)
+_EXPECTED_MISSES = 2
+
+
+def _to_local(at: Optional[float]) -> datetime:
+    return datetime.fromtimestamp(time.time() if at is None else at, _TZ)
+
+
+def is_business_hours(when: datetime) -> bool:
+    start, end = BUSINESS_HOURS
+    return when.weekday() < 5 and start <= when.hour < end
+
+
+def seconds_until_business(when: datetime) -> float:
+    """Segundos até o próximo início de expediente (0 se já estiver nele)."""
+    if is_business_hours(when):
+        return 0.0
+    day = when.replace(hour=BUSINESS_HOURS[0], minute=0, second=0, microsecond=0)
+    if when >= day:
+        day += timedelta(days=1)
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return (day - when).total_seconds()
+
+
+class PollScheduler:
+    """
+    Agendador de polling adaptativo (um por processo).
+
+    Cada busca agendada chama `observe()` com o fingerprint/updatedAt do
+    payload; o agendador mede o tempo entre mudanças, separado em horário
+    comercial e fora dele (EWMA), e escolhe o próximo intervalo como
+    POLL_GAP_FRACTION desse tempo, limitado por classe:
+      - comercial: [POLL_MIN_SECONDS, POLL_MAX_SECONDS]
+      - noite/fim de semana: [POLL_OFFHOURS_MIN_SECONDS, POLL_OFFHOURS_MAX_SECONDS],
+        mas nunca passando do início do próximo expediente.
+    Polls seguidos sem mudança recuam o intervalo (POLL_BACKOFF_FACTOR) até o teto.
+    """
+
+    def __init__(self, initial_seconds: float = REFRESH_MS / 1000, window: int = POLL_HISTORY):
+        self._lock = threading.Lock()
+        self.initial = float(initial_seconds)
+        self.last_poll_at: Optional[float] = None
+        self.last_change_at: Optional[float] = None
+        self.misses = 0  # polls seguidos sem mudança
+        self._last_key: Optional[str] = None
+        self._gap: Dict[bool, Optional[float]] = {True: None, False: None}  # comercial? -> EWMA (s)
+        self._history: deque[bool] = deque(maxlen=max(1, int(window)))
+
+    # -------------------------
+    # Observações
+    # -------------------------
+    def observe(self, fingerprint: Optional[str], updated_at: Any = None, at: Optional[float] = None) -> bool:
+        """Registra uma busca. True se os dados mudaram desde a anterior."""
+        at = time.time() if at is None else at
+        key = fingerprint or (str(updated_at) if updated_at is not None else None)
+        with self._lock:
+            changed = self._last_key is not None and key != self._last_key
+            first = self._last_key is None
+            self._last_key = key
+            self.last_poll_at = at
+
+            if first:
+                self.last_change_at = at
+                return False
+
+            self._history.append(changed)
+            if changed:
+                prev = self.last_change_at
+                # só mede o intervalo dentro da mesma classe (senão a noite infla o comercial)
+                if prev is not None and is_business_hours(_to_local(prev)) == is_business_hours(_to_local(at)):
+                    business = is_business_hours(_to_local(at))
+                    gap = at - prev
+                    old = self._gap[business]
+                    self._gap[business] = gap if old is None else (1 - _GAP_ALPHA) * old + _GAP_ALPHA * gap
+                self.last_change_at = at
+                self.misses = 0
+            else:
+                self.misses += 1
+
+        POLLS.inc(result="changed" if changed else "unchanged")
+        POLL_HIT_RATIO.set(self.hit_rate())
+        return changed
+
+    def hit_rate(self) -> float:
+        """Fração das últimas POLL_HISTORY buscas que trouxeram dados novos."""
+        h = self._history
+        return (sum(h) / len(h)) if h else 0.0
+
+    # -------------------------
+    # Intervalo
+    # -------------------------
+    def next_interval(self, at: Optional[float] = None) -> float:
+        """Segundos até a próxima busca agendada."""
+        when = _to_local(at)
+        business = is_business_hours(when)
+        lo, hi = (POLL_MIN_SECONDS, POLL_MAX_SECONDS) if business else (POLL_OFFHOURS_MIN_SECONDS, POLL_OFFHOURS_MAX_SECONDS)
+
+        gap = self._gap[business]
+        if gap is not None:
+            target = gap * POLL_GAP_FRACTION
+        else:
+            target = self.initial if business else hi
+        target *= POLL_BACKOFF_FACTOR ** max(0, self.misses - _EXPECTED_MISSES)
+        interval = min(max(target, lo), hi)
+
+        if not business:
+            # de madrugada: acorda junto com o expediente
+            interval = min(interval, max(POLL_MIN_SECONDS, seconds_until_business(when)))
+
+        POLL_INTERVAL.set(interval)
+        return interval
+
+    def claim(self, now: Optional[float] = None) -> bool:
+        """
+        A próxima busca já venceu? Só UM chamador recebe True por intervalo
+        (as sessões do app disputam; as demais reaproveitam o snapshot).
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            if self.last_poll_at is not None and now - self.last_poll_at < self.next_interval(now):
+                return False
+            self.last_poll_at = now
+            return True
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "interval_s": round(self.next_interval(), 1),
+            "hit_rate": round(self.hit_rate(), 3),
+            "polls": len(self._history),
+            "misses": self.misses,
+            "last_poll_at": self.last_poll_at,
+            "last_change_at": self.last_change_at,
+            "gap_business_s": self._gap[True],
+            "gap_offhours_s": self._gap[False],
+        }
+
+
+SCHEDULER = PollScheduler()
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Tuple
+
+try:
+    import tomllib  # Python 3.11+
+except ModuleNotFoundError:  # pragma: no cover - Python < 3.11
+    import tomli as tomllib  # mesmo parser (requirements.txt: tomli; python_version < "3.11")
+
+_BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def _read_secrets() -> dict:
+    """secrets.toml do projeto, senão o de ~/.streamlit (o primeiro que existir e for válido)."""
+    for path in (_BASE_DIR / ".streamlit" / "secrets.toml", Path.home() / ".streamlit" / "secrets.toml"):
+        if not path.exists():
+            continue
+        try:
+            return tomllib.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            continue
+    return {}
+
+
+def load_webhook_token() -> str:
+    """Token do webhook (SHEETS_WEBHOOK_TOKEN) do env ou do secrets.toml; vazio desliga o webhook."""
+    return os.environ.get("SHEETS_WEBHOOK_TOKEN", "") or str(_read_secrets().get("SHEETS_WEBHOOK_TOKEN", ""))
+
+
+def load_credentials() -> Tuple[str, str]:
+    """URL/TOKEN do env ou do secrets.toml (mesmas chaves do app Streamlit)."""
+    url = os.environ.get("SHEETS_WEBAPP_URL", "")
+    token = os.environ.get("SHEETS_WEBAPP_TOKEN", "")
+    if url and token:
+        return url, token
+
+    secrets = _read_secrets()
+    url = url or str(secrets.get("SHEETS_WEBAPP_URL", ""))
+    token = token or str(secrets.get("SHEETS_WEBAPP_TOKEN", ""))
+    return url, token
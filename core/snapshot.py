@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+
+def payload_fingerprint(payload: Dict[str, Any]) -> str:
+    """Hash do conteúdo do payload (muda só quando os dados mudam)."""
+    version = payload.get("version")
+    if version is not None:
+        # protocolo delta: a versão do endpoint já identifica o conteúdo (sem serializar as linhas)
+        raw = f"version:{version}:{payload.get('sheet')}"
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+    data = payload.get("data")
+    if isinstance(data, list) and any(isinstance(a, np.ndarray) for a in data):
+        # payload colunar do streaming: arrays numpy entram pelos bytes (str() truncaria)
+        h = hashlib.blake2b(digest_size=16)
+        head = {k: v for k, v in payload.items() if k not in ("data", "validation")}
+        h.update(json.dumps(head, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8"))
+        for arr in data:
+            if isinstance(arr, np.ndarray):
+                h.update(arr.dtype.str.encode("ascii"))
+                h.update(arr.tobytes())
+            else:
+                h.update(json.dumps(arr, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8"))
+        return h.hexdigest()
+    # "validation" (relatório do streaming) descreve o conteúdo, não faz parte dele
+    body = {k: v for k, v in payload.items() if k != "validation"}
+    raw = json.dumps(body, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+@dataclass(frozen=True)
+class DashboardSnapshot:
+    """
+    Resultado imutável do pipeline para UM payload.
+
+    Compartilhado por referência entre todas as sessões/telas: os DataFrames
+    devem ser tratados como somente leitura.
+    """
+
+    fingerprint: str
+    updated_at: Optional[str]
+    sheet: Optional[str]
+    df: pd.DataFrame
+    df_last: pd.DataFrame
+    slots: Mapping[str, str]
+    slot_hashes: Mapping[str, str]
+    html: str
+    built_at: float = field(default_factory=time.time)
+    validation: Mapping[str, Any] = field(default_factory=dict)  # core/validate.py::ValidationReport.as_dict
+    period: Optional[str] = None  # visão por período (core/periods.py); None = valores do Sheets
+    nonce: str = ""  # nonce embutido no html: patches desta página precisam dele (ui/render.py)
+
+
+class SnapshotStore:
+    """
+    Guarda o snapshot atual do processo (um para todas as sessões).
+
+    - Mesmo objeto de payload (cache_resource) -> devolve o snapshot sem hashear nada.
+    - Payload com mesmo conteúdo -> devolve o snapshot atual.
+    - Conteúdo novo -> reconstrói uma vez (lock), as demais sessões esperam e reaproveitam.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._current: Optional[DashboardSnapshot] = None
+        self._last_payload: Optional[Dict[str, Any]] = None
+        self._listeners: list[Callable[[DashboardSnapshot], None]] = []
+
+    def add_listener(self, fn: Callable[[DashboardSnapshot], None]) -> None:
+        """Registra callback chamado uma vez para cada snapshot novo (ex.: gravar histórico)."""
+        if fn not in self._listeners:
+            self._listeners.append(fn)
+
+    @property
+    def current(self) -> Optional[DashboardSnapshot]:
+        return self._current
+
+    def get_or_build(
+        self,
+        payload: Dict[str, Any],
+        builder: Callable[[Dict[str, Any], str], DashboardSnapshot],
+    ) -> DashboardSnapshot:
+        snap = self._current
+        if snap is not None and payload is self._last_payload:
+            return snap
+
+        fp = payload_fingerprint(payload)
+        if snap is not None and snap.fingerprint == fp:
+            self._last_payload = payload
+            return snap
+
+        with self._lock:
+            snap = self._current
+            if snap is None or snap.fingerprint != fp:
+                snap = builder(payload, fp)
+                self._current = snap
+                self._notify(snap)
+            self._last_payload = payload
+            return snap
+
+    def _notify(self, snap: DashboardSnapshot) -> None:
+        for fn in self._listeners:
+            try:
+                fn(snap)
+            except Exception:
+                # efeitos colaterais nunca podem derrubar o render
+                log.exception("listener de snapshot falhou")
+
+
+# ✅ snapshot compartilhado pelo processo inteiro
+SNAPSHOTS = SnapshotStore()
@@ -0,0 +1,267 @@
+"""
+Leitura em streaming do JSON do Apps Script.
+
+resp.json() segura ao mesmo tempo o corpo bruto, o texto decodificado, a
+árvore de dicts (uma por linha) e depois o DataFrame. Aqui o corpo é lido em
+blocos e o array "rows" é decodificado uma linha por vez, direto para buffers
+tipados por coluna (códigos int32 + dicionário para os nomes, float64 para
+VALOR). O resultado é um payload no formato colunar (core/columnar.py), que
+payload_to_df já sabe ler; o pico de memória fica perto do tamanho final.
+"""
+from __future__ import annotations
+
+import codecs
+import json
+import math
+from array import array
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from core.columnar import COLUMNAR_FORMAT
+
+# Colunas que viram códigos + dicionário (valores muito repetidos)
+_DICTIONARY_COLUMNS = ("INDICADORES", "RESPONSÁVEL", "DATA_ATUALIZAÇÃO")
+
+_DECODER = json.JSONDecoder()
+_WS = " \t\n\r"
+
+
+class StreamError(ValueError):
+    """Corpo que não é o JSON esperado (HTML de erro, truncado etc.)."""
+
+    def __init__(self, message: str, head: str = ""):
+        super().__init__(message)
+        self.head = head  # início do corpo recebido
+
+
+# =========================
+# Buffers por coluna
+# =========================
+class _DictColumn:
+    __slots__ = ("codes", "index")
+
+    def __init__(self, n_missing: int = 0):
+        self.index: Dict[Any, int] = {}
+        self.codes = array("i")
+        if n_missing:
+            self.codes.extend([self._code(None)] * n_missing)
+
+    def _code(self, v: Any) -> int:
+        code = self.index.get(v)
+        if code is None:
+            code = self.index[v] = len(self.index)
+        return code
+
+    def append(self, v: Any) -> None:
+        self.codes.append(self._code(v))
+
+    def data(self) -> np.ndarray:
+        return np.frombuffer(self.codes, dtype=np.int32) if self.codes else np.empty(0, dtype=np.int32)
+
+    def dictionary(self) -> List[Any]:
+        return list(self.index)
+
+
+class _FloatColumn:
+    __slots__ = ("values", "parse")
+
+    def __init__(self, parse: Callable[[Any], Optional[float]], n_missing: int = 0):
+        self.parse = parse
+        self.values = array("d", [math.nan] * n_missing)
+
+    def append(self, v: Any) -> None:
+        x = self.parse(v)
+        self.values.append(math.nan if x is None else x)
+
+    def data(self) -> np.ndarray:
+        return np.frombuffer(self.values, dtype=np.float64) if self.values else np.empty(0, dtype=np.float64)
+
+
+class _ObjectColumn:
+    __slots__ = ("values",)
+
+    def __init__(self, n_missing: int = 0):
+        self.values: List[Any] = [None] * n_missing
+
+    def append(self, v: Any) -> None:
+        self.values.append(v)
+
+    def data(self) -> List[Any]:
+        return self.values
+
+
+class ColumnBuffers:
+    """
+    Acumula linhas (dicts) em buffers tipados; colunas novas no meio do stream
+    são completadas com vazio. Com `report` (core/validate.py::ValidationReport),
+    cada linha é validada na mesma passada em que é convertida; itens que não
+    são objeto ficam de fora.
+    """
+
+    def __init__(self, parse_number: Callable[[Any], Optional[float]], report: Any = None):
+        self.parse_number = parse_number
+        self.report = report
+        self.columns: Dict[str, Any] = {}
+        self.n = 0
+
+    def _new_column(self, name: str):
+        if name in _DICTIONARY_COLUMNS:
+            return _DictColumn(self.n)
+        if name == "VALOR":
+            return _FloatColumn(self.parse_number, self.n)
+        return _ObjectColumn(self.n)
+
+    def append(self, row: Dict[str, Any]) -> None:
+        report = self.report
+        if type(row) is not dict:
+            if report is not None:
+                report.drop_row(self.n, row)
+            return
+        for name in row:
+            if name not in self.columns:
+                self.columns[name] = self._new_column(name)
+        for name, col in self.columns.items():
+            col.append(row.get(name))
+        if report is not None:
+            valor = self.columns["VALOR"].values[-1] if "VALOR" in self.columns else math.nan
+            report.check_row(self.n, row, None if valor != valor else valor)
+        self.n += 1
+
+    def to_columnar(self, meta: Dict[str, Any]) -> Dict[str, Any]:
+        """Payload colunar; o relatório de validação (se houver) vai em "validation"."""
+        out = dict(meta)
+        if self.report is not None:
+            out["validation"] = self.report
+        out.update(
+            {
+                "format": COLUMNAR_FORMAT,
+                "columns": list(self.columns),
+                "dictionaries": {k: c.dictionary() for k, c in self.columns.items() if isinstance(c, _DictColumn)},
+                "data": [c.data() for c in self.columns.values()],
+            }
+        )
+        return out
+
+
+# =========================
+# Parser incremental
+# =========================
+class _Reader:
+    """Texto JSON vindo em blocos; decodifica um valor por vez com raw_decode."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks: Iterator[bytes] = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.head = ""  # início do corpo, para a mensagem de erro
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        if self.pos > 65536:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        for chunk in self._chunks:
+            if not chunk:
+                continue
+            text = self._utf8.decode(chunk)
+            if len(self.head) < 400:
+                self.head += text[: 400 - len(self.head)]
+            self.buf += text
+            return True
+        self.buf += self._utf8.decode(b"", final=True)
+        self.eof = True
+        return False
+
+    def read_head(self) -> str:
+        """Completa `head` com mais blocos (o erro pode aparecer nos primeiros bytes)."""
+        while len(self.head) < 400 and self._fill():
+            pass
+        return self.head
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise StreamError("JSON truncado")
+
+    def expect(self, ch: str) -> None:
+        if self.peek() != ch:
+            raise StreamError(f"esperado {ch!r} na posição {self.pos}")
+        self.pos += 1
+
+    def _grow(self) -> bool:
+        """Dobra o trecho pendente (valores grandes não são re-decodificados a cada bloco)."""
+        want = 2 * (len(self.buf) - self.pos)
+        grew = False
+        while len(self.buf) - self.pos < want and self._fill():
+            grew = True
+        return grew
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                if self._grow():
+                    continue
+                raise StreamError(str(e)) from None
+            # número/literal no fim do bloco pode estar cortado: lê mais antes de aceitar
+            if end == len(self.buf) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+
+def stream_payload(
+    chunks: Iterable[bytes],
+    parse_number: Callable[[Any], Optional[float]],
+    report_factory: Optional[Callable[[], Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Lê o objeto do endpoint em streaming. Se houver "rows" (lista), as linhas
+    vão direto para ColumnBuffers e o retorno é um payload colunar; as demais
+    chaves (updatedAt, sheet, version, error...) são copiadas como vieram.
+    `report_factory` cria o relatório de validação preenchido durante a leitura.
+    Levanta StreamError se o corpo não for JSON.
+    """
+    reader = _Reader(chunks)
+    meta: Dict[str, Any] = {}
+    buffers: Optional[ColumnBuffers] = None
+    try:
+        reader.expect("{")
+        if reader.peek() == "}":
+            return meta
+        while True:
+            key = reader.value()
+            reader.expect(":")
+            if key == "rows" and reader.peek() == "[":
+                reader.pos += 1
+                buffers = ColumnBuffers(parse_number, report_factory() if report_factory else None)
+                if reader.peek() != "]":
+                    while True:
+                        row = reader.value()
+                        if isinstance(row, dict) or buffers.report is not None:
+                            buffers.append(row)
+                        if reader.peek() == ",":
+                            reader.pos += 1
+                            continue
+                        break
+                reader.expect("]")
+            else:
+                meta[key] = reader.value()
+            if reader.peek() == ",":
+                reader.pos += 1
+                continue
+            reader.expect("}")
+            break
+    except StreamError as e:
+        raise StreamError(str(e), reader.read_head()) from None
+    return meta if buffers is None else buffers.to_columnar(meta)
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from core.constants import METRICS_HOST, METRICS_PORT
+
+log = logging.getLogger(__name__)
+
+_LabelKey = Tuple[Tuple[str, str], ...]
+
+# Buckets (segundos) para latência de fetch / tempo de parse
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _labels_key(labels: Dict[str, str]) -> _LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape_label(v: str) -> str:
+    return v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(key: _LabelKey) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in key) + "}"
+
+
+def _fmt_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._lock = threading.Lock()
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        super().__init__(name, help_text)
+        self._values: Dict[_LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _labels_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(_labels_key(labels), 0.0)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [f"{self.name}{_fmt_labels(k)} {_fmt_value(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[_labels_key(labels)] = float(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # último = +Inf
+        self._sum = 0.0
+        self._count = 0
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._counts[bisect_left(self.buckets, value)] += 1
+            self._sum += value
+            self._count += 1
+
+    def render(self) -> list[str]:
+        with self._lock:
+            counts, total, n = list(self._counts), self._sum, self._count
+        lines = self._header()
+        acc = 0
+        for bound, c in zip(self.buckets + (float("inf"),), counts):
+            acc += c
+            lines.append(f'{self.name}_bucket{{le="{_fmt_value(bound)}"}} {acc}')
+        lines.append(f"{self.name}_sum {_fmt_value(round(total, 6))}")
+        lines.append(f"{self.name}_count {n}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Formato texto do Prometheus (exposition format 0.0.4)."""
+        lines: list[str] = []
+        for m in self._metrics.values():
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+FETCH_LATENCY = REGISTRY.register(Histogram(
+    "dashboard_fetch_latency_seconds", "Duração da chamada ao Apps Script WebApp (até o corpo inteiro ser lido)."
+))
+FETCH_STATUS = REGISTRY.register(Counter(
+    "dashboard_fetch_http_responses_total", "Respostas do Apps Script por status HTTP (error = sem resposta)."
+))
+FETCH_CACHE = REGISTRY.register(Counter(
+    "dashboard_fetch_cache_requests_total", "Chamadas a fetch_payload por resultado do cache (hit/miss)."
+))
+FETCH_CACHE_HIT_RATIO = REGISTRY.register(Gauge(
+    "dashboard_fetch_cache_hit_ratio", "Fração de chamadas a fetch_payload servidas pelo cache."
+))
+PAYLOAD_ROWS = REGISTRY.register(Gauge(
+    "dashboard_payload_rows", "Linhas no último payload processado."
+))
+PAYLOAD_BAD_ROWS = REGISTRY.register(Gauge(
+    "dashboard_payload_bad_rows", "Linhas com problema de formato/tipo no último payload processado."
+))
+PARSE_SECONDS = REGISTRY.register(Histogram(
+    "dashboard_parse_seconds", "Duração de payload_to_df (payload -> DataFrame)."
+))
+HTML_BYTES = REGISTRY.register(Gauge(
+    "dashboard_rendered_html_bytes", "Tamanho (bytes UTF-8) do último HTML renderizado."
+))
+DELTA_FETCHES = REGISTRY.register(Counter(
+    "dashboard_delta_fetches_total", "Buscas por modo de resposta (full/delta/mismatch/legacy)."
+))
+DELTA_ROWS = REGISTRY.register(Counter(
+    "dashboard_delta_rows_total", "Linhas recebidas em respostas delta e aplicadas ao índice."
+))
+POLLS = REGISTRY.register(Counter(
+    "dashboard_polls_total", "Buscas agendadas por resultado (changed/unchanged)."
+))
+POLL_INTERVAL = REGISTRY.register(Gauge(
+    "dashboard_poll_interval_seconds", "Intervalo escolhido pelo agendador adaptativo para a próxima busca."
+))
+POLL_HIT_RATIO = REGISTRY.register(Gauge(
+    "dashboard_poll_hit_ratio", "Fração das últimas buscas que encontraram dados novos."
+))
+
+
+def record_cache_result(hit: bool) -> None:
+    FETCH_CACHE.inc(result="hit" if hit else "miss")
+    hits, misses = FETCH_CACHE.value(result="hit"), FETCH_CACHE.value(result="miss")
+    FETCH_CACHE_HIT_RATIO.set(hits / (hits + misses))
+
+
+def metrics_text() -> str:
+    return REGISTRY.render()
+
+
+def write_metrics_file(path: str | Path) -> None:
+    """Grava as métricas num arquivo (textfile collector do node_exporter), de forma atômica."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=".metrics-", suffix=".prom")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(metrics_text())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+# =========================
+# Endpoint HTTP local (/metrics)
+# =========================
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:  # noqa: N802 (API do http.server)
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass  # scrapes a cada 15s não precisam ir para o log
+
+
+_SERVER: Optional[ThreadingHTTPServer] = None
+_SERVER_FAILED = False  # porta ocupada etc.: não tenta de novo a cada rerun
+_SERVER_LOCK = threading.Lock()
+
+
+def start_metrics_server(host: str = METRICS_HOST, port: Optional[int] = METRICS_PORT) -> Optional[ThreadingHTTPServer]:
+    """Sobe (uma vez por processo) o endpoint /metrics numa thread daemon. port=None desliga."""
+    global _SERVER, _SERVER_FAILED
+    if not port or _SERVER_FAILED:
+        return _SERVER
+    with _SERVER_LOCK:
+        if _SERVER is None and not _SERVER_FAILED:
+            try:
+                _SERVER = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+            except OSError:
+                _SERVER_FAILED = True
+                log.exception("não foi possível abrir /metrics em %s:%s (seguindo sem)", host, port)
+                return None
+            threading.Thread(target=_SERVER.serve_forever, name="metrics-http", daemon=True).start()
+            log.info("métricas em http://%s:%s/metrics", host, port)
+    return _SERVER
@@ -0,0 +1,145 @@
+"""
+DATA_ATUALIZAÇÃO -> datetime UTC, vetorizado.
+
+pd.to_datetime sem `format` adivinha o formato elemento a elemento: é lento
+em strings pt-BR/mistas, lê "10/09/2026" como 9 de outubro e trata horário
+sem fuso como UTC. Aqui:
+
+- cada string distinta é convertida uma vez (muitas linhas dividem o mesmo
+  horário de atualização) e o resultado fica num cache entre payloads;
+- strings com fuso ("...Z", "-03:00") vão direto pelo ISO 8601;
+- as sem fuso usam o formato dominante (detectado numa amostra) com `format`
+  explícito, numa passada só; o que sobrar tenta os demais formatos;
+- horário sem fuso é horário de Brasília (TIMEZONE), convertido para UTC.
+"""
+from __future__ import annotations
+
+import re
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from core.constants import TIMESTAMP_CACHE_SIZE, TIMEZONE
+
+_UNIT = "datetime64[us]"
+_NAT = np.iinfo(np.int64).min  # NaT como int64
+
+# "...Z", "+00:00", "-0300" no fim: a string já diz o fuso
+_TZ_SUFFIX_RE = re.compile(r"(?:Z|[+-]\d{2}:?\d{2})$")
+
+# Formatos sem fuso aceitos (Sheets em pt-BR: dia primeiro, nunca mês primeiro)
+NAIVE_FORMATS = (
+    "ISO8601",              # "2026-10-19 13:00:00", "2026-10-19"
+    "%d/%m/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M",
+    "%d/%m/%Y",
+)
+
+_SAMPLE_SIZE = 64
+
+# string -> microssegundos desde a época (UTC); int puro para o lookup ficar barato
+_CACHE: Dict[str, int] = {}
+_LOCK = threading.Lock()
+_dominant: Optional[str] = None  # formato que venceu no último payload
+
+
+def detect_format(values: pd.Series) -> Optional[str]:
+    """Formato (de NAIVE_FORMATS) que converte mais strings de uma amostra; None se nenhum serve."""
+    sample = values.iloc[:_SAMPLE_SIZE]
+    best, best_hits = None, 0
+    for fmt in NAIVE_FORMATS:
+        hits = int(pd.to_datetime(sample, format=fmt, errors="coerce").notna().sum())
+        if hits > best_hits:
+            best, best_hits = fmt, hits
+        if hits == len(sample):
+            break
+    return best
+
+
+def _br_to_iso(s: str) -> str:
+    """"19/10/2026 10:00" -> "2026-10-19 10:00" (dd/mm/aaaa com zeros); o resto passa igual."""
+    return f"{s[6:10]}-{s[3:5]}-{s[:2]}{s[10:]}" if s[2:3] == "/" and s[5:6] == "/" else s
+
+
+def _parse_naive(values: pd.Series) -> pd.Series:
+    """
+    Strings sem fuso -> UTC. O formato dominante decide a primeira passada:
+    dd/mm/aaaa de largura fixa é reescrito para ISO e tudo vai pelo parser
+    ISO 8601 do pandas (bem mais rápido que strptime); o que sobrar (ex.:
+    "9/10/2026 8:05") tenta os formatos de NAIVE_FORMATS com `format` explícito.
+    """
+    global _dominant
+    sample = values.iloc[:_SAMPLE_SIZE]
+    with _LOCK:  # sessões convertem em paralelo; o formato é compartilhado
+        dominant = _dominant
+        if dominant is None or pd.to_datetime(sample, format=dominant, errors="coerce").isna().any():
+            dominant = _dominant = detect_format(values) or dominant
+
+    first = values if dominant in (None, "ISO8601") else pd.Series([_br_to_iso(v) for v in values], index=values.index, dtype=object)
+    out = pd.to_datetime(first, format="ISO8601", errors="coerce").astype(_UNIT)
+    pending = values[out.isna()]
+    for fmt in NAIVE_FORMATS[1:]:
+        if pending.empty:
+            break
+        parsed = pd.to_datetime(pending, format=fmt, errors="coerce")
+        ok = parsed.notna()
+        out[ok[ok].index] = parsed[ok].astype(_UNIT)
+        pending = pending[~ok]
+
+    # horário de Brasília (sem horário de verão desde 2019; histórico ambíguo vira NaT)
+    local = out.dt.tz_localize(TIMEZONE, ambiguous="NaT", nonexistent="shift_forward")
+    return local.dt.tz_convert("UTC").dt.tz_localize(None)
+
+
+def _has_tz(tail: str) -> bool:
+    """`tail` = últimos 6 caracteres; o regex só roda quando há sinal (+/-)."""
+    return tail.endswith("Z") or (("+" in tail or "-" in tail) and _TZ_SUFFIX_RE.search(tail) is not None)
+
+
+def _parse_strings(strings: List[str]) -> np.ndarray:
+    """Strings distintas -> microssegundos UTC (int64, NaT = _NAT) em poucas chamadas vetorizadas."""
+    stripped = [s.strip() for s in strings]
+    values = pd.Series(stripped, dtype=object)
+    out = pd.Series(pd.NaT, index=values.index, dtype=_UNIT)
+
+    aware = np.array([_has_tz(s[-6:]) for s in stripped], dtype=bool)
+    if aware.any():
+        parsed = pd.to_datetime(values[aware], format="ISO8601", errors="coerce", utc=True)
+        out[aware] = parsed.dt.tz_localize(None).astype(_UNIT)
+    if not aware.all():
+        out[~aware] = _parse_naive(values[~aware]).astype(_UNIT)
+    return out.to_numpy(dtype=_UNIT).view(np.int64)
+
+
+def parse_unique(values: Sequence[Any]) -> pd.Series:
+    """
+    Valores distintos (ex.: dicionário de uma coluna colunar) -> Series
+    datetime64[us, UTC] na mesma ordem. Só strings convertem; o resto vira NaT.
+    """
+    distinct = [v for v in dict.fromkeys(values) if type(v) is str]
+    # cópia local: o cache pode ser limpo (aqui ou noutra sessão) antes do lookup
+    with _LOCK:
+        known = {v: _CACHE[v] for v in distinct if v in _CACHE}
+    missing = [v for v in distinct if v not in known]
+    if missing:
+        fresh = dict(zip(missing, _parse_strings(missing).tolist()))
+        known.update(fresh)
+        with _LOCK:
+            if len(_CACHE) + len(fresh) > TIMESTAMP_CACHE_SIZE:
+                _CACHE.clear()
+            _CACHE.update(fresh)
+    ints = np.fromiter(
+        (known.get(v, _NAT) if type(v) is str else _NAT for v in values),
+        dtype=np.int64,
+        count=len(values),
+    )
+    return pd.Series(ints.view(_UNIT)).dt.tz_localize("UTC")
+
+
+def parse_timestamps(values: Sequence[Any]) -> pd.Series:
+    """Uma data por linha -> Series datetime64[us, UTC]; converte só os valores distintos."""
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=True)
+    uniq = parse_unique(list(uniques))
+    return pd.Series(uniq.array.take(codes, allow_fill=True))
@@ -1,9 +1,177 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Tuple
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.columnar import columnar_columns, is_columnar
+from core.constants import VALIDATION_SAMPLE_SIZE
+from core.normalize import parse_number
+from core.streaming import ColumnBuffers
 
 EXPECTED_ROW_KEYS = ("INDICADORES", "RESPONSÁVEL", "VALOR", "DATA_ATUALIZAÇÃO")
 
+# Sem estas a linha não serve para nada (DATA_ATUALIZAÇÃO é opcional: latest_values vive sem ela)
+REQUIRED_ROW_KEYS = ("INDICADORES", "RESPONSÁVEL", "VALOR")
+
+# VALOR vazio é célula em branco no Sheets, não erro
+_BLANK_VALUES = ("", "-")
+
+
+@dataclass
+class ValidationReport:
+    """
+    Resultado da validação feita DURANTE a conversão do payload.
+
+    - check_row: checagens por linha (formato/tipos), chamada por ColumnBuffers
+      enquanto a linha é convertida — sem segunda passada;
+    - flag: checagens por coluna já tipada (nome vazio após normalizar, data
+      inválida), feitas por valor distinto em payload_to_df.
+    Guarda contagem por problema e até `sample_size` exemplos.
+    """
+
+    total_rows: int = 0
+    issues: Dict[str, int] = field(default_factory=dict)
+    samples: List[Dict[str, Any]] = field(default_factory=list)
+    missing_columns: List[str] = field(default_factory=list)
+    dropped_rows: int = 0
+    sample_size: int = VALIDATION_SAMPLE_SIZE
+    _bad_rows: array = field(default_factory=lambda: array("i"), repr=False)
+    _mask: Optional[np.ndarray] = field(default=None, repr=False)
+
+    # -------------------------
+    # Registro
+    # -------------------------
+    def _issue(self, issue: str, index: int, row: Any) -> None:
+        self.issues[issue] = self.issues.get(issue, 0) + 1
+        if len(self.samples) < self.sample_size:
+            self.samples.append({"row": index, "issue": issue, "data": repr(row)[:160]})
+
+    def drop_row(self, index: int, row: Any) -> None:
+        """Item de "rows" que não é objeto: fica fora do DataFrame."""
+        self.total_rows += 1
+        self.dropped_rows += 1
+        self._issue("linha não é objeto", index, row)
+
+    def check_row(self, index: int, row: Dict[str, Any], valor: Optional[float]) -> bool:
+        """
+        Valida uma linha já convertida (`index` = posição no DataFrame, `valor` =
+        VALOR parseado). False se a linha tem problema.
+        """
+        self.total_rows += 1
+
+        bad = False
+        if "VALOR" not in row:
+            self._issue("sem VALOR", index, row)
+            bad = True
+
+        # nomes: null conta como ausente (igual ao payload colunar); texto em
+        # branco fica para a checagem por coluna ("... vazio", _blank_name)
+        for key in ("INDICADORES", "RESPONSÁVEL"):
+            v = row.get(key)
+            if v is None:
+                self._issue(f"sem {key}", index, row)
+                bad = True
+            elif type(v) is not str:
+                self._issue(f"{key} não é texto", index, row)
+                bad = True
+
+        raw = row.get("VALOR")
+        if valor is None and raw is not None:
+            if type(raw) is str:
+                if raw.strip() not in _BLANK_VALUES:
+                    self._issue("VALOR não numérico", index, row)
+                    bad = True
+            else:
+                self._issue("VALOR com tipo inválido", index, row)
+                bad = True
+        elif type(raw) is bool:
+            self._issue("VALOR com tipo inválido", index, row)
+            bad = True
+
+        dt = row.get("DATA_ATUALIZAÇÃO")
+        if dt is not None and type(dt) is not str:
+            self._issue("DATA_ATUALIZAÇÃO não é texto", index, row)
+            bad = True
+
+        if bad:
+            self._bad_rows.append(index)
+        return not bad
+
+    def flag(self, issue: str, mask: np.ndarray, describe: Callable[[int], Any]) -> None:
+        """Marca as linhas de `mask` (checagem por coluna); `describe(i)` gera o exemplo."""
+        hits = np.flatnonzero(mask)
+        if not len(hits):
+            return
+        self.issues[issue] = self.issues.get(issue, 0) + int(len(hits))
+        for i in hits[: max(0, self.sample_size - len(self.samples))]:
+            self.samples.append({"row": int(i), "issue": issue, "data": repr(describe(int(i)))[:160]})
+        self._mask = mask.copy() if self._mask is None else (self._mask | mask)
+
+    # -------------------------
+    # Leitura
+    # -------------------------
+    @property
+    def bad_rows(self) -> int:
+        """Linhas com pelo menos um problema (por linha ou por coluna, sem contar duas vezes)."""
+        if self._mask is None:
+            return len(self._bad_rows) + self.dropped_rows
+        bad = self._mask.copy()
+        if self._bad_rows:
+            bad[np.frombuffer(self._bad_rows, dtype=np.int32)] = True
+        return int(bad.sum()) + self.dropped_rows
+
+    @property
+    def ok(self) -> bool:
+        return not self.issues
+
+    def copy(self) -> "ValidationReport":
+        return ValidationReport(
+            total_rows=self.total_rows,
+            issues=dict(self.issues),
+            samples=list(self.samples),
+            missing_columns=list(self.missing_columns),
+            dropped_rows=self.dropped_rows,
+            sample_size=self.sample_size,
+            _bad_rows=array("i", self._bad_rows),
+            _mask=None if self._mask is None else self._mask.copy(),
+        )
+
+    def message(self) -> str:
+        if self.ok and not self.missing_columns:
+            return f"Payload OK ({self.total_rows} linhas)."
+        parts = [f"{self.bad_rows} de {self.total_rows} linha(s) com problema"]
+        if self.issues:
+            parts.append(", ".join(f"{k}: {v}" for k, v in sorted(self.issues.items(), key=lambda kv: -kv[1])))
+        if self.missing_columns:
+            parts.append(f"colunas ausentes: {', '.join(self.missing_columns)}")
+        return "; ".join(parts) + "."
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": self.total_rows,
+            "bad_rows": self.bad_rows,
+            "issues": dict(self.issues),
+            "missing_columns": list(self.missing_columns),
+            "dropped_rows": self.dropped_rows,
+            "samples": list(self.samples),
+        }
+
+
+def ingest_rows(rows: List[Any]) -> Tuple[ColumnBuffers, ValidationReport]:
+    """
+    Passada única sobre "rows": valida cada linha enquanto a converte para
+    colunas tipadas. Linhas que não são objeto ficam de fora; as demais
+    entram mesmo com problema (campos ruins viram vazio/NaN) e vão para o relatório.
+    """
+    report = ValidationReport()
+    buffers = ColumnBuffers(parse_number, report=report)
+    for row in rows:
+        buffers.append(row)
+    return buffers, report
+
 
 def validate_payload(payload: Any) -> Tuple[bool, str]:
     """
@@ -14,6 +182,8 @@ def validate_payload(payload: Any) -> Tuple[bool, str]:
 
     Observação:
     - Se faltar alguma coluna esperada, isso NÃO é erro fatal: a aplicação pode preencher com None.
+    - Linhas com problema também não são fatais: a mensagem traz quantas são e
+      quais problemas (todas as linhas são checadas, não só a primeira).
     """
     if not isinstance(payload, dict):
         return False, "Payload inválido: resposta não é um objeto JSON (dict)."
@@ -21,6 +191,16 @@ def validate_payload(payload: Any) -> Tuple[bool, str]:
     if "error" in payload and "rows" not in payload:
         return False, f"Endpoint retornou erro: {payload.get('error')}"
 
+    if is_columnar(payload):
+        try:
+            cols = columnar_columns(payload)
+        except ValueError as e:
+            return False, str(e)
+        missing = [k for k in EXPECTED_ROW_KEYS if k not in cols]
+        if missing:
+            return True, f"Payload colunar OK (colunas ausentes serão preenchidas): {', '.join(missing)}"
+        return True, "Payload colunar OK."
+
     rows = payload.get("rows", None)
     if rows is None:
         return False, "Payload inválido: campo 'rows' ausente."
@@ -30,12 +210,9 @@ def validate_payload(payload: Any) -> Tuple[bool, str]:
     if len(rows) == 0:
         return True, "Payload OK (rows vazio)."
 
-    first = rows[0]
-    if not isinstance(first, dict):
+    buffers, report = ingest_rows(rows)
+    if buffers.n == 0:
         return False, "Payload inválido: items de 'rows' não são objetos."
 
-    missing = [k for k in EXPECTED_ROW_KEYS if k not in first]
-    if missing:
-        return True, f"Payload OK (colunas ausentes serão preenchidas): {', '.join(missing)}"
-
-    return True, "Payload OK."
+    report.missing_columns = [k for k in EXPECTED_ROW_KEYS if k not in buffers.columns]
+    return True, report.message()
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import hmac
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from core.constants import WEBHOOK_DEBOUNCE_SECONDS, WEBHOOK_HOST, WEBHOOK_PORT
+
+log = logging.getLogger(__name__)
+
+# Corpo máximo aceito (o Apps Script manda só alguns campos do evento de edição)
+_MAX_BODY_BYTES = 16 * 1024
+
+
+def token_matches(expected: str, given: Optional[str]) -> bool:
+    """Comparação em tempo constante; token vazio nunca autentica."""
+    if not expected or not given:
+        return False
+    return hmac.compare_digest(expected.encode("utf-8"), given.encode("utf-8"))
+
+
+def request_token(header: Optional[str], query: str, body: bytes) -> Optional[str]:
+    """Token enviado pelo Apps Script: header X-Webhook-Token, ?token= ou {"token": ...} no corpo."""
+    given = header or (parse_qs(query).get("token") or [None])[0]
+    if not given and body:
+        try:
+            given = (json.loads(body.decode("utf-8")) or {}).get("token")
+        except (ValueError, AttributeError):
+            given = None
+    return given
+
+
+class RefreshTrigger:
+    """
+    Agrupa chamadas do webhook numa única atualização.
+
+    Uma edição no Sheets costuma disparar vários onEdit em sequência: o 1º
+    acorda a thread, que espera `debounce` segundos e roda `refresh` UMA vez
+    (chamadas durante a espera/execução viram no máximo mais uma rodada).
+    """
+
+    def __init__(self, refresh: Callable[[], None], debounce: float = WEBHOOK_DEBOUNCE_SECONDS):
+        self.refresh = refresh
+        self.debounce = float(debounce)
+        self.requests = 0
+        self.runs = 0
+        self.last_run_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._event = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="webhook-refresh", daemon=True)
+        self._thread.start()
+
+    def trigger(self) -> None:
+        self.requests += 1
+        self._event.set()
+
+    def _loop(self) -> None:
+        while True:
+            self._event.wait()
+            time.sleep(self.debounce)
+            self._event.clear()
+            try:
+                self.refresh()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)[:300]
+                log.exception("atualização via webhook falhou")
+            self.runs += 1
+            self.last_run_at = time.time()
+
+    def status(self) -> dict:
+        return {
+            "requests": self.requests,
+            "runs": self.runs,
+            "last_run_at": self.last_run_at,
+            "last_error": self.last_error,
+        }
+
+
+def _make_handler(trigger: RefreshTrigger, token: str):
+    class _WebhookHandler(BaseHTTPRequestHandler):
+        def _reply(self, code: int, body: dict) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self) -> None:  # noqa: N802 (API do http.server)
+            parts = urlsplit(self.path)
+            if parts.path != "/webhook":
+                self._reply(404, {"ok": False, "error": "not found"})
+                return
+
+            length = int(self.headers.get("Content-Length") or 0)
+            if length > _MAX_BODY_BYTES:
+                self._reply(413, {"ok": False, "error": "payload too large"})
+                return
+            raw = self.rfile.read(length) if length else b""
+
+            given = request_token(self.headers.get("X-Webhook-Token"), parts.query, raw)
+            if not token_matches(token, given):
+                self._reply(401, {"ok": False, "error": "unauthorized"})
+                return
+
+            trigger.trigger()
+            self._reply(202, {"ok": True, "queued": True})
+
+        def do_GET(self) -> None:  # noqa: N802
+            if urlsplit(self.path).path == "/webhook/status":
+                self._reply(200, {"ok": True, **trigger.status()})
+            else:
+                self._reply(404, {"ok": False, "error": "not found"})
+
+        def log_message(self, *args) -> None:
+            pass
+
+    return _WebhookHandler
+
+
+_SERVER: Optional[ThreadingHTTPServer] = None
+_SERVER_FAILED = False
+_SERVER_LOCK = threading.Lock()
+
+
+def start_webhook_server(
+    refresh: Callable[[], None],
+    token: str,
+    host: str = WEBHOOK_HOST,
+    port: Optional[int] = WEBHOOK_PORT,
+) -> Optional[ThreadingHTTPServer]:
+    """
+    Sobe (uma vez por processo) o endpoint POST /webhook numa thread daemon.
+    Sem token configurado (ou port=None) o webhook fica desligado.
+    """
+    global _SERVER, _SERVER_FAILED
+    if not port or not token or _SERVER_FAILED:
+        return _SERVER
+    with _SERVER_LOCK:
+        if _SERVER is None and not _SERVER_FAILED:
+            trigger = RefreshTrigger(refresh)
+            try:
+                _SERVER = ThreadingHTTPServer((host, int(port)), _make_handler(trigger, token))
+            except OSError:
+                _SERVER_FAILED = True
+                log.exception("não foi possível abrir o webhook em %s:%s (seguindo sem)", host, port)
+                return None
+            threading.Thread(target=_SERVER.serve_forever, name="webhook-http", daemon=True).start()
+            log.info("webhook em http://%s:%s/webhook", host, port)
+    return _SERVER
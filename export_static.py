@@ -0,0 +1,134 @@
+"""
+Exporta o dashboard como HTML estático, em loop (headless, sem Streamlit).
+
+Cada ciclo roda fetch -> payload_to_df -> cards -> render_dashboard e grava
+<out-dir>/dashboard.html de forma atômica (arquivo temporário + os.replace),
+então qualquer servidor estático (ou kiosk via file://) nunca lê um arquivo pela metade.
+
+Rodar:
+  python export_static.py --out-dir public            # loop (intervalo adaptativo, core/scheduler.py)
+  python export_static.py --out-dir public --once     # um único export
+  python export_static.py --out-dir public --metrics-file /var/lib/node_exporter/dashboard.prom
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from core.constants import POLL_MIN_SECONDS
+from core.data import fetch_payload_incremental
+from core.scheduler import SCHEDULER
+from core.settings import load_credentials
+from core.snapshot import payload_fingerprint
+from core.telemetry import write_metrics_file
+from ui.dashboard import build_dashboard_html
+
+log = logging.getLogger("export_static")
+
+OUTPUT_FILENAME = "dashboard.html"
+
+
+def write_atomic(path: Path, content: str) -> None:
+    """Grava em arquivo temporário no mesmo diretório e troca via os.replace."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def _with_meta_refresh(html: str, seconds: int) -> str:
+    """Página estática se recarrega sozinha (o export não empurra nada pro browser)."""
+    if seconds <= 0:
+        return html
+    return html.replace("<head>", f'<head>\n    <meta http-equiv="refresh" content="{seconds}" />', 1)
+
+
+def export_once(url: str, token: str, out_dir: Path, meta_refresh: int = 0) -> bool:
+    """Roda o pipeline uma vez. Retorna False (sem tocar no arquivo atual) se o endpoint falhar."""
+    payload = fetch_payload_incremental(url, token)
+    if "error" in payload and "rows" not in payload:
+        log.warning("endpoint retornou erro: %s", payload)
+        return False
+    SCHEDULER.observe(payload_fingerprint(payload), payload.get("updatedAt"))
+
+    html = _with_meta_refresh(build_dashboard_html(payload), meta_refresh)
+    write_atomic(out_dir / OUTPUT_FILENAME, html)
+    log.info("exportado %s (%s bytes)", out_dir / OUTPUT_FILENAME, len(html.encode("utf-8")))
+    return True
+
+
+def _write_metrics(path: Optional[Path]) -> None:
+    if path is None:
+        return
+    try:
+        write_metrics_file(path)
+    except OSError:
+        log.exception("falha ao gravar métricas em %s", path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Exporta o dashboard comercial como HTML estático.")
+    parser.add_argument("--out-dir", type=Path, required=True)
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=None,
+        help="segundos fixos entre exports (padrão: agendador adaptativo)",
+    )
+    parser.add_argument("--once", action="store_true", help="exporta uma vez e sai")
+    parser.add_argument(
+        "--meta-refresh",
+        type=int,
+        default=None,
+        help="segundos do <meta refresh> na página (padrão: o intervalo fixo ou POLL_MIN_SECONDS; 0 desliga)",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        type=Path,
+        default=None,
+        help="grava métricas no formato texto do Prometheus a cada ciclo (textfile collector)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    url, token = load_credentials()
+    if not (url and token):
+        raise SystemExit("Defina SHEETS_WEBAPP_URL e SHEETS_WEBAPP_TOKEN (env ou .streamlit/secrets.toml)")
+
+    meta_refresh = int(args.interval or POLL_MIN_SECONDS) if args.meta_refresh is None else args.meta_refresh
+
+    if args.once:
+        ok = export_once(url, token, args.out_dir, meta_refresh)
+        _write_metrics(args.metrics_file)
+        raise SystemExit(0 if ok else 1)
+
+    while True:
+        started = time.monotonic()
+        try:
+            export_once(url, token, args.out_dir, meta_refresh)
+        except Exception:
+            log.exception("falha no export (mantendo o último dashboard.html)")
+        _write_metrics(args.metrics_file)
+        interval = args.interval or SCHEDULER.next_interval()
+        time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+if __name__ == "__main__":
+    main()
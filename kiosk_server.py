@@ -0,0 +1,323 @@
+"""
+Servidor kiosk standalone (sem sessão Streamlit).
+
+Um único loop busca o payload, monta os cards (ui/dashboard.py) e renderiza o
+dashboard UMA vez; todas as TVs conectadas recebem o mesmo resultado:
+  - GET /        -> HTML completo do dashboard (snapshot atual)
+  - GET /events  -> Server-Sent Events com só os slots que mudaram
+  - GET /healthz -> status em JSON
+  - GET /timings -> tempos por etapa (janela móvel) em JSON
+  - GET /metrics -> métricas no formato texto do Prometheus
+  - POST /webhook -> chamado pelo Apps Script no onEdit (token SHEETS_WEBHOOK_TOKEN):
+                     antecipa a próxima busca em vez de esperar o intervalo
+
+Rodar:
+  python kiosk_server.py --port 8502
+  python kiosk_server.py --port 8502 --period day   # realizados de hoje (cubo)
+
+Credenciais: variáveis de ambiente SHEETS_WEBAPP_URL / SHEETS_WEBAPP_TOKEN
+(e SHEETS_WEBHOOK_TOKEN, opcional) ou .streamlit/secrets.toml (projeto ou ~/.streamlit).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+from core.constants import WEBHOOK_DEBOUNCE_SECONDS
+from core.data import fetch_payload_incremental
+from core.periods import PERIODS, parse_period
+from core.instrumentation import timings_json
+from core.scheduler import SCHEDULER
+from core.settings import load_credentials, load_webhook_token
+from core.snapshot import DashboardSnapshot
+from core.telemetry import metrics_text
+from core.webhook import request_token, token_matches
+from ui.dashboard import current_snapshot, period_view
+from ui.render import minify_html
+
+log = logging.getLogger("kiosk_server")
+
+# Heartbeat do SSE (mantém proxies/TVs com a conexão aberta)
+SSE_HEARTBEAT_SECONDS = 25
+
+# Fila por tela: se uma TV ficar muito atrás, manda recarregar a página
+SSE_CLIENT_QUEUE_MAX = 16
+
+# Cliente SSE injetado no HTML: repassa os slots para o listener "dash:slots"
+# do template (mesmo caminho do patch incremental do app Streamlit).
+_SSE_CLIENT_SCRIPT = """
+<script>
+  (function () {
+    if (!window.EventSource) return;
+    const es = new EventSource("/events");
+    es.addEventListener("slots", function (ev) {
+      try {
+        // mesma página: nonce e origem desta renderização (templates/dashboard.html)
+        window.postMessage({ type: "dash:slots", nonce: window.dashNonce, slots: JSON.parse(ev.data) }, window.dashOrigin);
+      } catch (e) {}
+    });
+    es.addEventListener("reload", function () {
+      window.location.reload();
+    });
+  })();
+</script>
+"""
+
+
+class KioskState:
+    """Snapshot renderizado compartilhado por todas as telas + assinantes SSE."""
+
+    def __init__(self) -> None:
+        self.html: str = ""
+        self.fingerprint: Optional[str] = None
+        self.slots: dict[str, dict[str, str]] = {}  # key -> {hash, html}
+        self.version: int = 0
+        self.updated_at: Optional[float] = None
+        self.validation: dict = {}  # relatório de validação do último payload
+        self.subscribers: set[asyncio.Queue] = set()
+        self.wake = asyncio.Event()  # webhook: busca agora, sem esperar o intervalo
+
+    def publish(self, snapshot: DashboardSnapshot) -> None:
+        """Atualiza o snapshot e avisa as telas (somente slots alterados)."""
+        self.updated_at = time.time()
+        self.validation = {k: v for k, v in snapshot.validation.items() if k != "samples"}
+        if snapshot.fingerprint == self.fingerprint:
+            return
+        self.fingerprint = snapshot.fingerprint
+
+        new_slots = {
+            key: {"hash": snapshot.slot_hashes[key], "html": minify_html(value)}
+            for key, value in snapshot.slots.items()
+        }
+        changed = {
+            key: slot for key, slot in new_slots.items()
+            if (self.slots.get(key) or {}).get("hash") != slot["hash"]
+        }
+        structure_changed = set(new_slots) != set(self.slots)
+
+        if not changed and not structure_changed:
+            return
+
+        first = not self.slots
+        self.html = snapshot.html.replace("</body>", f"{_SSE_CLIENT_SCRIPT}</body>", 1)
+        self.slots = new_slots
+        self.version += 1
+        log.info("snapshot v%s: %s slot(s) alterado(s)", self.version, len(changed))
+
+        if first:
+            return
+
+        event = ("reload", "{}") if structure_changed else ("slots", json.dumps(changed, ensure_ascii=False))
+        for q in list(self.subscribers):
+            try:
+                q.put_nowait(event)
+            except asyncio.QueueFull:
+                # tela lenta: descarta o backlog e força reload completo
+                while not q.empty():
+                    q.get_nowait()
+                q.put_nowait(("reload", "{}"))
+
+
+# =========================
+# Loop de atualização
+# =========================
+async def poll_loop(
+    state: KioskState, url: str, token: str, interval: Optional[float], period: Optional[str] = None
+) -> None:
+    """Busca no intervalo fixo (--interval) ou no escolhido pelo agendador adaptativo; `period`: --period."""
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            payload = await loop.run_in_executor(None, fetch_payload_incremental, url, token)
+            if "error" in payload and "rows" not in payload:
+                log.warning("endpoint retornou erro: %s", payload)
+            else:
+                snapshot = await loop.run_in_executor(None, current_snapshot, payload)
+                SCHEDULER.observe(snapshot.fingerprint, payload.get("updatedAt"))
+                state.publish(await loop.run_in_executor(None, period_view, snapshot, period))
+        except Exception:
+            log.exception("falha ao atualizar o dashboard (mantendo o último snapshot)")
+        try:
+            await asyncio.wait_for(state.wake.wait(), timeout=interval or SCHEDULER.next_interval())
+        except asyncio.TimeoutError:
+            continue
+        # rajada de onEdit vira uma única busca
+        await asyncio.sleep(WEBHOOK_DEBOUNCE_SECONDS)
+        state.wake.clear()
+
+
+# =========================
+# HTTP mínimo (asyncio)
+# =========================
+def _response_head(status: str, content_type: str, extra: str = "", length: Optional[int] = None) -> bytes:
+    head = f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\nCache-Control: no-store\r\n"
+    if length is not None:
+        head += f"Content-Length: {length}\r\nConnection: close\r\n"
+    return (head + extra + "\r\n").encode("utf-8")
+
+
+async def _send(writer: asyncio.StreamWriter, status: str, content_type: str, body: str, head_only: bool = False) -> None:
+    """Resposta completa; `head_only` (HEAD) manda só os headers, com o Content-Length do corpo."""
+    data = body.encode("utf-8")
+    writer.write(_response_head(status, content_type, length=len(data)) + (b"" if head_only else data))
+    await writer.drain()
+
+
+def _content_length(headers: dict[str, str]) -> Optional[int]:
+    """Content-Length do request; None se vier malformado ou negativo."""
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        return None
+    return length if length >= 0 else None
+
+
+async def _serve_events(state: KioskState, writer: asyncio.StreamWriter) -> None:
+    q: asyncio.Queue = asyncio.Queue(maxsize=SSE_CLIENT_QUEUE_MAX)
+    state.subscribers.add(q)
+    try:
+        writer.write(_response_head("200 OK", "text/event-stream; charset=utf-8", "Connection: keep-alive\r\n"))
+        # (re)conexão: manda todos os slots; o browser ignora os de hash igual
+        if state.slots:
+            writer.write(f"event: slots\ndata: {json.dumps(state.slots, ensure_ascii=False)}\n\n".encode("utf-8"))
+        await writer.drain()
+
+        while True:
+            try:
+                name, data = await asyncio.wait_for(q.get(), timeout=SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                writer.write(b": ping\n\n")
+            else:
+                writer.write(f"event: {name}\ndata: {data}\n\n".encode("utf-8"))
+            await writer.drain()
+    finally:
+        state.subscribers.discard(q)
+
+
+# Corpo máximo do POST /webhook (o Apps Script manda poucos campos)
+_WEBHOOK_MAX_BODY = 16 * 1024
+
+
+async def _serve_webhook(
+    state: KioskState, webhook_token: str, query: str, headers: dict[str, str], body: bytes, writer: asyncio.StreamWriter
+) -> None:
+    given = request_token(headers.get("x-webhook-token"), query, body)
+    if not token_matches(webhook_token, given):
+        await _send(writer, "401 Unauthorized", "application/json", json.dumps({"ok": False, "error": "unauthorized"}))
+        return
+    state.wake.set()
+    await _send(writer, "202 Accepted", "application/json", json.dumps({"ok": True, "queued": True}))
+
+
+async def handle_client(
+    state: KioskState, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, webhook_token: str = ""
+) -> None:
+    try:
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        headers: dict[str, str] = {}
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        parts = request_line.split()
+        if len(parts) >= 2 and parts[0] == "POST" and urlsplit(parts[1]).path == "/webhook":
+            length = _content_length(headers)
+            if length is None:
+                await _send(writer, "400 Bad Request", "text/plain; charset=utf-8", "Bad Request")
+                return
+            if length > _WEBHOOK_MAX_BODY:
+                await _send(writer, "413 Payload Too Large", "text/plain; charset=utf-8", "Payload Too Large")
+                return
+            body = await reader.readexactly(length) if length else b""
+            await _serve_webhook(state, webhook_token, urlsplit(parts[1]).query, headers, body, writer)
+            return
+        if len(parts) < 2 or parts[0] not in ("GET", "HEAD"):
+            await _send(writer, "405 Method Not Allowed", "text/plain; charset=utf-8", "Method Not Allowed")
+            return
+
+        path = urlsplit(parts[1]).path
+        head = parts[0] == "HEAD"
+        if path == "/":
+            if not state.html:
+                await _send(writer, "503 Service Unavailable", "text/plain; charset=utf-8", "Carregando dados...", head)
+            else:
+                await _send(writer, "200 OK", "text/html; charset=utf-8", state.html, head)
+        elif path == "/events":
+            if head:
+                writer.write(_response_head("200 OK", "text/event-stream; charset=utf-8", "Connection: close\r\n"))
+                await writer.drain()
+            else:
+                await _serve_events(state, writer)
+        elif path == "/healthz":
+            body = {
+                "version": state.version,
+                "updated_at": state.updated_at,
+                "screens": len(state.subscribers),
+                "polling": SCHEDULER.status(),
+                "validation": state.validation,
+            }
+            await _send(writer, "200 OK", "application/json", json.dumps(body), head)
+        elif path == "/timings":
+            await _send(writer, "200 OK", "application/json", timings_json(), head)
+        elif path == "/metrics":
+            await _send(writer, "200 OK", "text/plain; version=0.0.4; charset=utf-8", metrics_text(), head)
+        else:
+            await _send(writer, "404 Not Found", "text/plain; charset=utf-8", "Not Found", head)
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        try:
+            writer.close()
+            await writer.wait_closed()
+        except Exception:
+            pass
+
+
+async def serve(host: str, port: int, interval: Optional[float], period: Optional[str] = None) -> None:
+    url, token = load_credentials()
+    if not (url and token):
+        raise SystemExit("Defina SHEETS_WEBAPP_URL e SHEETS_WEBAPP_TOKEN (env ou .streamlit/secrets.toml)")
+
+    webhook_token = load_webhook_token()
+    state = KioskState()
+    server = await asyncio.start_server(lambda r, w: handle_client(state, r, w, webhook_token), host, port)
+    log.info("kiosk em http://%s:%s (atualização: %s)", host, port, f"a cada {interval}s" if interval else "adaptativa")
+    if not webhook_token:
+        log.info("SHEETS_WEBHOOK_TOKEN não definido: POST /webhook recusado")
+
+    async with server:
+        await asyncio.gather(server.serve_forever(), poll_loop(state, url, token, interval, period))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Dashboard comercial em modo kiosk (sem Streamlit).")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=None,
+        help="segundos fixos entre buscas no endpoint (padrão: agendador adaptativo)",
+    )
+    parser.add_argument(
+        "--period",
+        choices=PERIODS,
+        default=None,
+        help="realizados do período (hoje/semana/mês/trimestre) em vez dos valores do Sheets",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    try:
+        asyncio.run(serve(args.host, args.port, args.interval, parse_period(args.period)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Payload colunar (core/columnar.py): mesmo DataFrame que "rows", validação e detecção do formato."""
+from __future__ import annotations
+
+from typing import Any, Dict
+
+import pandas as pd
+import pytest
+
+from bench.endpoint import StandInEndpoint
+from core.columnar import columnar_columns, is_columnar, to_columnar
+from core.data import payload_to_df
+
+_PAYLOAD: Dict[str, Any] = {
+    "updatedAt": "2026-10-19T13:00:00.000Z",
+    "sheet": "INDICADORES_COMERCIAL",
+    "rows": [
+        {"INDICADORES": "FATURAMENTO", "RESPONSÁVEL": "JOSÉ CONCEIÇÃO", "VALOR": "98.874,50", "DATA_ATUALIZAÇÃO": "19/10/2026 10:00"},
+        {"INDICADORES": "LEADS CRIADOS", "RESPONSÁVEL": " josé  conceição ", "VALOR": 31, "DATA_ATUALIZAÇÃO": "2026-10-19T13:00:00Z"},
+        {"INDICADORES": "TICKET MÉDIO", "RESPONSÁVEL": "ÂNGELA", "VALOR": None, "DATA_ATUALIZAÇÃO": None},
+        {"INDICADORES": "CONVERSÃO", "RESPONSÁVEL": "ÂNGELA", "VALOR": "12,5%"},
+    ],
+}
+
+
+def _frame(payload: Dict[str, Any]) -> pd.DataFrame:
+    df, _, _ = payload_to_df(payload)
+    return df.reset_index(drop=True)
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [_PAYLOAD, StandInEndpoint(rows=300, people=10, seed=4).respond(None)],
+    ids=["mixed", "stand-in"],
+)
+def test_columnar_round_trip_matches_rows(payload: Dict[str, Any]) -> None:
+    columnar = to_columnar(payload)
+
+    assert is_columnar(columnar) and "rows" not in columnar
+    pd.testing.assert_frame_equal(_frame(columnar), _frame(payload))
+    assert payload_to_df(columnar)[1:] == payload_to_df(payload)[1:]
+
+
+def test_mismatched_lengths_are_rejected() -> None:
+    columnar = to_columnar(_PAYLOAD)
+
+    short = dict(columnar, data=[col[:-1] if i == 2 else col for i, col in enumerate(columnar["data"])])
+    with pytest.raises(ValueError, match="tamanhos diferentes"):
+        columnar_columns(short)
+
+    missing = dict(columnar, data=columnar["data"][:-1])
+    with pytest.raises(ValueError, match="colunas e"):
+        columnar_columns(missing)
+
+
+def test_detection_prefers_rows() -> None:
+    columnar = to_columnar(_PAYLOAD)
+    # colunas com só a primeira linha, "rows" com todas
+    both = dict(to_columnar(dict(_PAYLOAD, rows=_PAYLOAD["rows"][:1])), rows=_PAYLOAD["rows"])
+
+    assert is_columnar(dict(columnar, format=None))  # "format" é opcional
+    assert not is_columnar(both)
+    assert not is_columnar(_PAYLOAD)
+    assert not is_columnar(dict(columnar, data="x"))
+    # com "rows" e "columns" juntos, vale "rows"
+    pd.testing.assert_frame_equal(_frame(both), _frame(_PAYLOAD))
@@ -0,0 +1,56 @@
+"""Cubo por período: ingest (snapshot a snapshot) e replay (histórico) usam a mesma base de tempo."""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from core.constants import INDICATORS
+from core.cube import IndicatorCube
+from core.history import HistoryStore
+
+REUN = INDICATORS.REUNIOES_REAL
+META = INDICATORS.REUNIOES_META
+
+
+def _snapshot(rows: list[tuple[str, str, float, str]]) -> pd.DataFrame:
+    df = pd.DataFrame(rows, columns=["INDICADORES", "RESPONSÁVEL", "VALOR", "DATA_ATUALIZAÇÃO"])
+    df["DATA_ATUALIZAÇÃO"] = pd.to_datetime(df["DATA_ATUALIZAÇÃO"], utc=True)
+    return df
+
+
+# (buscado em, linhas): o Sheets atualiza REUNIÕES ao longo de dois dias; a
+# mudança de terça à noite só é buscada na quarta cedo (DATA_ATUALIZAÇÃO de terça)
+_FETCHES = [
+    ("2026-10-13T12:00:00Z", [(REUN, "NURY", 4.0, "2026-10-13T11:00:00Z"), (META, "NURY", 40.0, "2026-10-01T11:00:00Z")]),
+    ("2026-10-14T10:00:00Z", [(REUN, "NURY", 6.0, "2026-10-13T19:00:00Z"), (META, "NURY", 40.0, "2026-10-01T11:00:00Z")]),
+    ("2026-10-14T18:00:00Z", [(REUN, "NURY", 9.0, "2026-10-14T17:00:00Z"), (META, "NURY", 40.0, "2026-10-01T11:00:00Z")]),
+]
+
+
+def _values(cube: IndicatorCube, now: datetime) -> dict:
+    return {
+        (ind, period): cube.value(ind, "NURY", period, now=now)
+        for ind in (REUN, META)
+        for period in cube.periods
+    }
+
+
+def test_ingest_matches_history_replay(tmp_path) -> None:
+    live = IndicatorCube()
+    store = HistoryStore(tmp_path / "history.sqlite3", retention_days=None)
+    for i, (fetched, rows) in enumerate(_FETCHES):
+        df = _snapshot(rows)
+        at = datetime.fromisoformat(fetched.replace("Z", "+00:00"))
+        store.append_snapshot(f"fp{i}", df, fetched_at=at.timestamp())
+        live.ingest(df, at=at, version=f"fp{i}")
+
+    replayed = IndicatorCube()
+    replayed.replay(store.frame())
+    store.close()
+
+    now = datetime(2026, 10, 14, 21, 0, tzinfo=timezone.utc)
+    assert _values(live, now) == _values(replayed, now)
+    # quarta: só as 3 reuniões do dia; as 2 de terça (buscadas na quarta) ficam na terça
+    assert live.value(REUN, "NURY", "day", now=now) == 3.0
+    assert live.value(META, "NURY", "day", now=now) == 40.0
@@ -0,0 +1,86 @@
+"""Protocolo delta contra o endpoint sintético (bench/endpoint.py) chamado em processo, sem HTTP."""
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from bench.endpoint import StandInEndpoint
+from core.data import payload_to_df
+from core.delta import DeltaClient
+from core.normalize import parse_number
+from core.streaming import stream_payload
+from core.validate import ValidationReport
+
+_COLS = ["INDICADORES", "RESPONSÁVEL", "VALOR", "DATA_ATUALIZAÇÃO"]
+
+
+class _Fetcher:
+    """Como fetch_payload_uncached: completo lido em streaming, delta inteiro; registra os `since`."""
+
+    def __init__(self, endpoint: StandInEndpoint):
+        self.endpoint = endpoint
+        self.calls: List[Optional[str]] = []
+        self.forced: Optional[Dict[str, Any]] = None  # próxima resposta, no lugar do endpoint
+
+    def __call__(self, since: Optional[str]) -> Dict[str, Any]:
+        self.calls.append(since)
+        if self.forced is not None:
+            raw, self.forced = self.forced, None
+            return raw
+        raw = self.endpoint.respond(since)
+        if since is None:
+            body = json.dumps(raw, ensure_ascii=False).encode("utf-8")
+            return stream_payload([body[i : i + 4096] for i in range(0, len(body), 4096)], parse_number, ValidationReport)
+        return raw
+
+
+def _rows(payload: Dict[str, Any]) -> pd.DataFrame:
+    df, _, _ = payload_to_df(payload)
+    return df[_COLS].sort_values(_COLS, kind="stable").reset_index(drop=True)
+
+
+def test_delta_payload_matches_full_response() -> None:
+    endpoint = StandInEndpoint(rows=400, people=12, seed=3)
+    fetch = _Fetcher(endpoint)
+    client = DeltaClient()
+
+    client.fetch("stand-in", fetch)
+    endpoint.bump(5)
+    endpoint.remove(2)
+    endpoint.bump(3)
+    merged = client.fetch("stand-in", fetch)
+
+    assert fetch.calls == [None, "1"]
+    assert merged["version"] == str(endpoint.version)
+    full = endpoint.respond(None)
+    pd.testing.assert_frame_equal(_rows(merged), _rows(full))
+    assert payload_to_df(merged)[0].attrs["validation"]["rows"] == len(full["rows"])
+
+
+def test_empty_delta_returns_same_payload() -> None:
+    endpoint = StandInEndpoint(rows=200, people=8, seed=1)
+    fetch = _Fetcher(endpoint)
+    client = DeltaClient()
+
+    first = client.fetch("stand-in", fetch)
+    again = client.fetch("stand-in", fetch)
+
+    assert fetch.calls == [None, "1"]
+    assert again is first
+
+
+def test_base_mismatch_fetches_everything() -> None:
+    endpoint = StandInEndpoint(rows=200, people=8, seed=2)
+    fetch = _Fetcher(endpoint)
+    client = DeltaClient()
+
+    client.fetch("stand-in", fetch)
+    endpoint.bump(4)
+    fetch.forced = {"mode": "delta", "version": "99", "baseVersion": "98", "rows": [], "removed": []}
+    payload = client.fetch("stand-in", fetch)
+
+    assert fetch.calls == [None, "1", None]
+    assert client.version == str(endpoint.version)
+    pd.testing.assert_frame_equal(_rows(payload), _rows(endpoint.respond(None)))
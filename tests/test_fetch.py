@@ -0,0 +1,70 @@
+"""Fetch do Apps Script: latência/prazo cobrem o corpo em streaming; resposta lenta conta no circuito."""
+from __future__ import annotations
+
+import json
+import time
+
+import pytest
+import requests
+
+from core import data
+from core.breaker import CircuitBreaker
+from core.telemetry import FETCH_LATENCY
+
+_BODY = json.dumps(
+    {"updatedAt": None, "sheet": "INDICADORES_COMERCIAL", "rows": [{"INDICADORES": "LEADS CRIADOS", "RESPONSÁVEL": "NURY", "VALOR": 3}]}
+).encode("utf-8")
+
+
+class _SlowBody:
+    """Resposta que chega nos headers na hora e leva ~0,2 s para entregar o corpo."""
+
+    status_code = 200
+    ok = True
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def iter_content(self, chunk_size: int = 1):
+        for i in range(0, len(_BODY), 16):
+            time.sleep(0.2 * 16 / len(_BODY))
+            yield _BODY[i : i + 16]
+
+    def close(self) -> None:
+        pass
+
+
+def test_latency_covers_the_streamed_body(monkeypatch) -> None:
+    monkeypatch.setattr(requests, "get", lambda *a, **k: _SlowBody())
+    before = FETCH_LATENCY._sum
+
+    payload = data.fetch_payload_uncached("http://stand-in", "t", stream=True)
+
+    assert payload["columns"]
+    assert FETCH_LATENCY._sum - before >= 0.15
+
+
+def test_stream_deadline_covers_the_whole_body(monkeypatch) -> None:
+    monkeypatch.setattr(requests, "get", lambda *a, **k: _SlowBody())
+
+    with pytest.raises(requests.Timeout):
+        data.fetch_payload_uncached("http://stand-in", "t", timeout=0.05, stream=True)
+
+
+def test_slow_success_counts_as_breaker_failure(monkeypatch) -> None:
+    payload = {"updatedAt": None, "sheet": "INDICADORES_COMERCIAL", "rows": []}
+
+    def _slow_fetch(*a, **k):
+        time.sleep(0.05)
+        return payload
+
+    monkeypatch.setattr(data, "fetch_payload", _slow_fetch)
+    monkeypatch.setattr(data, "FETCH_SLOW_SECONDS", 0.01)
+    monkeypatch.setattr(data, "FETCH_BREAKER", CircuitBreaker(name="teste"))
+
+    result = data.fetch_payload_guarded("http://stand-in", "t")
+
+    # o dado chega e é usado, mas a lentidão conta para abrir o circuito
+    assert result.payload is payload and not result.stale
+    assert data.FETCH_BREAKER.failures == 1
+    assert "lenta" in (data.FETCH_BREAKER.last_error or "")
@@ -0,0 +1,37 @@
+"""Poda do histórico: valor estável mais antigo que a retenção não some."""
+from __future__ import annotations
+
+import time
+
+import pandas as pd
+
+from core.history import HistoryStore
+
+
+def _df(rows: list[tuple[str, str, float]]) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=["INDICADORES", "RESPONSÁVEL", "VALOR"])
+
+
+def test_prune_keeps_latest_observation_per_series(tmp_path) -> None:
+    store = HistoryStore(tmp_path / "history.sqlite3", retention_days=30)
+    old = time.time() - 90 * 86400
+    store.append_snapshot("a", _df([("REUNIÕES", "NURY", 10.0), ("REUNIÕES", "JOAO", 1.0)]), fetched_at=old)
+    store.append_snapshot("b", _df([("REUNIÕES", "NURY", 10.0), ("REUNIÕES", "JOAO", 2.0)]), fetched_at=old + 60)
+    store.append_snapshot("c", _df([("REUNIÕES", "NURY", 10.0), ("REUNIÕES", "JOAO", 3.0)]), fetched_at=time.time())
+
+    removed = store.prune()
+
+    # "a" ainda guarda o único ponto de NURY; "b" só tinha um valor antigo de JOAO
+    assert removed == 1
+    assert store.series("REUNIÕES", "NURY")["value"].tolist() == [10.0]
+    assert store.series("REUNIÕES", "JOAO")["value"].tolist() == [3.0]
+
+    # o valor vigente segue sendo a base de janelas recentes
+    since = time.time() - 86400
+    frame = store.frame(since=since)
+    assert frame.loc[frame["RESPONSÁVEL"] == "NURY", "VALOR"].tolist() == [10.0]
+
+    # e continua deduplicando: valor igual não grava nova observação
+    store.append_snapshot("d", _df([("REUNIÕES", "NURY", 10.0)]), fetched_at=time.time())
+    assert len(store.series("REUNIÕES", "NURY")) == 1
+    store.close()
@@ -0,0 +1,58 @@
+"""HTTP mínimo do kiosk_server: Content-Length inválido vira 400 e HEAD responde só os headers."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from kiosk_server import KioskState, handle_client
+
+
+class _Writer:
+    """StreamWriter em memória."""
+
+    def __init__(self) -> None:
+        self.data = b""
+
+    def write(self, data: bytes) -> None:
+        self.data += data
+
+    async def drain(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    async def wait_closed(self) -> None:
+        pass
+
+
+def _request(raw: bytes, state: KioskState | None = None) -> bytes:
+    async def _run() -> bytes:
+        reader = asyncio.StreamReader()
+        reader.feed_data(raw)
+        reader.feed_eof()
+        writer = _Writer()
+        await handle_client(state or KioskState(), reader, writer, webhook_token="segredo")
+        return writer.data
+
+    return asyncio.run(_run())
+
+
+@pytest.mark.parametrize("length", [b"abc", b"-5", b"1e3"])
+def test_bad_content_length_is_400(length: bytes) -> None:
+    out = _request(b"POST /webhook HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n")
+    assert out.startswith(b"HTTP/1.1 400 Bad Request\r\n")
+
+
+def test_head_sends_headers_only() -> None:
+    state = KioskState()
+    state.html = "<html><body>painel</body></html>"
+
+    get = _request(b"GET / HTTP/1.1\r\n\r\n", state)
+    head = _request(b"HEAD / HTTP/1.1\r\n\r\n", state)
+
+    get_head, _, get_body = get.partition(b"\r\n\r\n")
+    assert get_body == state.html.encode("utf-8")
+    assert head == get_head + b"\r\n\r\n"  # mesmos headers (inclusive Content-Length), sem corpo
+    assert _request(b"HEAD /nada HTTP/1.1\r\n\r\n").endswith(b"\r\n\r\n")
@@ -0,0 +1,22 @@
+"""Orçamento de memória do pipeline (bench.run.MEMORY_BUDGET_MB)."""
+from __future__ import annotations
+
+import tracemalloc
+
+from bench.run import MEMORY_BUDGET_CASE, MEMORY_BUDGET_MB, check_memory_budget, run_case
+from core.constants import MEMPROFILE_FRAMES
+
+
+def test_pipeline_peak_within_budget() -> None:
+    rows, people = MEMORY_BUDGET_CASE
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start(MEMPROFILE_FRAMES)
+    try:
+        case = run_case(rows, people, repeat=1)
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
+    assert "peak_kb" in case
+    assert check_memory_budget({"cases": [case]}, MEMORY_BUDGET_MB) == []
@@ -0,0 +1,56 @@
+"""Nomes de RESPONSÁVEL: grafia estável entre snapshots e rótulos de equipe dos rankings."""
+from __future__ import annotations
+
+import pytest
+
+from core import names
+from core.data import payload_to_df
+from core.history import HistoryStore
+from core.names import is_role_label, is_team_label, remember_spellings
+
+
+@pytest.fixture(autouse=True)
+def _fresh_spellings(monkeypatch):
+    monkeypatch.setattr(names, "_SPELLINGS", {})
+
+
+def _df(*responsaveis: str):
+    rows = [
+        {"INDICADORES": "REUNIÕES OCORRIDAS", "RESPONSÁVEL": r, "VALOR": float(i), "DATA_ATUALIZAÇÃO": "2026-10-19T13:00:00.000Z"}
+        for i, r in enumerate(responsaveis)
+    ]
+    df, _, _ = payload_to_df({"updatedAt": None, "sheet": "INDICADORES_COMERCIAL", "rows": rows})
+    return df
+
+
+def test_spelling_follows_history_not_the_snapshot(tmp_path) -> None:
+    store = HistoryStore(tmp_path / "history.sqlite3")
+    store.append_snapshot("a", _df("JOÃO", "NURY"), fetched_at=1.0)
+
+    # processo novo: o histórico semeia as grafias antes do 1º payload
+    names._SPELLINGS.clear()
+    remember_spellings(store.persons())
+
+    df = _df("Joao", "NURY")
+    assert df["RESPONSÁVEL"].tolist() == ["JOÃO", "NURY"]
+    store.append_snapshot("b", df, fetched_at=2.0)
+    assert store.persons() == ["JOÃO", "NURY"]
+
+
+def test_first_spelling_wins_across_snapshots() -> None:
+    assert _df("JOAO")["RESPONSÁVEL"].tolist() == ["JOAO"]
+    # o acento não troca a série de quem já apareceu sem ele
+    assert _df("JOÃO", "JOAO")["RESPONSÁVEL"].tolist() == ["JOAO", "JOAO"]
+
+
+def test_team_labels_match_the_ranking_rules() -> None:
+    # Ranking SDR: papéis, rótulos de equipe e nomes com SDR no começo/fim
+    for label in ("SDR", "CLOSER", "", "EQUIPE", "TIME SDR", "SDR (EQUIPE)", "SDR JOAO", "TIME-SDR"):
+        assert is_team_label(label), label
+    assert not is_team_label("CLOSER JOAO")
+    assert not is_team_label("EQUIPE CLOSER")
+
+    # Ranking Closer: só o papel exato
+    assert is_role_label(" closer ") and is_role_label("SDR")
+    assert not is_role_label("EQUIPE CLOSER")
+    assert not is_role_label("SDR JOAO")
@@ -0,0 +1,86 @@
+"""Rankings SDR e Closer: ordem (sort_key), quem entra e os textos formatados no card."""
+from __future__ import annotations
+
+import re
+
+import pytest
+
+from core import names
+from core.data import latest_values, payload_to_df
+from ui.contracts_podium import podium_contracts_card_html
+from ui.dashboard import build_closer_ranking, build_sdr_ranking
+from ui.ranklist import ranking_sdr_card_html
+
+_ROWS = [
+    # SDR: CARLA lidera em reuniões; ANA e BRUNO empatam e a conversão desempata
+    ("REUNIÕES OCORRIDAS", "ANA", 10),
+    ("REUNIÕES OCORRIDAS", "BRUNO", 10),
+    ("REUNIÕES OCORRIDAS", "CARLA", 12),
+    ("REUNIÕES OCORRIDAS", "DIEGO", 5),  # sem conversão: fica de fora
+    ("REUNIÕES OCORRIDAS", "SDR", 37),
+    ("REUNIÕES OCORRIDAS", "EQUIPE", 37),
+    ("TAXA DE CONVERSÃO", "ANA", 0.155),
+    ("TAXA DE CONVERSÃO", "BRUNO", 0.3),
+    ("TAXA DE CONVERSÃO", "CARLA", 0.1),
+    ("TAXA DE CONVERSÃO", "SDR", 0.2),
+    # Closer: EVA e FÁBIO empatam em tudo e o nome desempata
+    ("FATURAMENTO ASSINADO", "EVA", 50000),
+    ("FATURAMENTO ASSINADO", "FÁBIO", 50000),
+    ("FATURAMENTO ASSINADO", "GIL", 98874),
+    ("FATURAMENTO ASSINADO", "HANA", 70000),  # sem PERC: fica de fora
+    ("FATURAMENTO ASSINADO", "CLOSER", 268874),
+    ("FATURAMENTO PAGO", "EVA", 20000),
+    ("FATURAMENTO PAGO", "FÁBIO", 20000),
+    ("FATURAMENTO PAGO", "GIL", 1234.5),
+    ("FATURAMENTO PAGO", "HANA", 1000),
+    ("CONTRATOS ASSINADOS", "EVA", 3),
+    ("CONTRATOS ASSINADOS", "FÁBIO", 3),
+    ("CONTRATOS ASSINADOS", "GIL", 7),
+    ("CONTRATOS ASSINADOS", "HANA", 2),
+    ("PERC FATURAMENTO PAGO", "EVA", 0.4),
+    ("PERC FATURAMENTO PAGO", "FÁBIO", 0.4),
+    ("PERC FATURAMENTO PAGO", "GIL", 0.008),  # 0,8%: arredonda para "1%", não vira 80%
+]
+
+
+@pytest.fixture(autouse=True)
+def _fresh_spellings(monkeypatch):
+    monkeypatch.setattr(names, "_SPELLINGS", {})
+
+
+@pytest.fixture()
+def df_last():
+    rows = [
+        {"INDICADORES": i, "RESPONSÁVEL": r, "VALOR": v, "DATA_ATUALIZAÇÃO": "2026-10-19T13:00:00.000Z"}
+        for i, r, v in _ROWS
+    ]
+    df, _, _ = payload_to_df({"updatedAt": None, "sheet": "INDICADORES_COMERCIAL", "rows": rows})
+    return latest_values(df)
+
+
+def _values(card: str) -> list[str]:
+    return re.findall(r"<div class='rk-value'>([^<]*)</div>", card)
+
+
+def test_sdr_ranking(df_last) -> None:
+    rows = build_sdr_ranking(df_last)
+
+    assert [r.name for r in rows] == ["CARLA", "BRUNO", "ANA"]
+    assert rows == sorted(rows, key=lambda r: r.sort_key(), reverse=True)
+    assert [r.conversao for r in rows] == pytest.approx([10.0, 30.0, 15.5])
+
+    card = ranking_sdr_card_html(title="Ranking SDR", items=rows, limit=10)
+    assert _values(card) == ["12", "10%", "10", "30%", "10", "15%"]
+
+
+def test_closer_ranking(df_last) -> None:
+    rows = build_closer_ranking(df_last)
+
+    assert [r.name for r in rows] == ["GIL", "EVA", "FÁBIO"]
+    assert rows == sorted(rows, key=lambda r: r.sort_key())
+    assert [r.perc_fat_pago for r in rows] == pytest.approx([0.8, 40.0, 40.0])
+
+    card = podium_contracts_card_html(rows, limit=10)
+    assert _values(card) == ["98.874", "1.234,50", "50.000", "20.000", "50.000", "20.000"]
+    assert re.findall(r"<div class='rk-name-sub'>([^<]*)</div>", card) == ["7 contratos", "3 contratos", "3 contratos"]
+    assert re.findall(r"<div class='rk-name-pct'>([^<]*)</div>", card) == ["1%", "40%", "40%"]
@@ -0,0 +1,102 @@
+"""Golden DOM: o fragmento minificado gera o mesmo DOM que o original."""
+from __future__ import annotations
+
+import re
+from html.parser import HTMLParser
+
+from core.rankings import CloserRow, SdrRow
+from ui.avatars import avatar_html
+from ui.ranklist import ranking_closer_card_html, ranking_sdr_card_html
+from ui.render import minify_html
+
+_WS_RE = re.compile(r"\s+")
+_RAW_TAGS = {"pre", "script", "style", "textarea"}
+
+
+class _Dom(HTMLParser):
+    """Sequência de nós (tag, atributos, texto) como o browser veria."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.nodes: list[tuple] = []
+        self._raw = 0
+
+    def handle_starttag(self, tag, attrs):
+        self.nodes.append(("start", tag, tuple(attrs)))
+        self._raw += tag in _RAW_TAGS
+
+    def handle_startendtag(self, tag, attrs):
+        self.nodes.append(("start", tag, tuple(attrs)))
+
+    def handle_endtag(self, tag):
+        self.nodes.append(("end", tag))
+        self._raw -= tag in _RAW_TAGS
+
+    def handle_data(self, data):
+        # fora de <pre>/<script>/... o browser colapsa whitespace ao renderizar
+        text = data if self._raw else _WS_RE.sub(" ", data)
+        if self.nodes and self.nodes[-1][0] == "text":
+            text = self.nodes.pop()[1] + text
+        self.nodes.append(("text", text))
+
+
+def _dom(fragment: str) -> list[tuple]:
+    parser = _Dom()
+    parser.feed(fragment)
+    parser.close()
+    nodes = parser.nodes
+    # whitespace nas pontas do fragmento não vira nó visível
+    while nodes and nodes[0][0] == "text" and not nodes[0][1].strip():
+        nodes = nodes[1:]
+    while nodes and nodes[-1][0] == "text" and not nodes[-1][1].strip():
+        nodes = nodes[:-1]
+    return nodes
+
+
+_HAND = """
+<div   class="kpi  card"
+       title="Faturamento   assinado
+       (mês)"  data-label='1 > 0  ok'
+       style="width:calc(100%  -  8px);  color:#111">
+  <span>  Reuniões   ocorridas </span>
+  <img src="x.png" onerror="this.remove();   this.parentElement.innerText='A  B';" />
+  <pre>  linha 1
+     linha   2</pre>
+  <script>  var  s = "a   b";  </script>
+  <textarea name="t">  a
+  b  </textarea>
+  <p>Don't   break</p>
+</div>
+"""
+
+
+def _fragments() -> list[str]:
+    sdr = [SdrRow(id=0, name="JOÃO", display_name="João", reunioes=12.0, conversao=25.0)]
+    closer = [
+        CloserRow(
+            id=1, name="VICTOR", display_name="Victor", contratos=3.0,
+            fat_assinado=98874.0, fat_pago=5000.5, perc_fat_pago=50.0,
+        )
+    ]
+    return [
+        _HAND,
+        avatar_html("JOAO", display_name="João  Silva"),
+        avatar_html("SEM FOTO", display_name="Sem   Foto"),
+        ranking_sdr_card_html(title="Ranking  SDR", items=sdr, limit=5),
+        ranking_closer_card_html(title="Ranking Closer", rows=closer, limit=5),
+    ]
+
+
+def test_minified_fragment_has_same_dom() -> None:
+    for fragment in _fragments():
+        minified = minify_html(fragment)
+        assert len(minified) < len(fragment)
+        assert _dom(minified) == _dom(fragment)
+
+
+def test_quoted_attributes_are_untouched() -> None:
+    minified = minify_html(_HAND)
+    assert 'title="Faturamento   assinado\n       (mês)"' in minified
+    assert "data-label='1 > 0  ok'" in minified
+    assert 'style="width:calc(100%  -  8px);  color:#111"' in minified
+    assert "<span> Reuniões ocorridas </span>" in minified
@@ -0,0 +1,78 @@
+"""Leitura em streaming (core/streaming.py): blocos minúsculos, corpo grande e corpo não-JSON."""
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Iterator, List
+
+import pandas as pd
+import pytest
+
+from bench.endpoint import StandInEndpoint
+from core.data import payload_to_df
+from core.normalize import parse_number
+from core.streaming import StreamError, _Reader, stream_payload
+from core.validate import ValidationReport
+
+_PAYLOAD: Dict[str, Any] = {
+    "updatedAt": "2026-10-19T13:00:00.000Z",
+    "sheet": "INDICADORES_COMERCIAL",
+    "rows": [
+        {"INDICADORES": "FATURAMENTO", "RESPONSÁVEL": "JOSÉ CONCEIÇÃO", "VALOR": "98.874,50", "DATA_ATUALIZAÇÃO": "19/10/2026 10:00"},
+        {"INDICADORES": "TICKET MÉDIO", "RESPONSÁVEL": "JOÃO", "VALOR": 1234.5678, "DATA_ATUALIZAÇÃO": "2026-10-19T13:00:00Z"},
+        {"INDICADORES": "LEADS CRIADOS", "RESPONSÁVEL": "ÂNGELA", "VALOR": 31, "DATA_ATUALIZAÇÃO": "19/10/2026 10:00"},
+        {"INDICADORES": "CONVERSÃO", "RESPONSÁVEL": "JOSÉ CONCEIÇÃO", "VALOR": -0.0625, "DATA_ATUALIZAÇÃO": None},
+        {"INDICADORES": "FATURAMENTO", "RESPONSÁVEL": "MÁRCIA", "VALOR": "1,5e3", "DATA_ATUALIZAÇÃO": "9/10/2026 8:05"},
+    ],
+}
+
+
+def _chunks(body: bytes, sizes: List[int]) -> Iterator[bytes]:
+    """Corta o corpo ciclando pelos tamanhos (acentos em UTF-8 e números partidos entre blocos)."""
+    i = k = 0
+    while i < len(body):
+        n = sizes[k % len(sizes)]
+        yield body[i : i + n]
+        i, k = i + n, k + 1
+
+
+def _frame(payload: Dict[str, Any]) -> pd.DataFrame:
+    df, updated, sheet = payload_to_df(payload)
+    assert (updated, sheet) == (payload.get("updatedAt"), payload.get("sheet"))
+    return df.reset_index(drop=True)
+
+
+def test_tiny_chunks_match_resp_json() -> None:
+    body = json.dumps(_PAYLOAD, ensure_ascii=False).encode("utf-8")
+    streamed = stream_payload(_chunks(body, [1, 2, 3]), parse_number, ValidationReport)
+
+    pd.testing.assert_frame_equal(_frame(streamed), _frame(json.loads(body)))
+
+
+def test_large_body_matches_and_buffer_is_compacted() -> None:
+    payload = StandInEndpoint(rows=3000, people=20, seed=5).respond(None)
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    assert len(body) > 4 * 65536
+
+    streamed = stream_payload(_chunks(body, [4093, 17]), parse_number, ValidationReport)
+    pd.testing.assert_frame_equal(_frame(streamed), _frame(json.loads(body)))
+
+    # o buffer de texto descarta o que já foi lido: não cresce até o corpo inteiro
+    reader = _Reader(_chunks(body, [4093]))
+    largest = 0
+    with pytest.raises(StreamError):  # anda caractere a caractere até acabar o corpo
+        while True:
+            reader.peek()
+            reader.pos += 1
+            largest = max(largest, len(reader.buf))
+    assert reader.eof
+    assert largest < 65536 + 2 * 4093
+
+
+def test_non_json_body_raises_with_head() -> None:
+    body = b"<!DOCTYPE html><html><body>Servi\xc3\xa7o indispon\xc3\xadvel</body></html>"
+
+    with pytest.raises(StreamError) as err:
+        stream_payload(_chunks(body, [3]), parse_number, ValidationReport)
+
+    assert err.value.head.startswith("<!DOCTYPE html>")
+    assert "Serviço" in err.value.head
@@ -0,0 +1,68 @@
+"""DATA_ATUALIZAÇÃO -> UTC: ISO com/sem fuso, dd/mm/aaaa (BRT), lixo vira NaT, cache limitado."""
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from core import timestamps
+from core.timestamps import parse_timestamps, parse_unique
+
+
+@pytest.fixture(autouse=True)
+def _fresh_state(monkeypatch):
+    # cache e formato dominante são globais do processo: cada teste começa do zero
+    monkeypatch.setattr(timestamps, "_CACHE", {})
+    monkeypatch.setattr(timestamps, "_dominant", None)
+
+
+def _utc(s: str) -> pd.Timestamp:
+    return pd.Timestamp(s, tz="UTC")
+
+
+def test_iso_with_zone_is_taken_as_is() -> None:
+    out = parse_timestamps(["2026-10-19T13:00:00Z", "2026-10-19T10:00:00-03:00", "2026-10-19T15:00:00+0200"])
+    assert list(out) == [_utc("2026-10-19 13:00"), _utc("2026-10-19 13:00"), _utc("2026-10-19 13:00")]
+
+
+def test_naive_iso_is_brasilia_time() -> None:
+    out = parse_timestamps(["2026-10-19 10:00:00", "2026-10-19"])
+    assert list(out) == [_utc("2026-10-19 13:00"), _utc("2026-10-19 03:00")]
+
+
+def test_day_first_with_and_without_seconds() -> None:
+    out = parse_timestamps(["10/09/2026 08:05:30", "10/09/2026 08:05", "10/09/2026"])
+    # dia primeiro: 10 de setembro, nunca 9 de outubro
+    assert list(out) == [_utc("2026-09-10 11:05:30"), _utc("2026-09-10 11:05"), _utc("2026-09-10 03:00")]
+
+
+def test_not_zero_padded() -> None:
+    out = parse_timestamps(["19/10/2026 10:00", "9/10/2026 8:05"])
+    assert list(out) == [_utc("2026-10-19 13:00"), _utc("2026-10-09 11:05")]
+
+
+def test_missing_and_garbage_become_nat() -> None:
+    out = parse_timestamps([None, "", "   ", "ontem", 45123, "2026-10-19T13:00:00Z"])
+    assert out.iloc[:5].isna().all()
+    assert out.iloc[5] == _utc("2026-10-19 13:00")
+    assert str(out.dtype) == "datetime64[us, UTC]"
+
+
+def test_repeated_strings_keep_order() -> None:
+    vals = ["19/10/2026 10:00", "2026-10-19T13:00:00Z", "19/10/2026 10:00", None]
+    out = parse_timestamps(vals)
+    assert out.iloc[0] == out.iloc[1] == out.iloc[2]
+    assert pd.isna(out.iloc[3])
+
+
+def test_cache_is_cleared_when_full(monkeypatch) -> None:
+    monkeypatch.setattr(timestamps, "TIMESTAMP_CACHE_SIZE", 3)
+    first = ["19/10/2026 10:00", "19/10/2026 11:00", "19/10/2026 12:00"]
+    parse_unique(first)
+    assert set(timestamps._CACHE) == set(first)
+
+    out = parse_unique(["19/10/2026 13:00", "19/10/2026 10:00"])
+
+    # estourou o limite: o cache recomeça só com o que faltava, e o que já
+    # estava em cache antes da limpeza continua convertido
+    assert set(timestamps._CACHE) == {"19/10/2026 13:00"}
+    assert list(out) == [_utc("2026-10-19 16:00"), _utc("2026-10-19 13:00")]
@@ -0,0 +1,34 @@
+"""Validação: o mesmo conteúdo em "rows" e no formato colunar gera o mesmo relatório."""
+from __future__ import annotations
+
+from core.columnar import to_columnar
+from core.data import payload_to_df
+
+_ROWS = [
+    {"INDICADORES": "LEADS CRIADOS", "RESPONSÁVEL": "NURY", "VALOR": "12", "DATA_ATUALIZAÇÃO": "2026-10-19T13:00:00.000Z"},
+    {"INDICADORES": "LEADS CRIADOS", "RESPONSÁVEL": None, "VALOR": "3", "DATA_ATUALIZAÇÃO": "2026-10-19T13:00:00.000Z"},
+    {"INDICADORES": "LEADS CRIADOS", "RESPONSÁVEL": 42, "VALOR": "4", "DATA_ATUALIZAÇÃO": "2026-10-19T13:00:00.000Z"},
+    {"INDICADORES": "LEADS CRIADOS", "RESPONSÁVEL": " ​ ", "VALOR": "5", "DATA_ATUALIZAÇÃO": "2026-10-19T13:00:00.000Z"},
+    {"INDICADORES": None, "RESPONSÁVEL": "NURY", "VALOR": "6", "DATA_ATUALIZAÇÃO": "2026-10-19T13:00:00.000Z"},
+]
+
+
+def _report(payload: dict) -> dict:
+    df, _, _ = payload_to_df(payload)
+    report = df.attrs["validation"]
+    return {k: report[k] for k in ("rows", "bad_rows", "issues")}
+
+
+def test_rows_and_columnar_flag_the_same_names() -> None:
+    payload = {"updatedAt": "2026-10-19T13:00:00.000Z", "sheet": "INDICADORES_COMERCIAL", "rows": _ROWS}
+
+    by_rows = _report(payload)
+
+    assert by_rows == _report(to_columnar(payload))
+    assert by_rows["bad_rows"] == 4
+    assert by_rows["issues"] == {
+        "sem RESPONSÁVEL": 1,
+        "RESPONSÁVEL não é texto": 1,
+        "RESPONSÁVEL vazio": 1,
+        "sem INDICADORES": 1,
+    }
@@ -3,6 +3,7 @@ from __future__ import annotations
 import html
 import re
 
+from core.names import name_key
 from core.people import PHOTO_FILES, PHOTO_URLS, pretty_name
 from ui.embed import file_to_data_uri
 
@@ -49,7 +50,7 @@ def photo_src(name_upper: str) -> str | None:
       1) Foto local (PHOTO_FILES) embutida como data URI (base64) → mais estável/rápido.
       2) URL (PHOTO_URLS) normalizada (ex.: Google Drive) → pode falhar dependendo de permissão/cookies.
     """
-    key = (name_upper or "").strip().upper()
+    key = name_key(name_upper)  # sem acento + alias: "João" e "JOAO" dão a mesma foto
 
     # 1) arquivo local → data URI
     local_path = PHOTO_FILES.get(key)
@@ -1,4 +1,5 @@
 from ui.gauge import gauge_svg
+from core.instrumentation import timed
 import re
 
 
@@ -16,6 +17,7 @@ def _pct_br(x: float) -> str:
     return s
 
 
+@timed("card.kpi")
 def kpi_card_html(
     title: str,
     percent_float: float,
@@ -26,6 +28,7 @@ def kpi_card_html(
     mid_label: str,
     mid_value: str,
     right_pill: str,   # badge do box DIREITO (sem seta)
+    trend_svg: str = "",  # sparkline opcional (trajetória do mês) abaixo dos boxes
 ) -> str:
     svg = gauge_svg(percent_float)
     pct_txt = _pct_br(float(percent_float or 0.0))
@@ -387,6 +390,21 @@ def kpi_card_html(
     left_label_scale = 1.00 if left_badge_scale < 0.99 else None
     right_label_scale = 1.00 if right_badge_scale < 0.99 else None
 
+    trend_html = ""
+    if trend_svg:
+        trend_html = f"""
+  <div class="kpi-trend"
+       style="
+         height: calc(28px * var(--ui-scale, 1));
+         margin-top: calc(2px * var(--ui-scale, 1));
+         padding-left:  var(--kpi-boxes-inset-x, 0px);
+         padding-right: var(--kpi-boxes-inset-x, 0px);
+         box-sizing: border-box;
+       ">
+    {trend_svg}
+  </div>
+""".strip()
+
     # ------------------------------------------------------------------
     # HTML
     # ------------------------------------------------------------------
@@ -590,5 +608,7 @@ def kpi_card_html(
     </div>
 
   </div>
+
+  {trend_html}
 </div>
 """.strip()
@@ -0,0 +1,410 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import replace
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+
+from core.constants import GROWTH_PERIOD, GROWTH_SOURCE, HISTORY_ENABLED, INDICATORS, SPARKLINE_POINTS
+from core.data import payload_to_df, latest_values, get_val
+from core.metrics import total_for_indicator, people_values, growth_for_snapshot, get_growth
+from core.formatters import fmt_int, pct_to_float_percent, fmt_money_no_cents
+from core.cube import ingest_snapshot
+from core.downsample import lttb
+from core.history import get_history_store
+from core.instrumentation import span
+from core.names import name_index
+from core.periods import PERIOD_LABELS, period_start
+from core.rankings import CloserRow, SdrRow
+from core.snapshot import SNAPSHOTS, DashboardSnapshot, payload_fingerprint
+
+from ui.cards import kpi_card_html
+from ui.leads_conversion import leads_conversion_card_html
+from ui.ranklist import ranking_sdr_card_html
+from ui.contracts_podium import podium_contracts_card_html
+from ui.funil_vendas import funil_vendas_card_html
+from ui.render import new_nonce, render_dashboard, slot_digests
+from ui.sparkline import sparkline_svg
+
+log = logging.getLogger(__name__)
+
+# Quantidade máxima de pessoas exibidas nos rankings (conteúdo rola dentro do card)
+RANKING_MAX_ROWS = 10
+
+
+# =========================
+# Helpers (rankings)
+# =========================
+def _by_person(vals: list[dict], skip: Callable[[int], bool]) -> dict[int, dict]:
+    """Mapeia: ID do responsável -> linha de people_values (IDs em que `skip` é True ficam de fora)."""
+    return {x["id"]: x for x in vals or [] if not skip(x["id"])}
+
+
+# =========================
+# Sparklines (histórico)
+# =========================
+@lru_cache(maxsize=32)
+def _trend_svg(indicador: str, responsavel: str, fingerprint: str) -> str:
+    """
+    Trajetória do mês (histórico SQLite) reduzida a SPARKLINE_POINTS via LTTB.
+    Cacheada por indicador + snapshot (fingerprint): refresh sem dados novos não recalcula.
+    """
+    since = period_start("month").timestamp()
+    s = get_history_store().series(indicador, responsavel, since=since)
+    s = s[s["value"].notna()]
+    if len(s) < 2:
+        return ""
+
+    x = (s["ts"] - pd.Timestamp(0, tz="UTC")) / pd.Timedelta(seconds=1)
+    xs, ys = lttb(x.to_numpy(), s["value"].to_numpy(), SPARKLINE_POINTS)
+    return sparkline_svg(xs, ys)
+
+
+def _trend_for(indicador: str, responsavel: str, fingerprint: Optional[str]) -> str:
+    if not (HISTORY_ENABLED and fingerprint):
+        return ""
+    try:
+        return _trend_svg(indicador, responsavel, fingerprint)
+    except Exception:
+        return ""  # histórico indisponível não pode quebrar o card
+
+
+def _growth(indicador: str, responsavel: str, fingerprint: Optional[str], sheet_value):
+    """Crescimento calculado localmente (histórico) com fallback para o valor do Sheets."""
+    if GROWTH_SOURCE != "local" or not (HISTORY_ENABLED and fingerprint):
+        return sheet_value
+    try:
+        local = get_growth(growth_for_snapshot(fingerprint, GROWTH_PERIOD), indicador, responsavel)
+    except Exception:
+        local = None
+    return sheet_value if local is None else local
+
+
+# =========================
+# Rankings (linhas já ordenadas, antes do HTML)
+# =========================
+def build_sdr_ranking(df_last: pd.DataFrame, period: Optional[str] = None) -> list[SdrRow]:
+    """Linhas do Ranking SDR: Reuniões (desc) e, em empate, Conversão (desc). `period`: valores do cubo."""
+    names = name_index(df_last)
+
+    # 1) Reuniões por pessoa
+    #    - pegamos apenas pessoas (não "SDR"/"EQUIPE")
+    reun_by_id = _by_person(
+        people_values(df_last, INDICATORS.REUNIOES_REAL, exclude_responsaveis=["SDR", "CLOSER"], period=period), names.is_team
+    )
+
+    # 2) Taxa de conversão por pessoa (indicador "TAXA DE CONVERSÃO")
+    conv_by_id = _by_person(
+        people_values(df_last, INDICATORS.TAXA_CONVERSAO, exclude_responsaveis=["SDR", "CLOSER"], period=period), names.is_team
+    )
+
+    # 3) ✅ Dinâmico: só entra no ranking quem tiver OS DOIS indicadores
+    #    (Reuniões + Taxa de Conversão). Se você adicionar uma nova pessoa no Sheets com ambos,
+    #    ela aparece automaticamente (sem precisar mexer no código).
+    rows = [
+        SdrRow(
+            id=k,
+            name=it["name"],
+            display_name=it["display_name"],
+            reunioes=it["value"],
+            conversao=pct_to_float_percent(conv_by_id[k]["value"]),  # ratio -> % (0..100)
+        )
+        for k, it in reun_by_id.items()
+        if k in conv_by_id
+    ]
+
+    # Ordenação do ranking SDR: Reuniões (desc) e, em empate, Conversão (desc)
+    rows.sort(key=SdrRow.sort_key, reverse=True)
+
+    # Mantém um teto de itens (o conteúdo rola dentro do card)
+    return rows[:RANKING_MAX_ROWS]
+
+
+def build_closer_ranking(df_last: pd.DataFrame, period: Optional[str] = None) -> list[CloserRow]:
+    """Linhas do Ranking Closer: Faturamento Assinado, Pago, Contratos (desc) e Nome. `period`: valores do cubo."""
+    names = name_index(df_last)
+    m_contr = _by_person(people_values(df_last, INDICATORS.CONTRATOS_ASSINADOS, exclude_responsaveis=["CLOSER"], period=period), names.is_role)
+    m_fa = _by_person(people_values(df_last, INDICATORS.FATURAMENTO_ASSINADO, exclude_responsaveis=["CLOSER"], period=period), names.is_role)
+    m_fp = _by_person(people_values(df_last, INDICATORS.FATURAMENTO_PAGO, exclude_responsaveis=["CLOSER"], period=period), names.is_role)
+
+    # ✅ % vem do indicador PERC FATURAMENTO PAGO (sem cálculo no app.py)
+    m_perc = _by_person(people_values(df_last, INDICATORS.PERC_FATURAMENTO_PAGO, exclude_responsaveis=["CLOSER"], period=period), names.is_role)
+
+    # ✅ Dinâmico: só entra no Ranking Closer quem tiver TODOS os 4 indicadores:
+    #    CONTRATOS ASSINADOS, FATURAMENTO ASSINADO, FATURAMENTO PAGO e PERC FATURAMENTO PAGO
+    rows = [
+        CloserRow(
+            id=k,
+            name=fp["name"],
+            display_name=fp["display_name"],
+            contratos=m_contr[k]["value"],
+            fat_assinado=m_fa[k]["value"],
+            fat_pago=fp["value"],
+            perc_fat_pago=pct_to_float_percent(m_perc[k]["value"]),  # ratio -> % (0..100)
+        )
+        for k, fp in m_fp.items()
+        if k in m_contr and k in m_fa and k in m_perc
+    ]
+
+    # Ordenação do Ranking Closer:
+    #  1) Faturamento ASSINADO (desc)
+    #  2) Em empate, Faturamento PAGO (desc)
+    #  3) Em novo empate, Contratos (desc)
+    #  4) Por fim, Nome (asc) para estabilidade total (ordem final não depende da entrada)
+    rows.sort(key=CloserRow.sort_key)
+    return rows[:RANKING_MAX_ROWS]
+
+
+# =========================
+# Dashboard (payload -> HTML)
+# =========================
+def build_slots(df_last: pd.DataFrame, fingerprint: Optional[str] = None, period: Optional[str] = None) -> dict[str, str]:
+    """
+    Monta o HTML de cada card (slot do template) a partir dos valores mais recentes.
+    Com `fingerprint` (snapshot), inclui as sparklines do histórico nos KPIs.
+    Com `period` ("day" | "week" | "month" | "quarter"), os valores vêm do cubo
+    (core/cube.py): realizados somam só o período, metas/taxas são as vigentes.
+    """
+    def _title(text: str) -> str:
+        return f"{text} · {PERIOD_LABELS[period]}" if period else text
+
+    # =========================
+    # 1) KPI: Reuniões (SDR) / Faturamento (CLOSER)
+    # =========================
+    reun_real = get_val(df_last, INDICATORS.REUNIOES_REAL, "SDR", period=period)
+    reun_meta = get_val(df_last, INDICATORS.REUNIOES_META, "SDR", period=period)
+    reun_perc = get_val(df_last, INDICATORS.REUNIOES_PERC, "SDR", period=period)
+    reun_crescimento = _growth(
+        INDICATORS.REUNIOES_REAL, "SDR", fingerprint, get_val(df_last, INDICATORS.REUNIOES_CRESC, "SDR", period=period)
+    )
+    reun_dif = (reun_real - reun_meta) if (reun_real is not None and reun_meta is not None) else None
+
+    # ✅ No seu payload existem "FATURAMENTO ASSINADO" e "FATURAMENTO PAGO".
+    fat_assinado = total_for_indicator(df_last, INDICATORS.FATURAMENTO_ASSINADO, prefer_responsavel="CLOSER", period=period)
+    if fat_assinado is None:
+        fat_assinado = total_for_indicator(df_last, INDICATORS.FATURAMENTO_ASSINADO, exclude_responsaveis=["CLOSER"], period=period)
+
+    fat_pago = total_for_indicator(df_last, INDICATORS.FATURAMENTO_PAGO, prefer_responsavel="CLOSER", period=period)
+    if fat_pago is None:
+        fat_pago = total_for_indicator(df_last, INDICATORS.FATURAMENTO_PAGO, exclude_responsaveis=["CLOSER"], period=period)
+
+    fat_meta = get_val(df_last, INDICATORS.FAT_META, "CLOSER", period=period)
+    fat_perc = get_val(df_last, INDICATORS.FAT_PERC, "CLOSER", period=period)
+    fat_cresc = _growth(
+        INDICATORS.FATURAMENTO_ASSINADO, "CLOSER", fingerprint, get_val(df_last, INDICATORS.FAT_CRESC, "CLOSER", period=period)
+    )
+    fat_dif = (fat_assinado - fat_meta) if (fat_assinado is not None and fat_meta is not None) else None
+
+    card_reunioes = kpi_card_html(
+        title=_title("Reuniões Ocorridas"),
+        percent_float=pct_to_float_percent(reun_perc),
+        subtitle="Progresso",
+        left_label="Número de Reuniões",
+        left_value=fmt_int(reun_real),
+        left_badge=pct_to_float_percent(reun_crescimento),
+        mid_label="Meta de Reuniões",
+        mid_value=fmt_int(reun_meta),
+        right_pill=fmt_int(reun_dif) if reun_dif is not None else "0",
+        trend_svg=_trend_for(INDICATORS.REUNIOES_REAL, "SDR", fingerprint),
+    )
+
+    card_faturamento = kpi_card_html(
+        title=_title("Faturamento"),
+        percent_float=pct_to_float_percent(fat_perc),
+        subtitle="Progresso",
+        left_label="Faturamento Assinado",
+        left_value=fmt_money_no_cents(fat_assinado),
+        left_badge=pct_to_float_percent(fat_cresc),
+        mid_label="Meta de Faturamento",
+        mid_value=fmt_money_no_cents(fat_meta),
+        right_pill=fmt_int(fat_dif),
+        trend_svg=_trend_for(INDICATORS.FATURAMENTO_ASSINADO, "CLOSER", fingerprint),
+    )
+
+    # =========================
+    # 2) Leads + Taxa de Conversão (Geral)
+    # =========================
+    leads_total = total_for_indicator(df_last, INDICATORS.LEADS_CRIADOS, prefer_responsavel="SDR", period=period)
+    taxa_geral_raw = get_val(df_last, INDICATORS.TAXA_CONVERSAO, "SDR", period=period)
+
+    card_leads_taxa = leads_conversion_card_html(
+        leads_total=leads_total,
+        taxa_conversao=taxa_geral_raw,
+        title=_title("Leads | Taxa de Conversão (Geral)"),
+    )
+
+    # =========================
+    # 3) Ranking SDR (por Reuniões)
+    # =========================
+    rank_sdr_items = build_sdr_ranking(df_last, period)
+    card_ranking_sdr = ranking_sdr_card_html(
+        title=_title("Ranking SDR"),
+        items=rank_sdr_items,
+        limit=RANKING_MAX_ROWS,
+        avatar_size_px=56,
+    )
+
+    # =========================
+    # 4) Ranking Closer (por Faturamento Pago)
+    # =========================
+    rows_closer = build_closer_ranking(df_last, period)
+
+    card_ranking_closer = podium_contracts_card_html(rows_closer, title=_title("Ranking Closer"), limit=RANKING_MAX_ROWS)
+
+    # =========================
+    # 5) Funil de vendas (NOVO)
+    # =========================
+    contratos_total = get_val(df_last, INDICATORS.CONTRATOS_ASSINADOS, "CLOSER", period=period)
+    if contratos_total is None:
+        contratos_vals = people_values(df_last, INDICATORS.CONTRATOS_ASSINADOS, exclude_responsaveis=["CLOSER"], period=period)
+        contratos_total = sum(float(x.get("value") or 0.0) for x in contratos_vals) or 0.0
+
+    tax_funil_1_raw = get_val(df_last, INDICATORS.TAX_CONV_FUNIL_1, "SDR", period=period)
+    tax_funil_2_raw = get_val(df_last, INDICATORS.TAX_CONV_FUNIL_2, "CLOSER", period=period)
+
+    tax_funil_1 = pct_to_float_percent(tax_funil_1_raw)
+    tax_funil_2 = pct_to_float_percent(tax_funil_2_raw)
+
+    card_funil_vendas = funil_vendas_card_html(
+        title=_title("Funil de Vendas"),
+        leads=leads_total,
+        reunioes=reun_real,
+        contratos=contratos_total,
+        pct_leads_para_reunioes=tax_funil_1,
+        pct_reunioes_para_contratos=tax_funil_2,
+    )
+
+    # =========================
+    # Render (layout conforme estrutura.png)
+    # =========================
+    return {
+        "CARD_REUNIOES": card_reunioes,
+        "CARD_RANKING_SDR": card_ranking_sdr,
+        "CARD_FATURAMENTO": card_faturamento,
+        "CARD_LEADS_TAXA": card_leads_taxa,
+        "CARD_RANKING_CLOSER": card_ranking_closer,
+        "CARD_FUNIL_VENDAS": card_funil_vendas,
+    }
+
+
+def build_dashboard_slots(payload: Dict[str, Any]) -> dict[str, str]:
+    """
+    Monta os slots a partir do payload do endpoint.
+    Função pura (não depende de sessão Streamlit).
+    """
+    df, _, _ = payload_to_df(payload)
+    return build_slots(latest_values(df))
+
+
+def build_dashboard_html(payload: Dict[str, Any]) -> str:
+    """Pipeline completo payload -> cards -> HTML final (sem Streamlit)."""
+    return render_dashboard(slots=build_dashboard_slots(payload))
+
+
+def _record_history(fingerprint: str, df: pd.DataFrame, updated_at, sheet, fetched_at: float) -> None:
+    """Grava o snapshot no histórico local (deduplicado pelo fingerprint)."""
+    if not HISTORY_ENABLED:
+        return
+    try:
+        get_history_store().append_snapshot(fingerprint, df, updated_at=updated_at, sheet=sheet, fetched_at=fetched_at)
+    except Exception:
+        log.exception("falha ao gravar histórico (seguindo sem)")
+
+
+def _open_history() -> None:
+    """Abre o histórico antes do 1º snapshot: as grafias de nomes gravadas lá já valem para ele."""
+    if not HISTORY_ENABLED:
+        return
+    try:
+        get_history_store()
+    except Exception:
+        log.exception("falha ao abrir o histórico (seguindo sem)")
+
+
+def build_snapshot(payload: Dict[str, Any], fingerprint: Optional[str] = None) -> DashboardSnapshot:
+    """Roda o pipeline inteiro uma vez e congela o resultado num DashboardSnapshot."""
+    fingerprint = fingerprint or payload_fingerprint(payload)
+    built_at = time.time()
+    _open_history()
+    df, updated_at, sheet = payload_to_df(payload)
+    df_last = latest_values(df)
+
+    # histórico antes dos cards: as sparklines já incluem este snapshot
+    with span("history"):
+        _record_history(fingerprint, df, updated_at, sheet, built_at)
+
+    with span("build_slots"):
+        slots = build_slots(df_last, fingerprint)
+    nonce = new_nonce()
+    return DashboardSnapshot(
+        fingerprint=fingerprint,
+        updated_at=updated_at,
+        sheet=sheet,
+        df=df,
+        df_last=df_last,
+        slots=MappingProxyType(slots),
+        slot_hashes=MappingProxyType(slot_digests(slots)),
+        html=render_dashboard(slots=slots, nonce=nonce),
+        built_at=built_at,
+        validation=MappingProxyType(dict(df.attrs.get("validation") or {})),
+        nonce=nonce,
+    )
+
+
+def current_snapshot(payload: Dict[str, Any]) -> DashboardSnapshot:
+    """Snapshot compartilhado do processo; só reconstrói quando o payload muda."""
+    return SNAPSHOTS.get_or_build(payload, build_snapshot)
+
+
+# Visões por período derivadas do snapshot atual (uma por período, compartilhadas)
+_PERIOD_VIEWS: dict[str, DashboardSnapshot] = {}
+_PERIOD_VIEWS_LOCK = threading.Lock()
+
+
+def _period_fingerprint(fingerprint: str, period: str) -> str:
+    return f"{fingerprint}:{period}:{period_start(period).date().isoformat()}"
+
+
+def build_period_snapshot(base: DashboardSnapshot, period: str) -> DashboardSnapshot:
+    """
+    Mesmo snapshot com os cards do período (hoje/semana/mês/trimestre), lidos do cubo.
+
+    O fingerprint inclui o período e o início do bucket corrente: na virada do
+    dia/semana/... os cards mudam sem payload novo, e o watcher percebe.
+    """
+    with span("build_slots"):
+        slots = build_slots(base.df_last, base.fingerprint, period=period)
+    nonce = new_nonce()
+    return replace(
+        base,
+        fingerprint=_period_fingerprint(base.fingerprint, period),
+        slots=MappingProxyType(slots),
+        slot_hashes=MappingProxyType(slot_digests(slots)),
+        html=render_dashboard(slots=slots, nonce=nonce),
+        period=period,
+        nonce=nonce,
+    )
+
+
+def period_view(snapshot: DashboardSnapshot, period: Optional[str]) -> DashboardSnapshot:
+    """Snapshot na visão pedida (?period=...); None devolve o próprio snapshot (valores do Sheets)."""
+    if period is None or snapshot is None:
+        return snapshot
+    expected = _period_fingerprint(snapshot.fingerprint, period)
+    view = _PERIOD_VIEWS.get(period)
+    if view is not None and view.fingerprint == expected:
+        return view
+    with _PERIOD_VIEWS_LOCK:
+        view = _PERIOD_VIEWS.get(period)
+        if view is None or view.fingerprint != expected:
+            view = _PERIOD_VIEWS[period] = build_period_snapshot(snapshot, period)
+    return view
+
+
+# ✅ cubo por período (hoje/semana/mês/trimestre) acompanha cada snapshot novo
+SNAPSHOTS.add_listener(ingest_snapshot)
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import html
+import json
+from typing import Any, Dict, Optional
+
+# =========================
+# Overlay de diagnóstico (oculto; só com ?timings=1 / ?memprofile=1 / ?profile=1)
+# =========================
+# Renderizado num iframe próprio que se fixa num canto superior por
+# cima do dashboard (o kiosk.css força todo iframe a ocupar a tela; estilo
+# inline com !important vence a regra da folha).
+
+_OVERLAY_CSS = """
+  html, body { margin: 0; background: transparent; }
+  .ov { font: 12px/1.35 ui-monospace, SFMono-Regular, Menlo, Consolas, monospace;
+        color: #e5e7eb; background: rgba(17, 24, 39, .92); border-radius: 10px;
+        padding: 10px 12px; max-height: calc(100vh - 24px); overflow: auto; }
+  .ov h3 { margin: 0 0 6px; font-size: 12px; color: #F05914; letter-spacing: .04em; }
+  .ov table { border-collapse: collapse; width: 100%; }
+  .ov th, .ov td { padding: 2px 6px; text-align: right; white-space: nowrap; }
+  .ov th:first-child, .ov td:first-child { text-align: left; }
+  .ov th { color: #9ca3af; font-weight: 600; border-bottom: 1px solid #374151; }
+  .ov .hist { letter-spacing: -1px; color: #F05914; }
+  .ov details { margin-top: 8px; }
+  .ov pre { margin: 4px 0 0; white-space: pre-wrap; word-break: break-all; color: #9ca3af; }
+"""
+
+_PIN_SCRIPT = """
+<script>
+  (function () {
+    try {
+      const f = window.frameElement;
+      if (!f) return;
+      const s = f.style;
+      [["inset", "auto"], ["top", "12px"], ["__SIDE__", "12px"], ["width", "__WIDTH__"],
+       ["height", "70vh"], ["z-index", "2147483000"], ["background", "transparent"]]
+        .forEach(function (p) { s.setProperty(p[0], p[1], "important"); });
+    } catch (e) {}
+  })();
+</script>
+"""
+
+
+def _pin_script(side: str, width: str) -> str:
+    return _PIN_SCRIPT.replace("__SIDE__", side).replace("__WIDTH__", width)
+
+_SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+
+def _histogram_bar(histogram: Dict[str, int]) -> str:
+    """Mini-histograma em texto (1 caractere por bucket com amostras)."""
+    if not histogram:
+        return ""
+    peak = max(histogram.values())
+    return "".join(_SPARK_CHARS[min(len(_SPARK_CHARS) - 1, int(n / peak * (len(_SPARK_CHARS) - 1)))] for n in histogram.values())
+
+
+def _fmt_ms(v: Any) -> str:
+    try:
+        return f"{float(v):,.1f}"
+    except (TypeError, ValueError):
+        return "-"
+
+
+def timings_table_html(stages: Dict[str, Dict[str, Any]]) -> str:
+    rows = []
+    for stage in sorted(stages):
+        s = stages[stage]
+        hist = s.get("histogram") or {}
+        rows.append(
+            "<tr>"
+            f"<td>{html.escape(stage)}</td>"
+            f"<td>{int(s.get('count') or 0)}</td>"
+            f"<td>{_fmt_ms(s.get('last_ms'))}</td>"
+            f"<td>{_fmt_ms(s.get('p50_ms'))}</td>"
+            f"<td>{_fmt_ms(s.get('p90_ms'))}</td>"
+            f"<td>{_fmt_ms(s.get('p99_ms'))}</td>"
+            f"<td>{_fmt_ms(s.get('max_ms'))}</td>"
+            f"<td class='hist' title='{html.escape(json.dumps(hist))}'>{_histogram_bar(hist)}</td>"
+            "</tr>"
+        )
+    if not rows:
+        rows.append("<tr><td colspan='8'>sem medições ainda</td></tr>")
+
+    return (
+        "<table><thead><tr>"
+        "<th>etapa</th><th>n</th><th>último</th><th>p50</th><th>p90</th><th>p99</th><th>máx</th><th>hist</th>"
+        "</tr></thead><tbody>" + "".join(rows) + "</tbody></table>"
+    )
+
+
+def _fmt_kb(v: Any) -> str:
+    try:
+        kb = float(v)
+    except (TypeError, ValueError):
+        return "-"
+    return f"{kb / 1024.0:,.2f} MB" if abs(kb) >= 1024 else f"{kb:,.1f} KB"
+
+
+def memory_report_html(report: Optional[Dict[str, Any]]) -> str:
+    """Seção de memória (tracemalloc): pico por etapa + maiores alocações do último rerun."""
+    if not report:
+        return "<h3 style='margin-top:10px'>MEMÓRIA</h3><div>aguardando o 1º rerun com tracemalloc…</div>"
+
+    stages = report.get("stages") or {}
+    stage_rows = "".join(
+        f"<tr><td>{html.escape(k)}</td><td>{_fmt_kb(v.get('last_kb'))}</td><td>{_fmt_kb(v.get('max_kb'))}</td></tr>"
+        for k, v in sorted(stages.items(), key=lambda kv: -float(kv[1].get("max_kb") or 0))
+    )
+    cats = " · ".join(f"{html.escape(k)} {_fmt_kb(v)}" for k, v in (report.get("by_category_kb") or {}).items())
+    top_rows = "".join(
+        f"<tr><td title='{html.escape(t['site'])}'>{html.escape(t['site'][-48:])}</td>"
+        f"<td>{html.escape(t['category'])}</td><td>{_fmt_kb(t['size_kb'])}</td><td>{int(t['count'])}</td></tr>"
+        for t in report.get("top") or []
+    )
+    return (
+        f"<h3 style='margin-top:10px'>MEMÓRIA (atual {_fmt_kb(report.get('current_kb'))}, "
+        f"pico {_fmt_kb(report.get('peak_kb'))})</h3>"
+        "<table><thead><tr><th>etapa</th><th>pico último</th><th>pico máx</th></tr></thead>"
+        f"<tbody>{stage_rows or '<tr><td colspan=3>-</td></tr>'}</tbody></table>"
+        f"<div style='margin:6px 0;color:#9ca3af'>último rerun: {cats or '-'}</div>"
+        "<table><thead><tr><th>local</th><th>tipo</th><th>alocado</th><th>blocos</th></tr></thead>"
+        f"<tbody>{top_rows or '<tr><td colspan=4>-</td></tr>'}</tbody></table>"
+    )
+
+
+def debug_overlay_html(stages: Dict[str, Dict[str, Any]], raw_json: str = "", extra_html: str = "") -> str:
+    """Documento do overlay: tabela de tempos (ms) por etapa + JSON bruto + seções extras."""
+    json_block = (
+        f"<details><summary>JSON</summary><pre>{html.escape(raw_json)}</pre></details>" if raw_json else ""
+    )
+    return (
+        f"<!doctype html><html><head><meta charset='utf-8'><style>{_OVERLAY_CSS}</style></head><body>"
+        f"<div class='ov'><h3>TEMPOS POR ETAPA (ms, janela móvel)</h3>"
+        f"{timings_table_html(stages)}{extra_html}{json_block}</div>"
+        f"{_pin_script('right', '560px')}</body></html>"
+    )
+
+
+def profile_overlay_html(summary: Dict[str, Any]) -> str:
+    """Overlay (canto esquerdo) com o top-N do cProfile do rerun capturado."""
+    rows = "".join(
+        f"<tr><td title='{html.escape(t['function'])}'>{html.escape(t['function'][-70:])}</td>"
+        f"<td>{html.escape(str(t['ncalls']))}</td><td>{float(t['tottime_s']) * 1000:,.1f}</td>"
+        f"<td>{float(t['cumtime_s']) * 1000:,.1f}</td></tr>"
+        for t in summary.get("top") or []
+    )
+    return (
+        f"<!doctype html><html><head><meta charset='utf-8'><style>{_OVERLAY_CSS}</style></head><body>"
+        f"<div class='ov'><h3>CPROFILE DO RERUN ({float(summary.get('total_s') or 0) * 1000:,.0f} ms, "
+        f"{int(summary.get('calls') or 0):,} chamadas)</h3>"
+        "<table><thead><tr><th>função</th><th>n</th><th>tot ms</th><th>cum ms</th></tr></thead>"
+        f"<tbody>{rows or '<tr><td colspan=4>-</td></tr>'}</tbody></table>"
+        f"<div style='margin-top:6px;color:#9ca3af'>{html.escape(str(summary.get('path') or ''))}</div></div>"
+        f"{_pin_script('left', '640px')}</body></html>"
+    )
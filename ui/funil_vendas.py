@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import html
 
+from core.instrumentation import timed
+
 
 def _fmt_int_br(x: float | int | None) -> str:
     """Inteiro com separador pt-BR (.) — ex.: 12345 -> 12.345"""
@@ -24,6 +26,7 @@ def _pct_br(x: float | int | None, decimals: int) -> str:
     return f"{s}%"
 
 
+@timed("card.funil_vendas")
 def funil_vendas_card_html(
     *,
     title: str = "Funil de Vendas",
@@ -5,6 +5,7 @@ import math
 
 from core.formatters import fmt_int
 from core.formatters import pct_to_float_percent
+from core.instrumentation import timed
 
 
 def _pct_br_compact(percent: float | None) -> str:
@@ -78,6 +79,7 @@ def _dot_ring_svg(percent: float, *, size: int = 360) -> str:
     </svg>"""
 
 
+@timed("card.leads_taxa")
 def leads_conversion_card_html(
     *,
     leads_total: float | int | None,
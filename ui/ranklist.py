@@ -1,14 +1,16 @@
 from __future__ import annotations
 
 import html
-import re
 import math  # ✅ ADICIONADO
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Sequence
 
 import streamlit as st
 
+from core.formatters import fmt_money
 from core.people import pretty_name
+from core.rankings import CloserRow, SdrRow
+from core.instrumentation import timed
 from ui.avatars import avatar_html
 from ui.embed import file_to_data_uri
 from ui.render import load_asset_text
@@ -60,83 +62,24 @@ def _medal_html(rank: int) -> str:
     return f"<div class='rk-medal-fallback'>{rank}</div>"
 
 
-def _fmt_pct_compact(raw) -> str | None:
+def _fmt_money_br_no_symbol(v: float) -> str:
     """
-    Normaliza um percentual para exibição curta (ex.: '15%').
-    Aceita:
-      - '15%' (string) -> '15%'
-      - 0.15 (float) -> '15%'
-      - 15 (int/float) -> '15%'
+    Retorna valor no padrão BR sem 'R$':
+    - 98874 -> "98.874"
+    - 1234.5 -> "1.234,50"
     """
-    if raw is None:
-        return None
-
-    if isinstance(raw, str):
-        s = raw.strip()
-        if not s:
-            return None
-
-        if "%" in s:
-            m = re.search(r"(-?\d+[.,]?\d*)\s*%", s)
-            if m:
-                try:
-                    x = float(m.group(1).replace(",", "."))
-                    return f"{int(round(x))}%"
-                except Exception:
-                    return None
-            return s
-
-        m = re.search(r"(-?\d+[.,]?\d*)", s)
-        if not m:
-            return None
-        try:
-            raw = float(m.group(1).replace(",", "."))
-        except Exception:
-            return None
+    s = fmt_money(v).replace("R$", "").strip()  # ex: "98.874,00"
+    if not s or s == "-":
+        return "0,00"
 
-    try:
-        x = float(raw)
-    except Exception:
-        return None
-
-    if 0.0 <= x <= 1.0:
-        x *= 100.0
-
-    return f"{int(round(x))}%"
-
-
-def _norm_key(s: str) -> str:
-    return re.sub(r"[^a-z0-9]+", "", (s or "").strip().lower())
-
-
-def _get_value_by_key_fuzzy(it: dict, wanted_key: str):
-    """Busca valor por chave exata ou por comparação normalizada."""
-    if wanted_key in it:
-        return it.get(wanted_key)
+    # se termina com ,00, remove para ficar compacto (igual seu layout)
+    if s.endswith(",00"):
+        s = s[:-3]
 
-    w = _norm_key(wanted_key)
-    if not w:
-        return None
+    if s in ("0,00", "0"):
+        return "0"
 
-    for k in it.keys():
-        if _norm_key(str(k)) == w:
-            return it.get(k)
-    return None
-
-
-def _closer_pct_from_row(it: dict, pct_field: str) -> str | None:
-    v = _get_value_by_key_fuzzy(it, pct_field)
-    pct = _fmt_pct_compact(v)
-    if pct is not None:
-        return pct
-
-    for k in ("pct", "percent", "percentual", "perc", "taxa", "taxa_fechamento", "pct_closer"):
-        v2 = it.get(k)
-        pct2 = _fmt_pct_compact(v2)
-        if pct2 is not None:
-            return pct2
-
-    return None
+    return s
 
 
 # ============================================================
@@ -174,10 +117,11 @@ def _ranklist_css_tag() -> str:
     return f"<style>\n{css}\n</style>"
 
 
+@timed("card.ranking_sdr")
 def ranking_sdr_card_html(
     *,
     title: str,
-    items: list[dict],
+    items: Sequence[SdrRow],
     limit: int = 2,
     avatar_size_px: int = 56,
 ) -> str:
@@ -204,26 +148,16 @@ def ranking_sdr_card_html(
     avatar_size_eff = min(int(avatar_size_px or 56), 44) if compact else int(avatar_size_px or 56)
 
     rows_html: list[str] = []
-    for idx, it in enumerate(rows, start=1):
-        name_u = str(it.get("name") or "").strip().upper()
-        display_name = str(it.get("display_name") or "").strip()
+    for idx, r in enumerate(rows, start=1):
+        name_u = r.name
+        display_name = r.display_name
         name_pretty = html.escape(display_name or pretty_name(name_u))
 
-        reun = it.get("reunioes")
-        try:
-            reun_int = int(float(reun or 0))
-        except Exception:
-            reun_int = 0
-
-        conv = it.get("conversao")
-        try:
-            conv_f = float(conv or 0.0)
-        except Exception:
-            conv_f = 0.0
+        reun_int = int(r.reunioes)
 
         # ✅ Antes: int(round(conv_f)) -> arredonda pra cima
         # ✅ Agora: truncamento (não arredonda): 10.9 -> 10 | 4.9 -> 4
-        conv_int = int(math.trunc(conv_f))
+        conv_int = int(math.trunc(r.conversao))
 
         rows_html.append(
             f"""
@@ -272,11 +206,10 @@ def ranking_sdr_card_html(
 def ranking_closer_card_html(
     *,
     title: str,
-    rows: list[dict],
+    rows: Sequence[CloserRow],
     limit: int = 2,
     avatar_size_px: int = 56,
     money_prefix: str = "R$ ",
-    pct_field: str = "PERC FATURAMENTO PAGO",
 ) -> str:
     """Ranking Closer no layout do mock (pills com 2 colunas: Fat. Assinado + Fat. Pago)."""
 
@@ -293,9 +226,8 @@ def ranking_closer_card_html(
         """
 
     # ⚠️ Importante: esta função é de *renderização*.
-    # A ordenação deve ser feita no app (onde ainda temos os valores numéricos
-    # corretos). Aqui os valores podem estar formatados (ex.: "98.874"), e
-    # reordenar usando float() causaria bugs.
+    # A ordenação é feita antes (CloserRow.sort_key); aqui só formatamos
+    # os valores numéricos para exibição.
     lim = max(1, int(limit) or 2)
     ordered = rows[:lim]
 
@@ -305,35 +237,21 @@ def ranking_closer_card_html(
     scope_open = f"<div class=\"{scope_class}\" data-count=\"{count}\">"
     avatar_size_eff = min(int(avatar_size_px or 56), 44) if compact else int(avatar_size_px or 56)
 
-    def _money(v) -> str:
-        if v is None:
-            return "-"
-        return str(v)
-
     rows_html: list[str] = []
-    for idx, it in enumerate(ordered, start=1):
-        name_u = str(it.get("name") or "").strip().upper()
-        display_name = str(it.get("display_name") or "").strip()
+    for idx, r in enumerate(ordered, start=1):
+        name_u = r.name
+        display_name = r.display_name
         name_pretty = html.escape(display_name or pretty_name(name_u))
 
-        contratos = it.get("contratos")
-        try:
-            if isinstance(contratos, str):
-                s = re.sub(r"\D", "", contratos)
-                contratos_int = int(s or 0)
-            else:
-                contratos_int = int(float(contratos or 0))
-        except Exception:
-            contratos_int = 0
+        contratos_int = int(round(r.contratos))
 
-        pct_txt = _closer_pct_from_row(it, pct_field)
+        # PERC FATURAMENTO PAGO já vem em % (0..100)
+        pct_txt = f"{int(round(r.perc_fat_pago))}%"
 
-        fa_txt = _money(it.get("fat_assinado"))
-        fp_txt = _money(it.get("fat_pago"))
+        fa_txt = _fmt_money_br_no_symbol(r.fat_assinado)
+        fp_txt = _fmt_money_br_no_symbol(r.fat_pago)
 
-        pct_html = ""
-        if pct_txt is not None:
-            pct_html = f"<div class='rk-name-pct'>{html.escape(str(pct_txt))}</div>"
+        pct_html = f"<div class='rk-name-pct'>{html.escape(pct_txt)}</div>"
 
         rows_html.append(
             f"""
@@ -1,9 +1,17 @@
 from __future__ import annotations
 
 from pathlib import Path
+import hashlib
+import json
 import re
+import secrets
+from typing import Optional
+
 import streamlit as st
 
+from core.instrumentation import timed
+from core.telemetry import HTML_BYTES
+
 
 _BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -40,10 +48,93 @@ def _try_load(rel_path: str) -> str:
         return ""
 
 
-def render_dashboard(slots: dict[str, str]) -> str:
+# =========================
+# Minificação dos fragmentos (cards)
+# =========================
+# Conteúdo de <pre>/<script>/<style>/<textarea> é preservado byte a byte.
+_MINIFY_PRESERVE_RE = re.compile(
+    r"""(<(pre|script|style|textarea)\b(?:[^>"']|"[^"]*"|'[^']*')*>.*?</\2\s*>)""",
+    flags=re.I | re.S,
+)
+# Tag inteira, ciente de aspas: um ">" dentro de atributo entre aspas não fecha a tag
+_MINIFY_TAG_RE = re.compile(r"""(<(?:[^<>"']|"[^"]*"|'[^']*')*>)""", flags=re.S)
+# Valor de atributo entre aspas (title, data-*, style, on*...): não é tocado
+_MINIFY_QUOTED_RE = re.compile(r"""("[^"]*"|'[^']*')""", flags=re.S)
+_MINIFY_WS_RE = re.compile(r"\s+")
+
+_MINIFY_CACHE_MAX = 256
+_MINIFY_CACHE: dict[str, str] = {}
+
+
+def _minify_tag(tag: str) -> str:
+    """Colapsa só o whitespace entre atributos; valores entre aspas ficam byte a byte."""
+    parts = _MINIFY_QUOTED_RE.split(tag)
+    # split com 1 grupo -> [fora, "aspas", fora, "aspas", ...]
+    return "".join(part if i % 2 else _MINIFY_WS_RE.sub(" ", part) for i, part in enumerate(parts))
+
+
+def _minify_segment(segment: str) -> str:
+    """Colapsa whitespace fora dos blocos preservados: no texto entre tags e entre atributos."""
+    parts = _MINIFY_TAG_RE.split(segment)
+    # split com 1 grupo -> [texto, <tag>, texto, <tag>, ...]
+    return "".join(_minify_tag(part) if i % 2 else _MINIFY_WS_RE.sub(" ", part) for i, part in enumerate(parts))
+
+
+def _minify_uncached(fragment: str) -> str:
+    parts = _MINIFY_PRESERVE_RE.split(fragment)
+    out: list[str] = []
+    # split com 2 grupos -> [texto, bloco, nome_tag, texto, bloco, nome_tag, ...]
+    for i in range(0, len(parts), 3):
+        out.append(_minify_segment(parts[i]))
+        if i + 1 < len(parts):
+            out.append(parts[i + 1])
+    return "".join(out).strip()
+
+
+def fragment_digest(fragment: str) -> str:
+    """Hash curto (hex) do conteúdo de um fragmento/slot."""
+    return hashlib.blake2b((fragment or "").encode("utf-8"), digest_size=16).hexdigest()
+
+
+def minify_html(fragment: str) -> str:
+    """
+    Minifica um fragmento HTML sem alterar o DOM renderizado:
+    - qualquer sequência de whitespace vira 1 espaço (o browser já colapsa assim
+      fora de <pre>/white-space: pre);
+    - <pre>, <script>, <style> e <textarea> ficam intactos;
+    - valores de atributo entre aspas (title, data-*, style, on*) não são tocados.
+    Cacheado pelo hash do fragmento (cards iguais entre refreshes não são reprocessados).
+    """
+    if not fragment:
+        return ""
+
+    digest = fragment_digest(fragment)
+    cached = _MINIFY_CACHE.get(digest)
+    if cached is not None:
+        return cached
+
+    out = _minify_uncached(fragment)
+    if len(_MINIFY_CACHE) >= _MINIFY_CACHE_MAX:
+        # descarta o mais antigo (dict preserva ordem de inserção)
+        _MINIFY_CACHE.pop(next(iter(_MINIFY_CACHE)))
+    _MINIFY_CACHE[digest] = out
+    return out
+
+
+def new_nonce() -> str:
+    """Nonce de uma renderização (hex: sem "_", não colide com os tokens __X__ do template)."""
+    return secrets.token_hex(16)
+
+
+@timed("render_dashboard")
+def render_dashboard(slots: dict[str, str], nonce: Optional[str] = None) -> str:
     """
     Monta o HTML final do iframe substituindo tokens do template.
     - Injeta CSS do dashboard + ranklist (se existir) no __DASHBOARD_CSS__
+    - Cada slot (card) passa por minify_html antes de entrar no template
+    - Publica o hash de cada slot (__SLOT_HASHES__) p/ o patch incremental no browser
+    - __DASH_NONCE__: patches (render_slot_patch/render_status_patch) precisam
+      trazer este nonce; sem `nonce`, gera um novo
     """
     template = load_asset_text("templates/dashboard.html")
 
@@ -55,9 +146,89 @@ def render_dashboard(slots: dict[str, str]) -> str:
         css_final = f"{dashboard_css}\n\n/* ===== Ranklist CSS (assets/ranklist.css) ===== */\n{ranklist_css}\n"
 
     html_out = template.replace("__DASHBOARD_CSS__", css_final)
+    html_out = html_out.replace("__SLOT_HASHES__", _json_for_script(slot_digests(slots)))
+    html_out = html_out.replace("__DASH_STATUS__", _DASH_STATUS_DEFAULT)
+    html_out = html_out.replace("__DASH_NONCE__", _json_for_script(nonce or new_nonce()))
 
     for key, value in slots.items():
-        html_out = html_out.replace(f"__{key}__", value)
+        html_out = html_out.replace(f"__{key}__", minify_html(value))
 
     html_out = re.sub(r"__[^_]+__", "", html_out)
+    HTML_BYTES.set(len(html_out.encode("utf-8")))
     return html_out
+
+
+# =========================
+# Atualização incremental (por slot)
+# =========================
+def _json_for_script(obj) -> str:
+    """JSON seguro para embutir dentro de <script> (não fecha a tag)."""
+    return json.dumps(obj, ensure_ascii=False).replace("</", "<\\/")
+
+
+def slot_digests(slots: dict[str, str]) -> dict[str, str]:
+    """Hash de cada slot (mesmo hash que o template expõe em window.dashSlotHashes)."""
+    return {key: fragment_digest(value) for key, value in slots.items()}
+
+
+# Estado inicial do selo de "dados desatualizados" no HTML renderizado
+_DASH_STATUS_DEFAULT = "null"
+_DASH_STATUS_MARKER = f"window.dashStatus = {_DASH_STATUS_DEFAULT};"
+
+
+def with_fetch_status(html_doc: str, status: Optional[dict]) -> str:
+    """
+    Cópia do HTML (compartilhado, imutável) com o estado do fetch embutido,
+    p/ o selo "dados desatualizados" já aparecer no primeiro paint.
+    """
+    if not status or not status.get("stale"):
+        return html_doc
+    return html_doc.replace(_DASH_STATUS_MARKER, f"window.dashStatus = {_json_for_script(status)};", 1)
+
+
+def _post_to_siblings(msg: dict) -> str:
+    """
+    Script que entrega `msg` aos frames irmãos (dashboard) e esconde o próprio
+    iframe. Só para a nossa origem (nunca "*"): frames de outra origem não recebem.
+    """
+    return f"""<script>
+(function () {{
+  try {{
+    if (window.frameElement) {{
+      window.frameElement.style.setProperty("display", "none", "important");
+    }}
+  }} catch (e) {{}}
+  try {{
+    const msg = {_json_for_script(msg)};
+    const origin = window.origin || window.location.origin;  // srcdoc: location.origin é "null"
+    const frames = window.parent.frames;
+    for (let i = 0; i < frames.length; i++) {{
+      if (frames[i] !== window) frames[i].postMessage(msg, origin);
+    }}
+  }} catch (e) {{}}
+}})();
+</script>"""
+
+
+def render_status_patch(status: Optional[dict], nonce: str) -> str:
+    """Documento mínimo que atualiza o selo de "dados desatualizados" no iframe do dashboard."""
+    return _post_to_siblings({"type": "dash:status", "nonce": nonce, "status": status})
+
+
+def render_slot_patch(slots: dict[str, str], nonce: str) -> str:
+    """
+    Documento mínimo que envia só os slots alterados para o iframe do dashboard.
+
+    O script faz postMessage para os frames irmãos (o dashboard escuta "dash:slots"
+    e troca apenas os nós [data-slot=...]) e depois se esconde — o kiosk.css força
+    todo iframe a ocupar a tela inteira. `nonce` é o do HTML que a sessão recebeu.
+    """
+    msg = {
+        "type": "dash:slots",
+        "nonce": nonce,
+        "slots": {
+            key: {"hash": fragment_digest(value), "html": minify_html(value)}
+            for key, value in slots.items()
+        },
+    }
+    return _post_to_siblings(msg)
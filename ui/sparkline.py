@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from typing import Sequence
+
+
+def sparkline_svg(
+    xs: Sequence[float],
+    ys: Sequence[float],
+    *,
+    width: int = 240,
+    height: int = 40,
+    stroke: str = "#F05914",
+    fill: str = "rgba(240,89,20,0.10)",
+) -> str:
+    """
+    Sparkline compacta (linha + área) para a trajetória de um indicador.
+    Espera poucos pontos (já reduzidos via LTTB no servidor).
+    """
+    if len(xs) < 2 or len(xs) != len(ys):
+        return ""
+
+    x0, x1 = float(min(xs)), float(max(xs))
+    y0, y1 = float(min(ys)), float(max(ys))
+    dx = (x1 - x0) or 1.0
+    dy = (y1 - y0) or 1.0
+    pad = 2.0  # não corta o traço no topo/base
+
+    pts = [
+        (
+            (float(x) - x0) / dx * width,
+            pad + (1.0 - (float(y) - y0) / dy) * (height - 2 * pad),
+        )
+        for x, y in zip(xs, ys)
+    ]
+    line = " ".join(f"{px:.1f},{py:.1f}" for px, py in pts)
+    area = f"0,{height} {line} {width},{height}"
+
+    return f"""
+<svg class="kpi-sparkline" viewBox="0 0 {width} {height}" preserveAspectRatio="none" aria-hidden="true"
+     style="width:100%; height:100%; display:block;">
+  <polygon points="{area}" fill="{fill}" stroke="none" />
+  <polyline points="{line}" fill="none" stroke="{stroke}" stroke-width="1.5"
+            stroke-linejoin="round" stroke-linecap="round" vector-effect="non-scaling-stroke" />
+</svg>
+""".strip()